@@ -1,19 +1,55 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import random
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class ContextMemory:
     """
     Lưu thống kê theo "context key" (hashable) để ContextIntelligence dùng lại.
+
+    - half_life: nếu đặt, wins/losses/samples/total_outcome decay theo cấp số
+      nhân với half-life tính bằng số lần store() (event clock). Decay làm
+      lazy khi key được đọc/ghi -> O(1), kết quả mới nặng ký hơn kết quả cũ.
+      None = tổng thường (như trước).
+    - prune_below: (chỉ khi có half_life) key nào có samples đã decay xuống
+      dưới ngưỡng này thì bị xoá (cả history), quét amortized mỗi ~len(memory)
+      lần store() -> số key giữ lại ~ half_life * log2(1 / prune_below),
+      không tăng theo số context khác nhau đã gặp.
+    - reservoir: giữ tối đa N record thô mỗi key (reservoir sampling, để
+      debug). 0 = không giữ history.
+    - Key chỉ được cache trong 1 step: get_stats(f) nhớ key theo identity
+      của f, store(f) ngay sau đó (cùng dict, cùng step) dùng lại rồi bỏ
+      cache. new_step() kết thúc step; build_key() luôn tính lại.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        half_life: Optional[float] = None,
+        reservoir: int = 0,
+        seed: Optional[int] = None,
+        prune_below: float = 1e-3,
+    ) -> None:
         # key -> aggregate
         self.memory: Dict[Tuple[Any, ...], Dict[str, float]] = {}
-        # key -> raw history (optional, để debug)
+        # key -> raw records (reservoir sample, optional, để debug)
         self.history: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
 
+        self.half_life = float(half_life) if half_life else None
+        self._decay = 0.5 ** (1.0 / self.half_life) if self.half_life else 1.0
+        self.reservoir = max(int(reservoir), 0)
+        self._rng = random.Random(seed)
+        self._seen: Dict[Tuple[Any, ...], int] = {}
+        self._clock = 0
+        self.prune_below = max(float(prune_below), 0.0)
+        self._sweep_at = 0
+        self.pruned = 0
+
+        self._key_obj: Any = None
+        self._key: Optional[Tuple[Any, ...]] = None
+        self._key_step = -1
+        self._step = 0
+
     @staticmethod
     def _freeze(x: Any) -> Any:
         """Convert object (dict/list/set/tuple) thành dạng hashable để làm key."""
@@ -28,17 +64,51 @@ class ContextMemory:
     def build_key(self, trade_features: Dict[str, Any]) -> Tuple[Any, ...]:
         return tuple(sorted((k, self._freeze(v)) for k, v in trade_features.items()))
 
+    def _step_key(self, trade_features: Dict[str, Any], keep: bool) -> Tuple[Any, ...]:
+        # get_stats() rồi store() trên cùng dict trong 1 step -> freeze 1 lần
+        if trade_features is self._key_obj and self._key_step == self._step:
+            key = self._key
+        else:
+            key = self.build_key(trade_features)
+        if keep:
+            # giữ ref để id() không bị tái sử dụng
+            self._key_obj, self._key, self._key_step = trade_features, key, self._step
+        else:
+            self._key_obj, self._key = None, None
+        return key  # type: ignore[return-value]
+
+    def new_step(self) -> None:
+        """Step boundary: a key cached by get_stats() is not reused after this."""
+        self._step += 1
+        self._key_obj, self._key = None, None
+
+    def _decayed(self, agg: Dict[str, float]) -> Dict[str, float]:
+        # đưa tổng về thời điểm hiện tại
+        dt = self._clock - agg.get("t", self._clock)
+        if dt > 0 and self._decay < 1.0:
+            f = self._decay ** dt
+            for k in ("wins", "losses", "total_outcome", "samples"):
+                agg[k] *= f
+        agg["t"] = self._clock
+        return agg
+
     def get_stats(self, trade_features: Dict[str, Any]) -> Dict[str, Any]:
-        key = self.build_key(trade_features)
+        key = self._step_key(trade_features, keep=True)
         agg = self.memory.get(key)
         if not agg:
-            return {"wins": 0, "losses": 0, "samples": 0, "total_outcome": 0.0}
+            return {"wins": 0, "losses": 0, "samples": 0, "total_outcome": 0.0, "avg_outcome": 0.0, "count": 0}
 
+        agg = self._decayed(agg)
+        samples = agg.get("samples", 0.0)
+        # decay -> số thực (trọng số hiệu dụng); không decay -> số nguyên như cũ
+        num = float if self.half_life else int
         return {
-            "wins": int(agg.get("wins", 0.0)),
-            "losses": int(agg.get("losses", 0.0)),
-            "samples": int(agg.get("samples", 0.0)),
+            "wins": num(agg.get("wins", 0.0)),
+            "losses": num(agg.get("losses", 0.0)),
+            "samples": num(samples),
             "total_outcome": float(agg.get("total_outcome", 0.0)),
+            "avg_outcome": float(agg.get("total_outcome", 0.0)) / samples if samples > 0 else 0.0,
+            "count": int(agg.get("count", 0)),
         }
 
     def store(self, snapshot: Dict[str, Any], score: float, risk_cfg: Dict[str, Any], outcome: float) -> None:
@@ -46,20 +116,47 @@ class ContextMemory:
         snapshot: trade_features tại thời điểm vào lệnh (đã freeze để làm key)
         outcome : reward/pnl (âm/dương)
         """
-        key = self.build_key(snapshot)
+        key = self._step_key(snapshot, keep=False)
+        self._clock += 1
 
-        self.history.setdefault(key, []).append(
-            {"snapshot": snapshot, "score": float(score), "risk": dict(risk_cfg or {}), "outcome": float(outcome)}
-        )
+        if self.reservoir:
+            rec = {"snapshot": snapshot, "score": float(score), "risk": dict(risk_cfg or {}), "outcome": float(outcome)}
+            seen = self._seen.get(key, 0) + 1
+            self._seen[key] = seen
+            buf = self.history.setdefault(key, [])
+            if len(buf) < self.reservoir:
+                buf.append(rec)
+            else:
+                j = self._rng.randrange(seen)
+                if j < self.reservoir:
+                    buf[j] = rec
 
-        agg = self.memory.setdefault(key, {"wins": 0.0, "losses": 0.0, "total_outcome": 0.0, "samples": 0.0})
+        agg = self.memory.get(key)
+        if agg is None:
+            agg = self.memory[key] = {"wins": 0.0, "losses": 0.0, "total_outcome": 0.0, "samples": 0.0, "count": 0, "t": self._clock}
+        else:
+            self._decayed(agg)
         agg["samples"] += 1.0
+        agg["count"] += 1
         agg["total_outcome"] += float(outcome)
         if outcome > 0:
             agg["wins"] += 1.0
         else:
             agg["losses"] += 1.0
 
+        if self._decay < 1.0 and self.prune_below > 0.0 and self._clock >= self._sweep_at:
+            self._prune()
+
+    def _prune(self) -> None:
+        # O(len(memory)) mỗi ~len(memory) lần store() -> O(1) amortized
+        for key, agg in list(self.memory.items()):
+            if agg["samples"] * self._decay ** (self._clock - agg["t"]) < self.prune_below:
+                del self.memory[key]
+                self.history.pop(key, None)
+                self._seen.pop(key, None)
+                self.pruned += 1
+        self._sweep_at = self._clock + max(len(self.memory), 64)
+
     def get_strength(self, trade_features: Dict[str, Any]) -> float:
         """Strength ~ winrate (0..1). Default 0.5 nếu chưa có dữ liệu."""
         s = self.get_stats(trade_features)
@@ -4,6 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, Tuple
 
+from brain.market_view import MarketView
 from brain.regime_detector import RegimeDetector, RegimeResult
 from brain.meta_controller import MetaController, MetaConfig
 
@@ -152,8 +153,11 @@ class DecisionEngine:
         NOTE:
         - allow here means "system produced a decision event" (even if HOLD), not necessarily open position.
         """
+        # 0) one shared array view of the candle window (None -> legacy per-expert parsing)
+        view = MarketView.from_candles(features.get("candles")) if isinstance(features, dict) else None
+
         # 1) detect regime
-        rr: RegimeResult = self.regime_detector.detect(features)
+        rr: RegimeResult = self.regime_detector.detect(features, view=view)
 
         # 2) build context
         context: Dict[str, Any] = {
@@ -162,6 +166,8 @@ class DecisionEngine:
             "vol": rr.vol,
             "slope": rr.slope,
         }
+        if view is not None:
+            context["market_view"] = view
         if self.trade_memory is not None:
             context["trade_memory"] = self.trade_memory
 
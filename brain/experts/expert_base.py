@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 
 @dataclass
@@ -26,12 +26,25 @@ class ExpertDecision:
 class ExpertBase:
     """
     Base class for all experts. Experts should implement decide(features, context).
+
+    Optional: decide_batch(view, regimes, window=None) scores a whole history
+    at once (see ExpertGate.pick_batch). Return an (N,) float array where
+    row i is the raw score decide() gives for candles[..i] (last `window`
+    bars) with context {"regime": regimes[i]}, or None to use the scalar path.
     """
     name: str = "BASE"
 
     def decide(self, features: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Any:
         raise NotImplementedError
 
+    def decide_batch(
+        self,
+        view: Any,
+        regimes: Sequence[Optional[str]],
+        window: Optional[int] = None,
+    ) -> Any:
+        return None
+
 
 def coerce_decision(raw: Any, fallback_expert: str = "UNKNOWN") -> Optional[ExpertDecision]:
     """
@@ -2,7 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple, Iterable
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Iterable
+
+import numpy as np
+
+try:
+    from brain.market_view import MarketView
+except Exception:
+    MarketView = None  # type: ignore
 
 try:
     from brain.experts.expert_base import ExpertDecision, ExpertBase
@@ -134,6 +141,38 @@ def _coerce_decision(
     )
 
 
+@dataclass
+class GateBatchResult:
+    """
+    pick_batch() output for N bars x E experts.
+      raw[i, e]     expert score before weights
+      weights[i, e] expert|regime weight at bar i
+      scores[i, e]  raw * weights (NaN where the expert produced no decision)
+      best[i]       winning expert column (-1 -> FALLBACK)
+    """
+    experts: List[str]
+    regimes: List[Optional[str]]
+    raw: np.ndarray
+    weights: np.ndarray
+    scores: np.ndarray
+    best: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.best.shape[0])
+
+    @property
+    def best_score(self) -> np.ndarray:
+        out = np.zeros(len(self), dtype=np.float64)
+        ok = self.best >= 0
+        out[ok] = self.scores[np.nonzero(ok)[0], self.best[ok]]
+        return out
+
+    @property
+    def best_expert(self) -> List[str]:
+        names = self.experts
+        return [names[j] if j >= 0 else "FALLBACK" for j in self.best.tolist()]
+
+
 class ExpertGate:
     """
     Collect expert decisions, apply optional weights, pick best.
@@ -198,13 +237,21 @@ class ExpertGate:
 
         decisions: List[ExpertDecision] = []
         experts = self._iter_experts()
+        names = [str(getattr(e, "name", e.__class__.__name__)) for e in experts]
 
         if self.debug:
-            names = [getattr(e, "name", e.__class__.__name__) for e in experts]
             print("DEBUG REGISTRY EXPERTS:", names)
 
-        for exp in experts:
-            name = str(getattr(exp, "name", exp.__class__.__name__))
+        # whole weight row for this regime in one read (dense expert x regime table)
+        row: Optional[List[float]] = None
+        if regime and self.weight_store is not None and hasattr(self.weight_store, "weights_for_regime"):
+            try:
+                row = self.weight_store.weights_for_regime(names, regime).tolist()
+            except Exception:
+                row = None
+
+        for j, exp in enumerate(experts):
+            name = names[j]
 
             try:
                 raw = exp.decide(features, context)
@@ -228,7 +275,9 @@ class ExpertGate:
 
             # Apply weight_store if present
             w = 1.0
-            if self.weight_store is not None and hasattr(self.weight_store, "get"):
+            if row is not None and dec.expert == name:
+                w = row[j]
+            elif self.weight_store is not None and hasattr(self.weight_store, "get"):
                 try:
                     w = _safe_float(self.weight_store.get(dec.expert, regime), 1.0)
                 except Exception:
@@ -294,4 +343,121 @@ class ExpertGate:
             except Exception:
                 pass
 
-        return best, decisions
\ No newline at end of file
+        return best, decisions
+
+    # ------------------------------------------------------------
+    # Batch (offline) evaluation
+    # ------------------------------------------------------------
+    def _weight_matrix(self, names: List[str], regimes: List[Optional[str]]) -> np.ndarray:
+        """(R, E) weights for each distinct regime, via the same weight_store.get as pick()."""
+        w = np.ones((len(regimes), len(names)), dtype=np.float64)
+        if self.weight_store is None or not hasattr(self.weight_store, "get"):
+            return w
+        for r, reg in enumerate(regimes):
+            if reg and hasattr(self.weight_store, "weights_for_regime"):
+                try:
+                    w[r] = self.weight_store.weights_for_regime(names, reg)
+                    continue
+                except Exception:
+                    pass
+            for e, name in enumerate(names):
+                try:
+                    w[r, e] = _safe_float(self.weight_store.get(name, reg), 1.0)
+                except Exception:
+                    w[r, e] = 1.0
+        return w
+
+    def _scalar_scores(
+        self,
+        exp: Any,
+        name: str,
+        candles: Any,
+        regimes: Sequence[Optional[str]],
+        window: Optional[int],
+    ) -> np.ndarray:
+        """Per-bar decide() for experts without decide_batch. NaN = no decision."""
+        n = len(regimes)
+        out = np.full(n, np.nan, dtype=np.float64)
+        for i in range(n):
+            start = 0 if window is None else max(0, i + 1 - int(window))
+            try:
+                raw = exp.decide({"candles": candles[start:i + 1]}, {"regime": regimes[i]})
+            except Exception:
+                out[i] = 0.0
+                continue
+            dec = _coerce_decision(raw, fallback_expert=name, fallback_meta={"reason": "coerced"})
+            if dec is not None:
+                out[i] = _safe_float(dec.score, 0.0)
+        return out
+
+    def pick_batch(
+        self,
+        candles: Any,
+        regimes: Sequence[Optional[str]],
+        *,
+        window: Optional[int] = None,
+    ) -> GateBatchResult:
+        """
+        Offline pick() for every bar of a history.
+
+        Bar i is scored on candles[..i] (last `window` bars if given) with
+        context {"regime": regimes[i]}. Experts with decide_batch() score all
+        bars in one call; others fall back to decide() per bar. Weights are an
+        (N, R) regime one-hot times the (R, E) expert|regime table; the winner
+        is the argmax (first expert on ties, like pick()).
+
+        Weights are looked up by the expert's registry name (pick() uses the
+        name in the decision, which only differs for odd raw outputs).
+        """
+        n = len(candles)
+        regimes = list(regimes)
+        if len(regimes) != n:
+            raise ValueError(f"regimes length {len(regimes)} != candles length {n}")
+
+        experts = self._iter_experts()
+        names = [str(getattr(e, "name", e.__class__.__name__)) for e in experts]
+
+        view = MarketView.from_candles(candles) if MarketView is not None else None
+        raw = np.full((n, len(experts)), np.nan, dtype=np.float64)
+        for j, exp in enumerate(experts):
+            col = None
+            batch = getattr(exp, "decide_batch", None)
+            if view is not None and callable(batch):
+                try:
+                    col = batch(view, regimes, window=window)
+                except Exception:
+                    col = None
+            if col is None:
+                col = self._scalar_scores(exp, names[j], candles, regimes, window)
+            raw[:, j] = np.asarray(col, dtype=np.float64)
+
+        # regime one-hot (N, R) @ weight table (R, E)
+        uniq: List[Optional[str]] = []
+        pos: Dict[Any, int] = {}
+        idx = np.empty(n, dtype=np.int64)
+        for i, r in enumerate(regimes):
+            key = r if r else None
+            if key not in pos:
+                pos[key] = len(uniq)
+                uniq.append(key)
+            idx[i] = pos[key]
+        onehot = np.zeros((n, len(uniq)), dtype=np.float64)
+        onehot[np.arange(n), idx] = 1.0
+        weights = onehot @ self._weight_matrix(names, uniq)
+
+        scores = raw * weights
+        if scores.shape[1] == 0:
+            best = np.full(n, -1, dtype=np.int64)
+        else:
+            masked = np.where(np.isnan(scores), -np.inf, scores)
+            best = masked.argmax(axis=1)
+            best[np.isneginf(masked.max(axis=1))] = -1
+
+        return GateBatchResult(
+            experts=names,
+            regimes=regimes,
+            raw=raw,
+            weights=weights,
+            scores=scores,
+            best=best,
+        )
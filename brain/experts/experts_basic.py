@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 # --- Robust imports (NEVER crash this module) ---
@@ -25,6 +28,13 @@ except Exception:
         meta: Dict[str, Any] = field(default_factory=dict)
 
 
+try:
+    from brain.market_view import get_market_view
+except Exception:
+    def get_market_view(context: Any) -> Any:  # type: ignore
+        return None
+
+
 def _safe_float(x: Any, default: float = 0.0) -> float:
     try:
         if x is None:
@@ -34,6 +44,41 @@ def _safe_float(x: Any, default: float = 0.0) -> float:
         return default
 
 
+def _rolling_sum(x: np.ndarray, k: int) -> np.ndarray:
+    """
+    out[j] = sum(x[j : j + k]), added left to right like the builtin sum() over
+    a list, so batch scores compare exactly like decide() does
+    (Python 3.12+ sum() is compensated: last-bit differences are possible there).
+    """
+    n = len(x) - k + 1
+    acc = np.zeros(max(n, 0), dtype=np.float64)
+    if n <= 0:
+        return acc
+    for j in range(k):
+        acc += x[j:j + n]
+    return acc
+
+
+def _batch_inputs(view: Any, regimes: Sequence[Optional[str]], window: Optional[int]):
+    """closes, regimes (object array) and bars-available per row for decide_batch."""
+    closes = np.asarray(view.closes, dtype=np.float64)
+    n = len(closes)
+    reg = np.empty(n, dtype=object)
+    reg[:] = [(r or "") for r in regimes]
+    avail = np.arange(1, n + 1)
+    if window is not None:
+        avail = np.minimum(avail, int(window))
+    return closes, reg, avail
+
+
+def _tail_rows(closes: np.ndarray, k: int, fn) -> np.ndarray:
+    """fn over closes[i-k+1 : i+1] placed at row i (rows i < k-1 left as 0)."""
+    out = np.zeros(len(closes), dtype=np.float64)
+    if len(closes) >= k:
+        out[k - 1:] = fn(closes, k)
+    return out
+
+
 # ----------------------------
 # Experts
 # ----------------------------
@@ -43,16 +88,21 @@ class TrendMAExpert(ExpertBase):
     def decide(self, features: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> ExpertDecision:
         context = context or {}
         candles: List[Dict[str, Any]] = features.get("candles") or []
-        if len(candles) < 50:
+        view = get_market_view(context)
+        n = len(view) if view is not None else len(candles)
+        if n < 50:
             return ExpertDecision(
                 expert=self.name,
                 allow=False,
                 score=0.0,
                 action="hold",
-                meta={"reason": "not_enough_data", "n": len(candles)},
+                meta={"reason": "not_enough_data", "n": n},
             )
 
-        closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-50:]]
+        if view is not None:
+            closes = view.tail(50)
+        else:
+            closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-50:]]
         ma_fast = sum(closes[-10:]) / 10.0
         ma_slow = sum(closes) / 50.0
 
@@ -73,6 +123,15 @@ class TrendMAExpert(ExpertBase):
             meta={"ma_fast": ma_fast, "ma_slow": ma_slow, "regime": context.get("regime")},
         )
 
+    def decide_batch(self, view: Any, regimes: Sequence[Optional[str]], window: Optional[int] = None) -> np.ndarray:
+        closes, reg, avail = _batch_inputs(view, regimes, window)
+        ma_fast = _tail_rows(closes, 10, _rolling_sum) / 10.0
+        ma_slow = _tail_rows(closes, 50, _rolling_sum) / 50.0
+
+        score = np.where(ma_fast > ma_slow, 0.65, 0.35)
+        score = score + np.where(np.isin(reg, ("trend_up", "trend_down", "trend")), 0.15, 0.0)
+        return np.where(avail >= 50, np.minimum(score, 1.0), 0.0)
+
 
 class MeanRevertExpert(ExpertBase):
     name = "MEAN_REVERT"
@@ -80,16 +139,21 @@ class MeanRevertExpert(ExpertBase):
     def decide(self, features: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> ExpertDecision:
         context = context or {}
         candles: List[Dict[str, Any]] = features.get("candles") or []
-        if len(candles) < 60:
+        view = get_market_view(context)
+        n = len(view) if view is not None else len(candles)
+        if n < 60:
             return ExpertDecision(
                 expert=self.name,
                 allow=False,
                 score=0.0,
                 action="hold",
-                meta={"reason": "not_enough_data", "n": len(candles)},
+                meta={"reason": "not_enough_data", "n": n},
             )
 
-        closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-60:]]
+        if view is not None:
+            closes = view.tail(60)
+        else:
+            closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-60:]]
         mean = sum(closes) / 60.0
         last = closes[-1]
         dist = abs(last - mean)
@@ -106,6 +170,15 @@ class MeanRevertExpert(ExpertBase):
             meta={"mean": mean, "last": last, "dist": dist, "regime": context.get("regime")},
         )
 
+    def decide_batch(self, view: Any, regimes: Sequence[Optional[str]], window: Optional[int] = None) -> np.ndarray:
+        closes, reg, avail = _batch_inputs(view, regimes, window)
+        mean = _tail_rows(closes, 60, _rolling_sum) / 60.0
+        dist = np.abs(closes - mean)
+
+        base = np.where(reg == "range", 0.65, 0.40)
+        score = np.minimum(1.0, base + (dist / 10.0))
+        return np.where(avail >= 60, score, 0.0)
+
 
 class BreakoutExpert(ExpertBase):
     name = "BREAKOUT"
@@ -113,16 +186,21 @@ class BreakoutExpert(ExpertBase):
     def decide(self, features: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> ExpertDecision:
         context = context or {}
         candles: List[Dict[str, Any]] = features.get("candles") or []
-        if len(candles) < 40:
+        view = get_market_view(context)
+        n = len(view) if view is not None else len(candles)
+        if n < 40:
             return ExpertDecision(
                 expert=self.name,
                 allow=False,
                 score=0.0,
                 action="hold",
-                meta={"reason": "not_enough_data", "n": len(candles)},
+                meta={"reason": "not_enough_data", "n": n},
             )
 
-        closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-40:]]
+        if view is not None:
+            closes = view.tail(40)
+        else:
+            closes = [_safe_float(x.get("c", x.get("close")), 0.0) for x in candles[-40:]]
         hi, lo, last = max(closes[:-1]), min(closes[:-1]), closes[-1]
 
         broke = (last > hi) or (last < lo)
@@ -141,6 +219,21 @@ class BreakoutExpert(ExpertBase):
             meta={"hi": hi, "lo": lo, "last": last, "regime": context.get("regime")},
         )
 
+    def decide_batch(self, view: Any, regimes: Sequence[Optional[str]], window: Optional[int] = None) -> np.ndarray:
+        closes, reg, avail = _batch_inputs(view, regimes, window)
+        n = len(closes)
+        # hi/lo over the 39 closes before bar i
+        hi = np.zeros(n, dtype=np.float64)
+        lo = np.zeros(n, dtype=np.float64)
+        if n >= 40:
+            prior = sliding_window_view(closes[:-1], 39)
+            hi[39:] = prior.max(axis=1)
+            lo[39:] = prior.min(axis=1)
+
+        broke = (closes > hi) | (closes < lo)
+        score = np.where(broke, 0.75, 0.2) + np.where(reg == "breakout", 0.15, 0.0)
+        return np.where(avail >= 40, np.minimum(score, 1.0), 0.0)
+
 
 class BaselineExpert(ExpertBase):
     name = "BASELINE"
@@ -155,6 +248,9 @@ class BaselineExpert(ExpertBase):
             meta={"reason": "baseline"},
         )
 
+    def decide_batch(self, view: Any, regimes: Sequence[Optional[str]], window: Optional[int] = None) -> np.ndarray:
+        return np.full(len(view.closes), 0.0001, dtype=np.float64)
+
 
 # Default experts used by DecisionEngine/registry bootstrap
 DEFAULT_EXPERTS: List[Any] = [
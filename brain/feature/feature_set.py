@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, Optional, Sequence
 
-from brain.feature.pipeline import FeaturePipeline
+import numpy as np
+
+from brain.feature.pipeline import FeatureMatrix, FeaturePipeline, as_columns
 from brain.feature.market_structure import MarketStructureFeatures
 from brain.feature.price_action import PriceActionFeatures
 from brain.feature.volume import VolumeFeatures
@@ -34,13 +36,62 @@ class FeatureSet:
 
     def compute(self, candles: Sequence[Candle]) -> Dict[str, Any]:
         feats = self.pipeline.compute(candles)
+        last_close = float(candles[-1]["c"]) if candles else 0.0
+        return self._core(feats, last_close)
+
+    def compute_all(self, candles: Any, window: Optional[int] = None) -> FeatureMatrix:
+        """
+        Precompute features for every bar of a history (CandleArray or candle dicts).
+        fm.row(i) == compute(candles[max(0, i + 1 - window) : i + 1]); window=None
+        means all history up to bar i. Float features from rolling mean/std
+        (vol.*) may differ from compute() in the last bits.
+        """
+        arr = as_columns(candles)
+        fm = self.pipeline.compute_all(arr, window=window)
+        n = len(fm)
+
+        # --- core mappings (same as _core, per column) ---
+        ms_valid = fm.masks.get("ms.trend_state", np.zeros(n, dtype=bool))
+        trend_state = np.empty(n, dtype=object)
+        if "ms.trend_state" in fm.columns:
+            trend_state[ms_valid] = fm.columns["ms.trend_state"][ms_valid]
+
+        last_close = np.asarray(arr.c, dtype=np.float64)
+        last_range = np.zeros(n, dtype=np.float64)
+        if "pa.range" in fm.columns:
+            pa_valid = fm.masks["pa.range"]
+            last_range[pa_valid] = fm.columns["pa.range"][pa_valid]
+        small = np.abs(last_close) < 1e-9
+        rel_range = np.where(small, 0.0, last_range / np.where(small, 1.0, np.abs(last_close)))
+
+        volatility_state = np.where(rel_range >= self.vol_state_threshold, "high", "low").astype(object)
 
+        fm.add("symbol", np.full(n, self.symbol, dtype=object))
+        fm.add("trend_state", trend_state)
+        fm.add("volatility_state", volatility_state)
+        fm.add("rel_range", rel_range)
+        return fm
+
+    def update(self, candle: Candle) -> Dict[str, Any]:
+        """
+        Incremental compute(): feed candles one at a time (oldest -> newest).
+        Matches compute(window) for any window >= required_window().
+        """
+        feats = self.pipeline.update(candle)
+        return self._core(feats, float(candle["c"]))
+
+    def reset(self) -> None:
+        self.pipeline.reset()
+
+    def required_window(self) -> int:
+        return self.pipeline.window_required()
+
+    def _core(self, feats: Dict[str, Any], last_close: float) -> Dict[str, Any]:
         # --- core mappings ---
         # trend_state from market structure
         trend_state = feats.get("ms.trend_state")
 
         # volatility_state (simple v1): use pa.range / last_close
-        last_close = float(candles[-1]["c"]) if candles else 0.0
         last_range = float(feats.get("pa.range", 0.0))
         rel_range = 0.0 if abs(last_close) < 1e-9 else (last_range / abs(last_close))
 
@@ -1,8 +1,31 @@
 # brain/feature/market_structure.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Sequence
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _prev_extreme(x: np.ndarray, m: int, fn) -> np.ndarray:
+    """
+    out[i] = fn(x[i - min(m, i) : i]) for i >= 1 (out[0] undefined -> x[0]).
+    Full windows use a strided view; the first m rows are a running extreme.
+    """
+    n = len(x)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    out[0] = x[0]
+    head = min(m, n)
+    if head > 1:
+        out[1:head] = fn.accumulate(x[: head - 1])
+    if n > m >= 1:
+        # row i (i >= m) looks at x[i-m : i] == window j = i - m
+        out[m:] = fn.reduce(sliding_window_view(x[:-1], m), axis=1)
+    return out
 
 
 @dataclass
@@ -16,6 +39,20 @@ class MarketStructureFeatures:
     breakout_lookback: int = 10
     slope_threshold: float = 0.0001  # relative threshold (scaled later)
 
+    # incremental state (update/reset)
+    _closes: Deque[float] = field(default_factory=deque, init=False, repr=False)
+    _prev_hl: Tuple[float, float] = field(default=(0.0, 0.0), init=False, repr=False)
+    _max_q: Deque[Tuple[int, float]] = field(default_factory=deque, init=False, repr=False)
+    _min_q: Deque[Tuple[int, float]] = field(default_factory=deque, init=False, repr=False)
+    _seen: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.reset()
+
+    @property
+    def window_required(self) -> int:
+        return max(int(self.lookback), int(self.breakout_lookback) + 1, 3)
+
     def compute(self, candles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
         if candles is None or len(candles) < 3:
             return {}
@@ -27,9 +64,112 @@ class MarketStructureFeatures:
         n = min(self.lookback, len(candles))
         recent_closes = closes[-n:]
 
-        # --- slope estimate (simple) ---
         first = recent_closes[0]
         last = recent_closes[-1]
+
+        m = min(self.breakout_lookback, len(candles) - 1)
+        prev_high = max(highs[-(m + 1):-1])
+        prev_low = min(lows[-(m + 1):-1])
+
+        return self._features(first, last, highs[-2], highs[-1], lows[-2], lows[-1], prev_high, prev_low)
+
+    def compute_all(self, arr: Any, window: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Row i == compute(arr[max(0, i + 1 - window) : i + 1]), vectorized."""
+        c = np.asarray(arr.c, dtype=np.float64)
+        h = np.asarray(arr.h, dtype=np.float64)
+        l = np.asarray(arr.l, dtype=np.float64)
+        n = len(c)
+        w = n if window is None else max(int(window), 0)
+        idx = np.arange(n)
+
+        valid = np.minimum(idx + 1, w) >= 3
+
+        # slope over the last min(lookback, window) closes
+        span = max(min(int(self.lookback), w), 1)
+        first = c[np.maximum(idx - span + 1, 0)]
+        last = c
+        safe_first = np.where(np.abs(first) < 1e-9, 1.0, np.abs(first))
+        slope = np.where(np.abs(first) < 1e-9, 0.0, (last - first) / safe_first)
+
+        trend_state = np.full(n, "range", dtype=object)
+        trend_state[slope > self.slope_threshold] = "up"
+        trend_state[slope < -self.slope_threshold] = "down"
+
+        h1 = np.concatenate(([h[0]], h[:-1])) if n else h
+        l1 = np.concatenate(([l[0]], l[:-1])) if n else l
+        structure = np.full(n, "mixed", dtype=object)
+        structure[(h > h1) & (l > l1)] = "hh_hl"
+        structure[(h < h1) & (l < l1)] = "lh_ll"
+
+        m = max(min(int(self.breakout_lookback), w - 1), 1)
+        prev_high = _prev_extreme(h, m, np.maximum)
+        prev_low = _prev_extreme(l, m, np.minimum)
+
+        return {
+            "_valid": valid,
+            "trend_state": trend_state,
+            "structure": structure,
+            "slope": slope,
+            "breakout_up": (last > prev_high).astype(np.int64),
+            "breakout_down": (last < prev_low).astype(np.int64),
+            "prev_high": prev_high,
+            "prev_low": prev_low,
+        }
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        O(1) amortized: closes deque for slope, monotonic deques for the
+        breakout max/min over the previous `breakout_lookback` bars.
+        """
+        t = self._seen
+        c = float(candle["c"]); h = float(candle["h"]); l = float(candle["l"])
+        self._closes.append(c)
+
+        # breakout window = bars [t - breakout_lookback, t - 1]
+        lo = t - int(self.breakout_lookback)
+        while self._max_q and self._max_q[0][0] < lo:
+            self._max_q.popleft()
+        while self._min_q and self._min_q[0][0] < lo:
+            self._min_q.popleft()
+
+        out: Dict[str, Any] = {}
+        if t >= 2:
+            h1, l1 = self._prev_hl
+            out = self._features(
+                self._closes[0], c, h1, h, l1, l,
+                self._max_q[0][1], self._min_q[0][1],
+            )
+
+        while self._max_q and self._max_q[-1][1] <= h:
+            self._max_q.pop()
+        self._max_q.append((t, h))
+        while self._min_q and self._min_q[-1][1] >= l:
+            self._min_q.pop()
+        self._min_q.append((t, l))
+
+        self._prev_hl = (h, l)
+        self._seen = t + 1
+        return out
+
+    def reset(self) -> None:
+        self._closes = deque(maxlen=max(int(self.lookback), 1))
+        self._max_q = deque()
+        self._min_q = deque()
+        self._prev_hl = (0.0, 0.0)
+        self._seen = 0
+
+    def _features(
+        self,
+        first: float,
+        last: float,
+        h1: float,
+        h2: float,
+        l1: float,
+        l2: float,
+        prev_high: float,
+        prev_low: float,
+    ) -> Dict[str, Any]:
+        # --- slope estimate (simple) ---
         if abs(first) < 1e-9:
             slope = 0.0
         else:
@@ -45,8 +185,6 @@ class MarketStructureFeatures:
 
         # --- HH/HL vs LH/LL using last two swings (simplified: compare last 2 highs/lows) ---
         # Use last 3 candles highs/lows for a very stable minimal v1.
-        h1, h2 = highs[-2], highs[-1]
-        l1, l2 = lows[-2], lows[-1]
         if h2 > h1 and l2 > l1:
             structure = "hh_hl"
         elif h2 < h1 and l2 < l1:
@@ -55,9 +193,6 @@ class MarketStructureFeatures:
             structure = "mixed"
 
         # --- breakout check ---
-        m = min(self.breakout_lookback, len(candles) - 1)
-        prev_high = max(highs[-(m + 1):-1])
-        prev_low = min(lows[-(m + 1):-1])
         breakout_up = 1 if last > prev_high else 0
         breakout_down = 1 if last < prev_low else 0
 
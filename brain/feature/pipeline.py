@@ -1,8 +1,12 @@
 # features/pipeline.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Protocol, Sequence
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
 
 
 Candle = Dict[str, Any]  # expected keys: o,h,l,c,(v optional)
@@ -13,9 +17,110 @@ class FeaturePlugin(Protocol):
     def compute(self, candles: Sequence[Candle]) -> Dict[str, Any]: ...
 
 
+class IncrementalFeaturePlugin(FeaturePlugin, Protocol):
+    """
+    Streaming variant: update(candle) consumes one new bar and returns the same
+    features compute() would return for a window ending at that bar
+    (as long as the window is at least `window_required` bars).
+    """
+    window_required: int
+    def update(self, candle: Candle) -> Dict[str, Any]: ...
+    def reset(self) -> None: ...
+
+
+class VectorizedFeaturePlugin(FeaturePlugin, Protocol):
+    """
+    Whole-history variant: compute_all(arr, window) returns column arrays where
+    row i equals compute(arr[max(0, i + 1 - window) : i + 1]) (window=None means
+    all history up to i), plus a boolean "_valid" column for rows where
+    compute() would return {}.
+    """
+    def compute_all(self, arr: Any, window: Optional[int] = None) -> Dict[str, np.ndarray]: ...
+
+
+def as_columns(candles: Any) -> Any:
+    """
+    Columnar view for compute_all(): objects exposing .o/.h/.l/.c/.v arrays
+    (sim.candle_array.CandleArray) pass through; candle dicts are converted.
+    """
+    if all(hasattr(candles, f) for f in ("o", "h", "l", "c", "v")):
+        return candles
+    rows = list(candles or [])
+    return SimpleNamespace(
+        o=np.array([float(x["o"]) for x in rows], dtype=np.float64),
+        h=np.array([float(x["h"]) for x in rows], dtype=np.float64),
+        l=np.array([float(x["l"]) for x in rows], dtype=np.float64),
+        c=np.array([float(x["c"]) for x in rows], dtype=np.float64),
+        # v=None when any candle lacks volume (plugins then report no volume features)
+        v=(
+            None if any(x.get("v") is None for x in rows)
+            else np.array([float(x["v"]) for x in rows], dtype=np.float64)
+        ),
+        rows=rows,
+    )
+
+
+def _py(x: Any) -> Any:
+    if isinstance(x, np.floating):
+        return float(x)
+    if isinstance(x, (np.integer, np.bool_)):
+        return int(x)
+    return x
+
+
+@dataclass
+class FeatureMatrix:
+    """
+    Columnar per-bar features: columns[name][i] is feature `name` at bar i.
+    masks[name][i] is False where that feature is absent (the plugin returned
+    {} for the window ending at bar i). row(i) rebuilds the compute() dict.
+    """
+    n: int
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    masks: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return int(self.n)
+
+    _rows_cache: Optional[List[Any]] = field(default=None, init=False, repr=False)
+
+    def add(self, name: str, values: np.ndarray, mask: Optional[np.ndarray] = None) -> None:
+        self.columns[name] = values
+        self.masks[name] = np.ones(self.n, dtype=bool) if mask is None else mask
+        self._rows_cache = None
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        i = int(i)
+        if i < 0:
+            i += self.n
+        if self._rows_cache is None:
+            self._rows_cache = self._python_columns()
+        return {k: col[i] for k, col, mask in self._rows_cache if mask is None or mask[i]}
+
+    def _python_columns(self) -> List[Any]:
+        # tolist() once per column: row() then only does list lookups
+        out = []
+        for k, col in self.columns.items():
+            mask = self.masks[k]
+            vals = col.tolist() if col.dtype != object else [_py(x) for x in col]
+            out.append((k, vals, None if mask.all() else mask.tolist()))
+        return out
+
+
 @dataclass
 class FeaturePipeline:
     plugins: List[FeaturePlugin]
+    # plugins without update() are fed this many recent candles via compute()
+    fallback_window: int = 50
+
+    _recent: Deque[Candle] = field(default_factory=deque, init=False, repr=False)
+
+    def __post_init__(self):
+        self._recent = deque(maxlen=max(int(self.fallback_window), 2))
+        self._needs_window = any(not hasattr(p, "update") for p in self.plugins)
 
     def compute(self, candles: Sequence[Candle]) -> Dict[str, Any]:
         """
@@ -32,3 +137,74 @@ class FeaturePipeline:
             for k, v in feats.items():
                 out[f"{p.name}.{k}"] = v
         return out
+
+    def compute_all(self, arr: Any, window: Optional[int] = None) -> FeatureMatrix:
+        """
+        Features for every bar of a CandleArray in a few array passes.
+        Plugins without compute_all() fall back to compute() per bar.
+        """
+        arr = as_columns(arr)
+        n = len(arr.c)
+        fm = FeatureMatrix(n=n)
+        for p in self.plugins:
+            if hasattr(p, "compute_all"):
+                cols = dict(p.compute_all(arr, window=window))  # type: ignore[attr-defined]
+                valid = cols.pop("_valid")
+                for k, v in cols.items():
+                    fm.add(f"{p.name}.{k}", v, valid)
+            else:
+                self._compute_all_scalar(p, arr, window, fm)
+        return fm
+
+    @staticmethod
+    def _compute_all_scalar(p: FeaturePlugin, arr: Any, window: Optional[int], fm: FeatureMatrix) -> None:
+        n = len(arr.c)
+        if hasattr(arr, "rows"):
+            arr = arr.rows
+        rows: List[Dict[str, Any]] = []
+        for i in range(n):
+            start = 0 if window is None else max(0, i + 1 - int(window))
+            rows.append(p.compute(arr[start:i + 1]) or {})
+        keys: Dict[str, None] = {}
+        for r in rows:
+            keys.update(dict.fromkeys(r))
+        for k in keys:
+            vals = np.empty(n, dtype=object)
+            mask = np.zeros(n, dtype=bool)
+            for i, r in enumerate(rows):
+                if k in r:
+                    vals[i] = r[k]
+                    mask[i] = True
+            fm.add(f"{p.name}.{k}", vals, mask)
+
+    def update(self, candle: Candle) -> Dict[str, Any]:
+        """
+        Incremental counterpart of compute(): feed one new candle, get the merged
+        namespaced features for the window ending at it. O(1) per plugin that
+        implements update(); others get compute() over a bounded recent window.
+        """
+        if self._needs_window:
+            self._recent.append(candle)
+
+        out: Dict[str, Any] = {}
+        for p in self.plugins:
+            if hasattr(p, "update"):
+                feats = p.update(candle) or {}  # type: ignore[attr-defined]
+            else:
+                feats = p.compute(list(self._recent)) or {}
+            for k, v in feats.items():
+                out[f"{p.name}.{k}"] = v
+        return out
+
+    def reset(self) -> None:
+        self._recent.clear()
+        for p in self.plugins:
+            if hasattr(p, "reset"):
+                p.reset()  # type: ignore[attr-defined]
+
+    def window_required(self) -> int:
+        """Smallest batch window for which update() and compute() agree."""
+        need = 2
+        for p in self.plugins:
+            need = max(need, int(getattr(p, "window_required", self.fallback_window)))
+        return need
@@ -1,14 +1,20 @@
 # brain/feature/price_action.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
 
 
 def _safe_div(a: float, b: float, eps: float = 1e-9) -> float:
     return a / (b if abs(b) > eps else eps)
 
 
+def _safe_div_arr(a: np.ndarray, b: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    return a / np.where(np.abs(b) > eps, b, eps)
+
+
 @dataclass
 class PriceActionFeatures:
     """
@@ -20,13 +26,82 @@ class PriceActionFeatures:
     pinbar_body_max: float = 0.35    # body <= 35% of range
     engulf_min_body_ratio: float = 1.05  # current body >= 1.05x prev body
 
+    window_required: int = field(default=2, init=False)
+    _prev: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+
     def compute(self, candles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
         if candles is None or len(candles) < 2:
             return {}
+        return self._pair(candles[-2], candles[-1])
+
+    def compute_all(self, arr: Any, window: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Row i == compute(arr[..i + 1]) (only bars i-1, i matter), vectorized."""
+        o = np.asarray(arr.o, dtype=np.float64)
+        h = np.asarray(arr.h, dtype=np.float64)
+        l = np.asarray(arr.l, dtype=np.float64)
+        c = np.asarray(arr.c, dtype=np.float64)
+        n = len(c)
+        valid = np.arange(n) >= 1
+        if window is not None and int(window) < 2:
+            valid[:] = False
+
+        def _shift(x):
+            return np.concatenate((x[:1], x[:-1])) if n else x
+
+        po, pc = _shift(o), _shift(c)
+
+        rng = np.maximum(h - l, 1e-9)
+        body = np.abs(c - o)
+        upper_wick = h - np.maximum(o, c)
+        lower_wick = np.minimum(o, c) - l
+
+        body_ratio = body / rng
+        upper_wick_ratio = _safe_div_arr(upper_wick, body)
+        lower_wick_ratio = _safe_div_arr(lower_wick, body)
+
+        bull = c > o
+        bear = c < o
+
+        pinbar_bull = (lower_wick_ratio >= self.pinbar_wick_ratio) & (body_ratio <= self.pinbar_body_max) & bull
+        pinbar_bear = (upper_wick_ratio >= self.pinbar_wick_ratio) & (body_ratio <= self.pinbar_body_max) & bear
+
+        prev_body = np.abs(pc - po)
+        engulf_ok = _safe_div_arr(body, np.maximum(prev_body, 1e-9)) >= self.engulf_min_body_ratio
+        bullish_engulf = bull & (pc < po) & (o <= pc) & (c >= po) & engulf_ok
+        bearish_engulf = bear & (pc > po) & (o >= pc) & (c <= po) & engulf_ok
+
+        close_pos = (c - l) / rng
+
+        i64 = np.int64
+        return {
+            "_valid": valid,
+            "bull": bull.astype(i64),
+            "bear": bear.astype(i64),
+            "range": rng,
+            "body": body,
+            "body_ratio": body_ratio,
+            "upper_wick": upper_wick,
+            "lower_wick": lower_wick,
+            "upper_wick_ratio": upper_wick_ratio,
+            "lower_wick_ratio": lower_wick_ratio,
+            "close_pos": close_pos,
+
+            "pinbar_bull": pinbar_bull.astype(i64),
+            "pinbar_bear": pinbar_bear.astype(i64),
+            "bullish_engulf": bullish_engulf.astype(i64),
+            "bearish_engulf": bearish_engulf.astype(i64),
+        }
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        prev, self._prev = self._prev, candle
+        if prev is None:
+            return {}
+        return self._pair(prev, candle)
 
-        prev = candles[-2]
-        cur = candles[-1]
+    def reset(self) -> None:
+        self._prev = None
 
+    def _pair(self, prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
         o = float(cur["o"]); h = float(cur["h"]); l = float(cur["l"]); c = float(cur["c"])
         po = float(prev["o"]); ph = float(prev["h"]); pl = float(prev["l"]); pc = float(prev["c"])
 
@@ -1,10 +1,14 @@
 # brain/feature/volume.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Sequence
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
 import math
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 
 def _mean(xs):
     return sum(xs) / max(len(xs), 1)
@@ -18,6 +22,39 @@ def _std(xs):
     return math.sqrt(max(var, 0.0))
 
 
+def _rolling_mean_std(x: np.ndarray, k: int, chunk: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """mean / sample std of every length-k window of x (chunked to bound temporaries)."""
+    win = sliding_window_view(x, k)
+    n = win.shape[0]
+    mean = np.empty(n, dtype=np.float64)
+    std = np.zeros(n, dtype=np.float64)
+    for a in range(0, n, chunk):
+        blk = win[a:a + chunk]
+        mean[a:a + chunk] = blk.mean(axis=1)
+        if k >= 2:
+            std[a:a + chunk] = blk.std(axis=1, ddof=1)
+    return mean, std
+
+
+def _welford_add(n: int, mean: float, m2: float, x: float) -> Tuple[int, float, float]:
+    n += 1
+    d = x - mean
+    mean += d / n
+    m2 += d * (x - mean)
+    return n, mean, m2
+
+
+def _welford_remove(n: int, mean: float, m2: float, x: float) -> Tuple[int, float, float]:
+    if n <= 1:
+        return 0, 0.0, 0.0
+    new_mean = mean - (x - mean) / (n - 1)
+    m2 -= (x - mean) * (x - new_mean)
+    # cancellation residue after removing an outlier: treat as flat history
+    if m2 <= 1e-14 * new_mean * new_mean * (n - 1):
+        m2 = 0.0
+    return n - 1, new_mean, m2
+
+
 @dataclass
 class VolumeFeatures:
     """
@@ -27,6 +64,19 @@ class VolumeFeatures:
     name: str = "vol"
     lookback: int = 50
     z_clip: float = 10.0
+    # sliding Welford drifts slowly; recompute exactly every N updates
+    resync_every: int = 4096
+
+    _vols: Deque[Optional[float]] = field(default_factory=deque, init=False, repr=False)
+    _agg: Tuple[int, float, float] = field(default=(0, 0.0, 0.0), init=False, repr=False)
+    _seen: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.reset()
+
+    @property
+    def window_required(self) -> int:
+        return max(int(self.lookback), 2)
 
     def compute(self, candles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
         if candles is None or len(candles) < 2:
@@ -47,7 +97,93 @@ class VolumeFeatures:
         last_v = float(vols[-1])
         m = _mean(vols[:-1])  # baseline from history excluding current
         s = _std(vols[:-1])
+        return self._features(last_v, m, s)
+
+    def compute_all(self, arr: Any, window: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Row i == compute(arr[max(0, i + 1 - window) : i + 1]). Full-baseline rows
+        use strided rolling mean/std (equal to compute() up to float rounding);
+        the short warm-up rows go through the scalar helpers.
+        """
+        n = len(arr.c)
+        if arr.v is None:
+            v = np.zeros(n, dtype=np.float64)
+            k = 0  # no volume -> no rows
+        else:
+            v = np.asarray(arr.v, dtype=np.float64)
+            w = n if window is None else max(int(window), 0)
+            k = min(int(self.lookback), w)  # bars in the volume window (incl. current)
+
+        m = np.zeros(n, dtype=np.float64)
+        s = np.zeros(n, dtype=np.float64)
+        valid = np.zeros(n, dtype=bool)
+        if k >= 2 and n >= 2:
+            valid[1:] = True
+            head = min(k - 1, n)
+            for i in range(1, head):
+                base = v[:i].tolist()
+                m[i] = _mean(base)
+                s[i] = _std(base)
+            if n > k - 1:
+                rm, rs = _rolling_mean_std(v[:-1], k - 1)
+                m[k - 1:] = rm
+                s[k - 1:] = rs
+
+        safe_s = np.where(s <= 1e-9, 1.0, s)
+        z = np.where(s <= 1e-9, 0.0, (v - m) / safe_s)
+        z = np.clip(z, -self.z_clip, self.z_clip)
+        safe_m = np.where(np.abs(m) <= 1e-9, 1.0, m)
+        ratio = np.where(np.abs(m) <= 1e-9, 0.0, v / safe_m)
+
+        return {
+            "_valid": valid,
+            "v": v,
+            "v_mean": m,
+            "v_std": s,
+            "v_z": z,
+            "v_ratio": ratio,
+            "v_spike": (z >= 2.0).astype(np.int64),
+        }
+
+    def update(self, candle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        O(1) per bar: Welford mean/M2 over the non-null volumes of the last
+        `lookback` bars, with removal of the bar that slides out.
+        """
+        v = candle.get("v")
+        x = None if v is None else float(v)
+
+        n, mean, m2 = self._agg
+        if len(self._vols) == self._vols.maxlen:
+            old = self._vols.popleft()
+            if old is not None:
+                n, mean, m2 = _welford_remove(n, mean, m2, old)
+        self._vols.append(x)
+        if x is not None:
+            n, mean, m2 = _welford_add(n, mean, m2, x)
+
+        self._seen += 1
+        if self.resync_every > 0 and self._seen % self.resync_every == 0:
+            n, mean, m2 = 0, 0.0, 0.0
+            for y in self._vols:
+                if y is not None:
+                    n, mean, m2 = _welford_add(n, mean, m2, y)
+        self._agg = (n, mean, m2)
+
+        if self._seen < 2 or "v" not in candle or n < 2:
+            return {}
+
+        last_v = next(y for y in reversed(self._vols) if y is not None)
+        bn, bmean, bm2 = _welford_remove(n, mean, m2, last_v)
+        s = math.sqrt(max(bm2 / (bn - 1), 0.0)) if bn >= 2 else 0.0
+        return self._features(last_v, bmean, s)
+
+    def reset(self) -> None:
+        self._vols = deque(maxlen=max(int(self.lookback), 1))
+        self._agg = (0, 0.0, 0.0)
+        self._seen = 0
 
+    def _features(self, last_v: float, m: float, s: float) -> Dict[str, Any]:
         z = 0.0 if s <= 1e-9 else (last_v - m) / s
         # clip to avoid extreme values dominating
         if z > self.z_clip:
@@ -1,10 +1,14 @@
 # brain/journal.py
 from __future__ import annotations
 
+import atexit
 import json
 import os
+import queue
+import threading
+import weakref
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 
 @dataclass
@@ -13,16 +17,36 @@ class JournalEvent:
     payload: Dict[str, Any]
 
 
+def _event(event: Union[JournalEvent, str], payload: Optional[Dict[str, Any]]) -> JournalEvent:
+    # JournalLogger calls append("decision", payload); older callers pass a JournalEvent
+    if isinstance(event, JournalEvent):
+        return event
+    return JournalEvent(type=str(event), payload=dict(payload or {}))
+
+
+def _line(ev: JournalEvent) -> str:
+    return json.dumps({"type": ev.type, **ev.payload}, ensure_ascii=False) + "\n"
+
+
 class Journal:
     def __init__(self, path: Optional[str] = None) -> None:
         self.path = path
 
-    def append(self, event: JournalEvent) -> None:
+    def append(self, event: Union[JournalEvent, str], payload: Optional[Dict[str, Any]] = None) -> JournalEvent:
+        ev = _event(event, payload)
         if not self.path:
-            return
+            return ev
         os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
         with open(self.path, "a", encoding="utf-8") as f:
-            f.write(json.dumps({"type": event.type, **event.payload}, ensure_ascii=False) + "\n")
+            f.write(_line(ev))
+        return ev
+
+    # every append is already on disk; kept so callers can flush any journal
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
 
     # backward compatible helpers
     def log_decision(self, payload: Dict[str, Any]) -> None:
@@ -30,3 +54,201 @@ class Journal:
 
     def log_outcome(self, payload: Dict[str, Any]) -> None:
         self.append(JournalEvent(type="outcome", payload=dict(payload)))
+
+
+# buffered journals with queued lines at interpreter exit
+_LIVE_JOURNALS: "weakref.WeakSet[BufferedJournal]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_journals() -> None:
+    for j in list(_LIVE_JOURNALS):
+        try:
+            j.close()
+        except Exception:
+            pass
+
+
+_STOP = object()
+
+
+class BufferedJournal(Journal):
+    """
+    Journal that keeps the file open and writes from a background thread.
+
+    append() only serializes the event (so later payload mutation cannot leak
+    in) and puts the line on a bounded queue; the writer thread drains it in
+    batches of up to `batch_size` lines with one writelines() + flush().
+
+    fsync:
+      "never" - leave durability to the OS (fastest)
+      "batch" - fsync after every written batch
+      "close" - fsync on flush()/close() only (default)
+    on_full:
+      "block" - append() waits for the writer (backpressure, default)
+      "drop"  - the event is counted in `dropped` and discarded
+    """
+
+    FSYNC_POLICIES = ("never", "batch", "close")
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        max_queue: int = 10_000,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        fsync: str = "close",
+        on_full: str = "block",
+    ) -> None:
+        super().__init__(path)
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}, got {fsync!r}")
+        if on_full not in ("block", "drop"):
+            raise ValueError(f"on_full must be block/drop, got {on_full!r}")
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = max(float(flush_interval), 0.001)
+        self.fsync = fsync
+        self.on_full = on_full
+
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._fh: Optional[Any] = None
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self.dropped = 0
+        self.written = 0
+
+    def append(self, event: Union[JournalEvent, str], payload: Optional[Dict[str, Any]] = None) -> JournalEvent:
+        ev = _event(event, payload)
+        if not self.path:
+            return ev
+        if self._closed:
+            # late events after close(): write through like the plain Journal
+            return Journal.append(self, ev)
+        self._ensure_writer()
+        line = _line(ev)
+        if self.on_full == "drop":
+            try:
+                self._q.put_nowait(line)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            self._q.put(line)
+        return ev
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="JournalWriter", daemon=True)
+                self._writer.start()
+                _LIVE_JOURNALS.add(self)
+
+    def _open(self) -> Any:
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)  # type: ignore[arg-type]
+            self._fh = open(self.path, "a", encoding="utf-8")  # type: ignore[arg-type]
+        return self._fh
+
+    def _run(self) -> None:
+        q = self._q
+        while True:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch: List[str] = []
+            stop = False
+            n_items = 1
+            if item is _STOP:
+                stop = True
+            else:
+                batch.append(item)
+                while len(batch) < self.batch_size:
+                    try:
+                        item = q.get_nowait()
+                    except queue.Empty:
+                        break
+                    n_items += 1
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+            try:
+                if batch:
+                    fh = self._open()
+                    fh.writelines(batch)
+                    fh.flush()
+                    if self.fsync == "batch":
+                        os.fsync(fh.fileno())
+                    self.written += len(batch)
+            except BaseException as e:  # keep draining; surfaced by flush()/close()
+                self._error = e
+            finally:
+                for _ in range(n_items):
+                    q.task_done()
+            if stop:
+                return
+
+    def _raise_pending(self) -> None:
+        err, self._error = self._error, None
+        if err is not None:
+            raise OSError(f"journal write failed: {self.path}") from err
+
+    def flush(self) -> None:
+        """Block until every queued event is written (and fsync'ed unless fsync="never")."""
+        if self._writer is not None:
+            self._q.join()
+        fh = self._fh
+        if fh is not None and self.fsync != "never":
+            try:
+                os.fsync(fh.fileno())
+            except (OSError, ValueError):
+                pass
+        self._raise_pending()
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer and close the file. Safe to call twice."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            t = self._writer
+        if t is not None:
+            self._q.put(_STOP)
+            t.join()
+        # lines queued by an append() racing with close()
+        late: List[str] = []
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                late.append(item)
+            self._q.task_done()
+        try:
+            if late:
+                fh = self._open()
+                fh.writelines(late)
+                fh.flush()
+                self.written += len(late)
+            self.flush()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            _LIVE_JOURNALS.discard(self)
+
+    @property
+    def pending(self) -> int:
+        return self._q.qsize()
+
+    def __enter__(self) -> "BufferedJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,428 @@
+# brain/journal_binary.py
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from brain.journal import Journal, JournalEvent, _event
+
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None  # JSON-encoded frames instead
+
+
+# data file: 8-byte header, then frames of <u32 length><encoded event dict>
+MAGIC = b"XJB1"
+_HEADER = struct.Struct("<4sc3x")
+_FRAME = struct.Struct("<I")
+
+# sidecar <path>.idx: 8-byte header, then one fixed-size entry per frame
+IDX_MAGIC = b"XJI1"
+_IDX_ENTRY = struct.Struct("<QIHBqI")
+IDX_DTYPE = np.dtype([
+    ("off", "<u8"),    # body offset in the data file
+    ("len", "<u4"),    # body length
+    ("type", "<u2"),   # id into names["types"]
+    ("flags", "u1"),   # STEP_* bits
+    ("step", "<i8"),   # event step (valid if flags & STEP_ANY)
+    ("run", "<u4"),    # id into names["runs"] (0 = no run_id)
+])
+assert IDX_DTYPE.itemsize == _IDX_ENTRY.size
+
+STEP_TOP = 1      # step read from the event's data level (ev["data"] or ev)
+STEP_PAYLOAD = 2  # step read from data["payload"] (trade_plot style)
+STEP_ANY = STEP_TOP | STEP_PAYLOAD
+
+
+def _codec_encode(codec: bytes):
+    if codec == b"m":
+        if msgpack is None:
+            raise ImportError("msgpack is required for this journal")
+        return lambda obj: msgpack.packb(obj, use_bin_type=True)
+    return lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _codec_decode(codec: bytes):
+    if codec == b"m":
+        if msgpack is None:
+            raise ImportError("msgpack is required to read this journal")
+        return lambda b: msgpack.unpackb(b, raw=False)
+    return lambda b: json.loads(b.decode("utf-8"))
+
+
+def event_type(ev: Dict[str, Any]) -> str:
+    et = ev.get("type") or ev.get("event") or ev.get("name")
+    return str(et) if et is not None else ""
+
+
+def event_step(ev: Dict[str, Any]) -> Tuple[Optional[int], int]:
+    """(step, STEP_* flag) as the journal readers look it up; (None, 0) if absent."""
+    data = ev.get("data", ev)
+    if not isinstance(data, dict):
+        return None, 0
+    st = data.get("step")
+    if isinstance(st, int):
+        return int(st), STEP_TOP
+    p = data.get("payload")
+    if isinstance(p, dict) and isinstance(p.get("step"), int):
+        return int(p["step"]), STEP_PAYLOAD
+    return None, 0
+
+
+def event_run_id(ev: Dict[str, Any]) -> Optional[str]:
+    data = ev.get("data", ev)
+    if not isinstance(data, dict):
+        return None
+    rid = data.get("run_id")
+    if rid is None and isinstance(data.get("payload"), dict):
+        rid = data["payload"].get("run_id")
+    return str(rid) if rid is not None else None
+
+
+def is_binary_journal(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+class _Names:
+    """type / run_id string tables behind the index ids (<path>.idx.names, JSON)."""
+
+    def __init__(self, types: Optional[List[str]] = None, runs: Optional[List[str]] = None) -> None:
+        self.types: List[str] = list(types or [])
+        self.runs: List[str] = list(runs or [""])
+        self._t = {n: i for i, n in enumerate(self.types)}
+        self._r = {n: i for i, n in enumerate(self.runs)}
+        self.dirty = False
+
+    def type_id(self, name: str) -> int:
+        i = self._t.get(name)
+        if i is None:
+            i = self._t[name] = len(self.types)
+            self.types.append(name)
+            self.dirty = True
+        return i
+
+    def run_id(self, name: Optional[str]) -> int:
+        if name is None:
+            return 0
+        i = self._r.get(name)
+        if i is None:
+            i = self._r[name] = len(self.runs)
+            self.runs.append(name)
+            self.dirty = True
+        return i
+
+    @classmethod
+    def load(cls, path: str) -> Optional["_Names"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                d = json.load(f)
+            return cls(d.get("types"), d.get("runs"))
+        except Exception:
+            return None
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"types": self.types, "runs": self.runs}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self.dirty = False
+
+
+def _entry(names: _Names, off: int, n: int, ev: Dict[str, Any]) -> Tuple[Any, ...]:
+    step, flag = event_step(ev)
+    return (off, n, names.type_id(event_type(ev)), flag, step if step is not None else 0, names.run_id(event_run_id(ev)))
+
+
+def _scan(buf: Any, start: int, decode, names: _Names) -> Tuple[List[Tuple[Any, ...]], int]:
+    """Index frames from byte `start`; returns (entries, end of last complete frame)."""
+    out: List[Tuple[Any, ...]] = []
+    pos, size = start, len(buf)
+    while pos + _FRAME.size <= size:
+        (n,) = _FRAME.unpack_from(buf, pos)
+        body = pos + _FRAME.size
+        if body + n > size:
+            break  # torn frame
+        try:
+            ev = decode(bytes(buf[body:body + n]))
+        except Exception:
+            break
+        out.append(_entry(names, body, n, ev if isinstance(ev, dict) else {}))
+        pos = body + n
+    return out, pos
+
+
+def load_index(path: str, start: int = 0, start_off: Optional[int] = None) -> Tuple[np.ndarray, _Names, bytes, int]:
+    """
+    (entries, names, codec, end) for a binary journal. A missing/short/stale
+    sidecar is completed by scanning the frames it does not cover, so the
+    result always matches the data file (up to its last complete frame).
+
+    start / start_off: only entries from #start on, whose first frame begins
+    at byte start_off (a tailing reader's saved position).
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size or head[:4] != MAGIC:
+            raise ValueError(f"not a binary journal: {path}")
+        codec = _HEADER.unpack(head)[1]
+        size = os.fstat(f.fileno()).st_size
+
+    start = max(int(start), 0)
+    first = _HEADER.size if start == 0 or start_off is None else int(start_off)
+    idx = np.zeros(0, dtype=IDX_DTYPE)
+    names = _Names.load(path + ".idx.names")
+    try:
+        with open(path + ".idx", "rb") as f:
+            if f.read(8)[:4] == IDX_MAGIC:
+                f.seek(8 + start * IDX_DTYPE.itemsize)
+                raw = f.read()
+                k = len(raw) // IDX_DTYPE.itemsize
+                idx = np.frombuffer(raw[: k * IDX_DTYPE.itemsize], dtype=IDX_DTYPE)
+    except OSError:
+        pass
+
+    ok = names is not None and len(idx) > 0
+    if ok:
+        last_end = int(idx["off"][-1]) + int(idx["len"][-1])
+        ok = (
+            int(idx["off"][0]) == first + _FRAME.size
+            and last_end <= size
+            and int(idx["type"].max()) < len(names.types)  # type: ignore[union-attr]
+            and int(idx["run"].max()) < len(names.runs)  # type: ignore[union-attr]
+        )
+    if not ok:
+        idx = np.zeros(0, dtype=IDX_DTYPE)
+        names = names if names is not None else _Names()
+        last_end = first
+
+    if last_end < size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tail, last_end = _scan(mm, last_end, _codec_decode(codec), names)  # type: ignore[arg-type]
+        if tail:
+            idx = np.concatenate([idx, np.array(tail, dtype=IDX_DTYPE)])
+    return idx, names, codec, last_end  # type: ignore[return-value]
+
+
+class BinaryJournal(Journal):
+    """
+    Journal writing length-prefixed binary frames (msgpack when installed,
+    compact JSON otherwise) plus a sidecar index (<path>.idx) with one
+    fixed-size entry per event: offset, length, type id, step, run_id id.
+    Readers (JournalReader) filter the index with NumPy and decode only the
+    frames they need.
+
+    The file stays open; writes go through Python's buffered writer and
+    reach the OS on flush()/close() (or when the buffer fills).
+    """
+
+    def __init__(self, path: Optional[str] = None, *, codec: Optional[str] = None, fsync: bool = False) -> None:
+        super().__init__(path)
+        want = (codec or ("msgpack" if msgpack is not None else "json")).lower()
+        if want not in ("msgpack", "json"):
+            raise ValueError(f"codec must be msgpack/json, got {codec!r}")
+        self.codec = b"m" if want == "msgpack" else b"j"
+        self.fsync = bool(fsync)
+        self._fh: Optional[Any] = None
+        self._ih: Optional[Any] = None
+        self._names = _Names()
+        self._pos = 0
+
+    def _open(self) -> None:
+        p = str(self.path)
+        os.makedirs(os.path.dirname(p) or ".", exist_ok=True)
+        if os.path.exists(p) and os.path.getsize(p) > 0:
+            idx, names, codec, end = load_index(p)
+            self.codec = codec  # keep the file's codec
+            with open(p, "r+b") as f:
+                f.truncate(end)  # drop a torn last frame
+            with open(p + ".idx", "wb") as f:
+                f.write(IDX_MAGIC + b"\0" * 4)
+                f.write(idx.tobytes())
+            self._names = names
+            self._names.save(p + ".idx.names")
+            self._pos = end
+        else:
+            with open(p, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, self.codec))
+            with open(p + ".idx", "wb") as f:
+                f.write(IDX_MAGIC + b"\0" * 4)
+            self._pos = _HEADER.size
+        self._encode = _codec_encode(self.codec)
+        self._fh = open(p, "ab")
+        self._ih = open(p + ".idx", "ab")
+
+    def append(self, event: Union[JournalEvent, str], payload: Optional[Dict[str, Any]] = None) -> JournalEvent:
+        ev = _event(event, payload)
+        if not self.path:
+            return ev
+        self.write_record({"type": ev.type, **ev.payload})
+        return ev
+
+    def write_record(self, rec: Dict[str, Any]) -> None:
+        """Append one already-flattened event dict as is."""
+        if self._fh is None:
+            self._open()
+        body = self._encode(rec)
+        off = self._pos + _FRAME.size
+        self._fh.write(_FRAME.pack(len(body)))  # type: ignore[union-attr]
+        self._fh.write(body)  # type: ignore[union-attr]
+        self._ih.write(_IDX_ENTRY.pack(*_entry(self._names, off, len(body), rec)))  # type: ignore[union-attr]
+        self._pos = off + len(body)
+
+    def flush(self) -> None:
+        if self._fh is None:
+            return
+        # data before index before names: a reader never indexes a missing frame
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._ih.flush()  # type: ignore[union-attr]
+        if self._names.dirty:
+            self._names.save(str(self.path) + ".idx.names")
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        self._fh.close()
+        self._ih.close()  # type: ignore[union-attr]
+        self._fh = self._ih = None
+
+    def __enter__(self) -> "BinaryJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class JournalReader:
+    """
+    Indexed reader for BinaryJournal files.
+
+      r = JournalReader(path)
+      r.counts()                                  # events per type, index only
+      r.select(types=("decision",), step_min=100) # matching index entries
+      r.events(types=("outcome",), run_id="...")  # decoded dicts, file order
+
+    `limit` keeps the first `limit` events of the file before filtering
+    (same meaning as the JSONL readers' journal limit).
+    """
+
+    def __init__(self, path: str, start: int = 0, start_off: Optional[int] = None) -> None:
+        self.path = path
+        self.start = max(int(start), 0)  # index of self.index[0] in the whole journal
+        self.index, self.names, self.codec, self.end = load_index(path, self.start, start_off)
+        self._decode = _codec_decode(self.codec)
+
+    def __len__(self) -> int:
+        return int(len(self.index))
+
+    def type_ids(self, types: Iterable[str]) -> List[int]:
+        wanted = set(types)  # once: a generator would be used up by the first name
+        return [i for i, n in enumerate(self.names.types) if n in wanted]
+
+    def select(
+        self,
+        types: Optional[Iterable[str]] = None,
+        run_id: Optional[str] = None,
+        step_min: Optional[int] = None,
+        step_max: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        idx = self.index if limit is None else self.index[: max(int(limit), 0)]
+        mask = np.ones(len(idx), dtype=bool)
+        if types is not None:
+            mask &= np.isin(idx["type"], self.type_ids(types))
+        if run_id is not None:
+            rid = self.names._r.get(str(run_id))
+            if rid is None:
+                return idx[:0]
+            mask &= idx["run"] == rid
+        if step_min is not None or step_max is not None:
+            mask &= (idx["flags"] & STEP_ANY) != 0
+            if step_min is not None:
+                mask &= idx["step"] >= int(step_min)
+            if step_max is not None:
+                mask &= idx["step"] <= int(step_max)
+        return idx[mask]
+
+    def counts(self, limit: Optional[int] = None) -> Dict[str, int]:
+        idx = self.index if limit is None else self.index[: max(int(limit), 0)]
+        c = np.bincount(idx["type"], minlength=len(self.names.types))
+        return {n: int(c[i]) for i, n in enumerate(self.names.types) if c[i]}
+
+    def decode(self, entries: np.ndarray) -> Iterator[Dict[str, Any]]:
+        if len(entries) == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            dec = self._decode
+            for off, n in zip(entries["off"].tolist(), entries["len"].tolist()):
+                yield dec(mm[off:off + n])
+
+    def events(self, **filters: Any) -> Iterator[Dict[str, Any]]:
+        return self.decode(self.select(**filters))
+
+
+def iter_events(
+    path: str,
+    types: Optional[Iterable[str]] = None,
+    run_id: Optional[str] = None,
+    step_min: Optional[int] = None,
+    step_max: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Events from a binary journal (index seek) or a JSONL journal (full scan,
+    bad lines skipped), with the same filters either way.
+    """
+    if is_binary_journal(path):
+        yield from JournalReader(path).events(
+            types=types, run_id=run_id, step_min=step_min, step_max=step_max, limit=limit,
+        )
+        return
+
+    want = set(types) if types is not None else None
+    seen = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                ev = json.loads(raw)
+            except Exception:
+                continue
+            if limit is not None and seen >= int(limit):
+                break
+            seen += 1
+            if not isinstance(ev, dict):
+                continue
+            if want is not None and event_type(ev) not in want:
+                continue
+            if run_id is not None and event_run_id(ev) != str(run_id):
+                continue
+            if step_min is not None or step_max is not None:
+                st, _ = event_step(ev)
+                if st is None or (step_min is not None and st < step_min) or (step_max is not None and st > step_max):
+                    continue
+            yield ev
+
+
+def convert_jsonl(src: str, dst: str, codec: Optional[str] = None) -> int:
+    """Re-encode a JSONL journal as a BinaryJournal; returns the event count."""
+    n = 0
+    with BinaryJournal(dst, codec=codec) as j:
+        for ev in iter_events(src):
+            j.write_record(ev)
+            n += 1
+    return n
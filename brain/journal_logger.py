@@ -82,7 +82,7 @@ class JournalLogger:
         return self.journal.append("rollback", payload)
         
     def log_heartbeat(self, payload: dict):
-        self._write_event("heartbeat", payload)
+        return self.journal.append("heartbeat", dict(payload))
 
     def log_risk_pause(self, payload: dict):
         ctx = self.get_context()
@@ -98,3 +98,15 @@ class JournalLogger:
         ctx = self.get_context()
         data = {"run_id": ctx.run_id, "strategy_hash": ctx.strategy_hash, **payload}
         return self.journal.append("session_reset", data)
+
+    # ---- buffering hooks (no-ops for the plain Journal) ----
+
+    def flush(self) -> None:
+        fn = getattr(self.journal, "flush", None)
+        if callable(fn):
+            fn()
+
+    def close(self) -> None:
+        fn = getattr(self.journal, "close", None)
+        if callable(fn):
+            fn()
@@ -0,0 +1,117 @@
+# brain/market_view.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+def _readonly(x: np.ndarray) -> np.ndarray:
+    v = x.view()
+    v.flags.writeable = False
+    return v
+
+
+@dataclass(frozen=True, eq=False)
+class MarketView:
+    """
+    Immutable per-step view of the candle window, built once by DecisionEngine
+    and shared through context["market_view"] so experts / RegimeDetector do
+    not each re-extract closes from features["candles"].
+
+    Arrays are read-only float64, oldest -> newest. For dict windows highs /
+    lows are only extracted on first access (most consumers read closes only).
+    """
+    closes: np.ndarray
+    _highs: Optional[np.ndarray] = None
+    _lows: Optional[np.ndarray] = None
+    _src: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def highs(self) -> np.ndarray:
+        if self._highs is None:
+            object.__setattr__(self, "_highs", self._column("h"))
+        return self._highs  # type: ignore[return-value]
+
+    @property
+    def lows(self) -> np.ndarray:
+        if self._lows is None:
+            object.__setattr__(self, "_lows", self._column("l"))
+        return self._lows  # type: ignore[return-value]
+
+    def _column(self, key: str) -> np.ndarray:
+        src = self._src or []
+        try:
+            a = np.array([x.get(key, x["c"]) for x in src], dtype=np.float64)
+        except Exception:
+            a = np.array(self.closes, dtype=np.float64)
+        return _readonly(a)
+
+    def __len__(self) -> int:
+        return int(self.closes.shape[0])
+
+    @property
+    def last(self) -> float:
+        return float(self.closes[-1]) if len(self) else 0.0
+
+    def tail(self, k: int) -> List[float]:
+        """Last k closes as Python floats (same values/order as the legacy list)."""
+        k = int(k)
+        if k <= 0:
+            return []
+        return self.closes[-k:].tolist()
+
+    def mean(self, k: int) -> float:
+        """Mean of the last k closes, summed left to right like sum(list) / k."""
+        xs = self.tail(k)
+        return sum(xs) / float(len(xs)) if xs else 0.0
+
+    def high_low(self, k: int) -> tuple:
+        """(max high, min low) over the last k bars."""
+        k = int(k)
+        if k <= 0 or len(self) == 0:
+            return 0.0, 0.0
+        return float(self.highs[-k:].max()), float(self.lows[-k:].min())
+
+    @classmethod
+    def from_candles(cls, candles: Any) -> Optional["MarketView"]:
+        """
+        Build from columnar candles (anything with .c/.h/.l arrays) or from a
+        list of plain candle dicts with a numeric "c".
+
+        Returns None for anything else (tab-string rows, "close"-keyed dicts,
+        tuples, ...): callers then keep their own legacy parsing, so results
+        never depend on which path was taken.
+        """
+        if candles is None:
+            return None
+
+        cols = [getattr(candles, f, None) for f in ("c", "h", "l")]
+        if all(isinstance(x, np.ndarray) and x.ndim == 1 for x in cols):
+            return cls(*(_readonly(np.asarray(x, dtype=np.float64)) for x in cols))
+
+        if not hasattr(candles, "__len__") or not hasattr(candles, "__iter__"):
+            return None
+
+        try:
+            for x in candles:
+                if type(x) is not dict or "close" in x:
+                    return None
+            closes = np.array([x["c"] for x in candles])
+        except Exception:
+            return None
+        # only real numbers (strings/None would parse differently per caller)
+        if closes.dtype.kind not in "fiub" or closes.ndim != 1:
+            return None
+
+        return cls(_readonly(closes.astype(np.float64, copy=False)), _src=candles)
+
+
+def get_market_view(context: Any) -> Optional[MarketView]:
+    """context["market_view"] if present, else None (experts fall back to candles)."""
+    if isinstance(context, dict):
+        v = context.get("market_view")
+        if isinstance(v, MarketView):
+            return v
+    return None
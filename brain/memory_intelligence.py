@@ -2,10 +2,20 @@
 from __future__ import annotations
 
 class MemoryIntelligence:
-    def evaluate(self, memory_stats: dict) -> float:
+    def __init__(self, recall=None, min_samples: int = 1):
+        # recall: optional kNN layer (brain.similarity_index.SimilarityRecall),
+        # used when the exact-key stats have fewer than min_samples
+        self.recall = recall
+        self.min_samples = int(min_samples)
+
+    def evaluate(self, memory_stats: dict, trade_features: dict | None = None) -> float:
         """
         Return confidence score [0..1] based on past outcomes
         """
+        if self.recall is not None and trade_features is not None:
+            if not memory_stats or memory_stats.get("samples", 0) < self.min_samples:
+                memory_stats = self.recall.get_stats(trade_features)
+
         if not memory_stats:
             return 0.5
 
@@ -17,8 +27,12 @@ class MemoryIntelligence:
         if samples <= 0:
             return 0.5
 
-        # compute winrate safely
-        winrate = wins / max(1, wins + losses)
+        # compute winrate safely; prefer the exact (similarity-weighted) rate
+        # over one rebuilt from rounded win/loss counts
+        if memory_stats.get("win_rate") is not None:
+            winrate = float(memory_stats["win_rate"])
+        else:
+            winrate = wins / max(1, wins + losses)
 
         # simple confidence model (v1 – ổn định, không overfit)
         confidence = (
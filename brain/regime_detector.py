@@ -1,10 +1,13 @@
 # brain/regime_detector.py
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, List, Sequence
 import math
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class RegimeResult:
@@ -15,6 +18,18 @@ class RegimeResult:
 
 
 class RegimeDetector:
+    """
+    Classifies the last `window` closes as trend_up / trend_down / volatile / range.
+
+    - detect(features[, view]): stateless, from features["candles"] (or a MarketView)
+    - update(close):    streaming mode, O(1) per bar; keeps the last closes and
+                        a running sum of abs returns, result equal to detect()
+                        on the same history up to float rounding
+    - detect_series(closes): labels every bar of a history in one pass
+    """
+
+    # update(): re-sum the return window exactly every N bars (bounds running-sum drift)
+    RESUM_EVERY = 4096
 
     def __init__(
         self,
@@ -28,6 +43,14 @@ class RegimeDetector:
         self.window = int(window) if window and window > 2 else 32
         self.min_slope_th = float(min_slope_th)
         self.min_vol_th = float(min_vol_th)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear streaming state (update())."""
+        self._closes: Deque[float] = deque(maxlen=self.window)
+        self._abs_rets: Deque[float] = deque(maxlen=self.window - 1)
+        self._ret_sum = 0.0
+        self._resum_in = self.RESUM_EVERY
 
     def _dprint(self, *args: Any) -> None:
         if self.debug:
@@ -45,6 +68,11 @@ class RegimeDetector:
         if candles is None:
             return closes
 
+        # columnar candles (sim.candle_array.CandleArray): closes already a float array
+        col = getattr(candles, "c", None)
+        if isinstance(col, np.ndarray) and col.ndim == 1:
+            return col[-self.window:].tolist()
+
         try:
             for c in candles:
 
@@ -115,15 +143,99 @@ class RegimeDetector:
     def _clamp(self, x: float, lo: float, hi: float) -> float:
         return max(lo, min(hi, x))
 
-    def detect(self, features: Dict[str, Any]) -> RegimeResult:
+    def detect(self, features: Dict[str, Any], view: Any = None) -> RegimeResult:
+        """view: optional brain.market_view.MarketView of features["candles"]."""
         if not isinstance(features, dict):
             return RegimeResult("unknown", 0.0, 0.0, 0.0)
 
-        candles = features.get("candles")
-        closes = self._extract_closes(candles)
+        if view is not None:
+            closes = view.tail(self.window)
+        else:
+            closes = self._extract_closes(features.get("candles"))
 
         slope, vol = self._compute_slope_vol(closes)
-
+        return self._classify(slope, vol)
+
+    def update(self, close: float) -> RegimeResult:
+        """
+        Streaming detect(): feed closes oldest -> newest, O(1) per bar.
+        vol comes from a running sum of the cached abs returns (add the new
+        one, subtract the one leaving the window), so it equals detect() on
+        the same history up to rounding; an exact re-sum every RESUM_EVERY
+        bars keeps the drift from accumulating.
+        """
+        cur = float(close)
+        if self._closes:
+            prev = self._closes[-1]
+            d = abs(prev) if abs(prev) > 1e-9 else 1.0
+            r = abs((cur - prev) / d)
+            rets = self._abs_rets
+            if len(rets) == rets.maxlen:
+                self._ret_sum -= rets[0]
+            rets.append(r)
+            self._resum_in -= 1
+            if self._resum_in <= 0:
+                self._ret_sum = sum(rets)
+                self._resum_in = self.RESUM_EVERY
+            else:
+                self._ret_sum += r
+        self._closes.append(cur)
+
+        if len(self._closes) < 3:
+            return self._classify(0.0, 0.0)
+
+        first = self._closes[0]
+        denom = abs(first) if abs(first) > 1e-9 else 1.0
+        slope = (cur - first) / denom
+        vol = max(self._ret_sum, 0.0) / len(self._abs_rets)
+        return self._classify(float(slope), float(vol))
+
+    def update_candle(self, candle: Any) -> RegimeResult:
+        closes = self._extract_closes([candle])
+        if not closes:
+            return self._classify(*self._compute_slope_vol(list(self._closes)))
+        return self.update(closes[0])
+
+    def detect_series(self, closes: Any) -> List[RegimeResult]:
+        """
+        RegimeResult for every bar i of a history (window ending at bar i).
+        Accepts a close array/list or anything with a `.c` column.
+
+        Slope and vol are computed with array ops; the return sum is accumulated
+        left to right like detect(), so results match it exactly on Python < 3.12
+        (3.12+ sum() is compensated; vol can then differ in the last bits).
+        """
+        col = getattr(closes, "c", closes)
+        c = np.asarray(col, dtype=np.float64)
+        n = len(c)
+        if n == 0:
+            return []
+        W = self.window
+        idx = np.arange(n)
+
+        # slope vs first close of the window
+        first = c[np.maximum(idx - W + 1, 0)]
+        denom = np.where(np.abs(first) > 1e-9, np.abs(first), 1.0)
+        slope = (c - first) / denom
+
+        # abs returns, zero-padded in front so every row sums W-1 terms in order
+        prev = c[:-1]
+        d = np.where(np.abs(prev) > 1e-9, np.abs(prev), 1.0)
+        padded = np.zeros(n + W - 1, dtype=np.float64)
+        padded[W:] = np.abs((c[1:] - prev) / d)
+        acc = np.zeros(n, dtype=np.float64)
+        for k in range(1, W):
+            acc += padded[k:k + n]
+        count = np.minimum(idx, W - 1)
+        vol = acc / np.maximum(count, 1)
+
+        short = idx < 2
+        slope[short] = 0.0
+        vol[short] = 0.0
+
+        return [self._classify(sl, vo) for sl, vo in zip(slope.tolist(), vol.tolist())]
+
+    def _classify(self, slope: float, vol: float) -> RegimeResult:
         abs_vol = abs(vol)
         abs_slope = abs(slope)
 
@@ -0,0 +1,314 @@
+# brain/similarity_index.py
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class FeatureProjection:
+    """
+    trade_features dict -> fixed float32 vector.
+
+    Values come from the top level, else trade_features["features"] (same
+    lookup as TradeMemory.project). bool -> 0/1; missing / non-numeric ->
+    `default`. Each column is standardised: (v - offset) / scale.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        *,
+        scales: Optional[Dict[str, float]] = None,
+        offsets: Optional[Dict[str, float]] = None,
+        default: float = 0.0,
+    ) -> None:
+        self.fields = tuple(fields)
+        if not self.fields:
+            raise ValueError("fields must not be empty")
+        self.default = float(default)
+        self.offset = np.array([float((offsets or {}).get(f, 0.0)) for f in self.fields], dtype=np.float32)
+        self.scale = np.array([float((scales or {}).get(f, 1.0)) or 1.0 for f in self.fields], dtype=np.float32)
+
+    @property
+    def dim(self) -> int:
+        return len(self.fields)
+
+    def raw(self, features: Dict[str, Any]) -> List[float]:
+        nested = features.get("features")
+        nested = nested if isinstance(nested, dict) else {}
+        out = []
+        for f in self.fields:
+            v = features.get(f, nested.get(f))
+            try:
+                x = float(v)
+            except (TypeError, ValueError):
+                x = self.default
+            out.append(x if math.isfinite(x) else self.default)
+        return out
+
+    def vector(self, features: Dict[str, Any]) -> np.ndarray:
+        return (np.asarray(self.raw(features), dtype=np.float32) - self.offset) / self.scale
+
+    def fit(self, rows: Iterable[Dict[str, Any]]) -> "FeatureProjection":
+        """Set offset/scale to the mean/std of `rows` (std 0 -> 1)."""
+        m = np.asarray([self.raw(r) for r in rows], dtype=np.float64)
+        if m.size:
+            self.offset = m.mean(axis=0).astype(np.float32)
+            sd = m.std(axis=0)
+            self.scale = np.where(sd > 1e-12, sd, 1.0).astype(np.float32)
+        return self
+
+
+def _nearest(x: np.ndarray, c: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    """argmin_j |x_i - c_j|^2 for every row, chunked."""
+    cc = (c * c).sum(axis=1)
+    out = np.empty(x.shape[0], dtype=np.int64)
+    for a in range(0, x.shape[0], chunk):
+        xb = x[a:a + chunk]
+        out[a:a + chunk] = (cc[None, :] - 2.0 * (xb @ c.T)).argmin(axis=1)
+    return out
+
+
+def kmeans(x: np.ndarray, k: int, *, iters: int = 12, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd k-means, initialised from random rows; empty clusters re-seeded."""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    k = max(1, min(int(k), x.shape[0]))
+    c = x[rng.choice(x.shape[0], size=k, replace=False)].copy()
+    for _ in range(int(iters)):
+        a = _nearest(x, c)
+        cnt = np.bincount(a, minlength=k)
+        s = np.zeros_like(c, dtype=np.float64)
+        np.add.at(s, a, x)
+        empty = cnt == 0
+        c = (s / np.maximum(cnt, 1)[:, None]).astype(np.float32)
+        if empty.any():
+            c[empty] = x[rng.choice(x.shape[0], size=int(empty.sum()), replace=False)]
+    return c
+
+
+class IVFIndex:
+    """
+    Bounded inverted-file kNN index (squared L2) over float32 vectors.
+
+    - Storage is a ring of `capacity` slots: once full, each insert replaces
+      the oldest outcome. Every insert gets a sequence number; inverted
+      lists hold sequence numbers and an entry is live while
+      seq[seq % capacity] still equals it (overwritten entries are skipped
+      at query time and compacted away lazily).
+    - Until `train_size` vectors exist, search is brute force. Then `nlist`
+      centroids are fitted with k-means on the stored vectors and every
+      vector goes to the list of its nearest centroid.
+    - search() scans the `nprobe` closest lists (more if they hold < k live
+      entries): cost ~ nlist*dim + (capacity/nlist)*nprobe*dim per query.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        *,
+        capacity: int = 1_000_000,
+        nlist: int = 1024,
+        nprobe: int = 8,
+        train_size: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        self.dim = int(dim)
+        self.capacity = max(int(capacity), 1)
+        self.nlist = max(1, min(int(nlist), self.capacity // 32 or 1))
+        self.nprobe = max(1, min(int(nprobe), self.nlist))
+        self.train_size = min(int(train_size or 32 * self.nlist), self.capacity)
+        self.seed = int(seed)
+
+        self.vecs = np.zeros((self.capacity, self.dim), dtype=np.float32)
+        self.pnl = np.zeros(self.capacity, dtype=np.float32)
+        self.win = np.zeros(self.capacity, dtype=np.bool_)
+        self.seq = np.full(self.capacity, -1, dtype=np.int64)
+        self.list_of = np.full(self.capacity, -1, dtype=np.int32)
+        self.next_seq = 0
+
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._fill = np.zeros(0, dtype=np.int64)
+        self._stale = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return min(self.next_seq, self.capacity)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    # -------- insert --------
+    def add(self, vec: Any, pnl: float, win: bool) -> int:
+        s = self.next_seq
+        slot = s % self.capacity
+        if self.seq[slot] >= 0 and self.list_of[slot] >= 0:
+            self._stale[self.list_of[slot]] += 1
+        self.vecs[slot] = np.asarray(vec, dtype=np.float32).reshape(self.dim)
+        self.pnl[slot] = pnl
+        self.win[slot] = bool(win)
+        self.seq[slot] = s
+        self.next_seq = s + 1
+
+        if self.centroids is not None:
+            cd = ((self.centroids - self.vecs[slot]) ** 2).sum(axis=1)
+            self._append(int(cd.argmin()), slot, s)
+        elif len(self) >= self.train_size:
+            self.train()
+        return s
+
+    def add_batch(self, vecs: Any, pnl: Any, win: Any) -> None:
+        x = np.asarray(vecs, dtype=np.float32).reshape(-1, self.dim)
+        p = np.broadcast_to(np.asarray(pnl, dtype=np.float32), (x.shape[0],))
+        w = np.broadcast_to(np.asarray(win, dtype=np.bool_), (x.shape[0],))
+        i = 0
+        # until trained: one by one (training may trigger mid-batch)
+        while i < x.shape[0] and self.centroids is None:
+            self.add(x[i], float(p[i]), bool(w[i]))
+            i += 1
+        if i >= x.shape[0]:
+            return
+        assign = _nearest(x[i:], self.centroids).tolist()
+        for j, l in enumerate(assign, start=i):
+            s = self.next_seq
+            slot = s % self.capacity
+            if self.seq[slot] >= 0 and self.list_of[slot] >= 0:
+                self._stale[self.list_of[slot]] += 1
+            self.vecs[slot] = x[j]
+            self.pnl[slot] = p[j]
+            self.win[slot] = w[j]
+            self.seq[slot] = s
+            self.next_seq = s + 1
+            self._append(l, slot, s)
+
+    def _append(self, l: int, slot: int, s: int) -> None:
+        self.list_of[slot] = l
+        arr, n = self._lists[l], int(self._fill[l])
+        if n == arr.shape[0]:
+            if self._stale[l] * 2 > n:
+                self._compact(l)
+                arr, n = self._lists[l], int(self._fill[l])
+            if n == arr.shape[0]:
+                arr = np.concatenate([arr, np.empty(max(n, 16), dtype=np.int64)])
+                self._lists[l] = arr
+        arr[n] = s
+        self._fill[l] = n + 1
+
+    def _compact(self, l: int) -> None:
+        live = self._live(self._lists[l][: self._fill[l]])
+        self._lists[l] = np.concatenate([live, np.empty(max(16, live.shape[0]), dtype=np.int64)])
+        self._fill[l] = live.shape[0]
+        self._stale[l] = 0
+
+    def _live(self, seqs: np.ndarray) -> np.ndarray:
+        return seqs[np.take(self.seq, seqs % self.capacity) == seqs]
+
+    def train(self, *, iters: int = 12) -> None:
+        """(Re)fit the centroids on the stored vectors and rebuild all lists."""
+        n = len(self)
+        if n == 0:
+            return
+        slots = np.arange(n)
+        sample = slots
+        if n > 64 * self.nlist:
+            sample = np.random.default_rng(self.seed).choice(slots, size=64 * self.nlist, replace=False)
+        self.centroids = kmeans(self.vecs[sample], self.nlist, iters=iters, seed=self.seed)
+        k = self.centroids.shape[0]
+
+        assign = _nearest(self.vecs[:n], self.centroids)
+        self.list_of[:n] = assign
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(k + 1))
+        seqs = self.seq[:n][order]
+        self._lists = [seqs[bounds[j]:bounds[j + 1]].copy() for j in range(k)]
+        self._fill = np.array([a.shape[0] for a in self._lists], dtype=np.int64)
+        self._stale = np.zeros(k, dtype=np.int64)
+
+    # -------- query --------
+    def search(self, q: Any, k: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, squared distances) of the k nearest live vectors, nearest first."""
+        q = np.asarray(q, dtype=np.float32).reshape(self.dim)
+        k = int(k)
+        if len(self) == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        if self.centroids is None:
+            slots = np.arange(len(self))
+        else:
+            cd = ((self.centroids - q) ** 2).sum(axis=1)
+            nlist = cd.shape[0]
+            nprobe = self.nprobe
+            while True:
+                probe = np.argpartition(cd, nprobe - 1)[:nprobe] if nprobe < nlist else np.arange(nlist)
+                seqs = np.concatenate([self._lists[l][: self._fill[l]] for l in probe.tolist()])
+                if self.next_seq > self.capacity:  # nothing overwritten before the ring wraps
+                    seqs = self._live(seqs)
+                if seqs.shape[0] >= k or nprobe >= nlist:
+                    break
+                nprobe = min(nprobe * 2, nlist)
+            slots = seqs % self.capacity
+
+        diff = np.take(self.vecs, slots, axis=0)
+        diff -= q
+        d2 = np.einsum("ij,ij->i", diff, diff)
+        if d2.shape[0] > k:
+            top = np.argpartition(d2, k - 1)[:k]
+            slots, d2 = slots[top], d2[top]
+        o = np.argsort(d2, kind="stable")
+        return slots[o], d2[o]
+
+
+class SimilarityRecall:
+    """
+    kNN recall over past outcomes, in the stats shape TradeMemory.get_stats
+    returns (so MemoryIntelligence.evaluate can consume it).
+
+    record(snapshot, outcome) projects the features and inserts
+    (pnl, win); get_stats(features) looks up the k nearest stored contexts
+    and returns inverse-distance weighted win rate / avg pnl.
+    """
+
+    def __init__(
+        self,
+        projection: FeatureProjection,
+        index: Optional[IVFIndex] = None,
+        *,
+        k: int = 32,
+        eps: float = 1e-3,
+        **index_kwargs: Any,
+    ) -> None:
+        self.projection = projection
+        self.index = index or IVFIndex(projection.dim, **index_kwargs)
+        self.k = int(k)
+        self.eps = float(eps)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def record(self, snapshot: Dict[str, Any], outcome: Dict[str, Any]) -> None:
+        pnl = float(outcome.get("pnl", 0.0))
+        win = bool(outcome.get("win", pnl > 0))
+        self.index.add(self.projection.vector(snapshot), pnl, win)
+
+    def get_stats(self, trade_features: Dict[str, Any], k: Optional[int] = None) -> Dict[str, Any]:
+        slots, d2 = self.index.search(self.projection.vector(trade_features), k or self.k)
+        n = int(slots.shape[0])
+        if n == 0:
+            return {"avg_pnl": 0.0, "samples": 0, "wins": 0, "losses": 0, "win_rate": 0.0, "mean_dist": 0.0}
+
+        dist = np.sqrt(d2.astype(np.float64))
+        w = 1.0 / (dist + self.eps)
+        w /= w.sum()
+        win_rate = float((w * self.index.win[slots]).sum())
+        wins = int(round(win_rate * n))
+        return {
+            "avg_pnl": float((w * self.index.pnl[slots]).sum()),
+            "samples": n,
+            "wins": wins,
+            "losses": n - wins,
+            "win_rate": win_rate,
+            "mean_dist": float(dist.mean()),
+        }
@@ -1,15 +1,20 @@
 # brain/strategy_evolver.py
 from __future__ import annotations
 
+import inspect
 import random
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, Dict, Any, List, Tuple
+from functools import partial
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 
 from brain.strategy_genome import random_genome, mutate
 from brain.strategy_fitness import compute_fitness
+from brain.strategy_hash import genome_hash
 
 
 EvaluatorFn = Callable[[Dict[str, Any]], Dict[str, Any]]
+ExecutorSpec = Union[None, str, Executor]
 
 
 @dataclass
@@ -18,6 +23,40 @@ class EvolutionResult:
     best_fitness: float
     history_best: List[float]          # best fitness per generation
     history_avg: List[float]           # avg fitness per generation
+    evaluations: int = 0               # evaluator calls (cache misses)
+
+
+def genome_seed(genome: Dict[str, Any], base_seed: int = 0) -> int:
+    """Per-genome RNG seed: depends only on content + base_seed, never on worker/order."""
+    return (int(genome_hash(genome), 16) ^ int(base_seed)) & 0xFFFFFFFF
+
+
+def _accepts_seed(fn: Callable[..., Any]) -> bool:
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "seed" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def _score(evaluator: EvaluatorFn, pass_seed: bool, item: Tuple[Dict[str, Any], int]) -> float:
+    # module level so a ProcessPoolExecutor can pickle it
+    g, seed = item
+    stats = evaluator(g, seed=seed) if pass_seed else evaluator(g)
+    return compute_fitness(stats)
+
+
+def _resolve_executor(executor: ExecutorSpec, max_workers: Optional[int]) -> Tuple[Optional[Executor], bool]:
+    """-> (executor or None for serial, owned: whether evolve() must shut it down)"""
+    if executor is None or executor == "serial":
+        return None, False
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers), True
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=max_workers), True
+    raise ValueError(f"executor must be None/'serial'/'thread'/'process' or an Executor, got {executor!r}")
 
 
 def evolve(
@@ -27,6 +66,11 @@ def evolve(
     elite_k: int = 5,
     mutation_rate: float = 0.10,
     rng: random.Random | None = None,
+    *,
+    executor: ExecutorSpec = None,
+    max_workers: Optional[int] = None,
+    base_seed: int = 0,
+    cache: Optional[Dict[str, float]] = None,
 ) -> EvolutionResult:
     """
     Simple genetic evolution loop (v1):
@@ -35,6 +79,15 @@ def evolve(
       - keep top elite_k
       - refill population by mutating elites
       - repeat for N generations
+
+    Evaluation:
+      - executor: None/"serial" (inline), "thread", "process" (evaluator must
+        be picklable) or an existing Executor (left running).
+      - evaluators taking a `seed` kwarg get genome_seed(g, base_seed), so a
+        stochastic evaluator gives the same fitness for any worker count.
+      - fitness is cached by genome_hash: elites and duplicate children are
+        not re-evaluated. Pass `cache` to share it across calls (only valid
+        while the evaluator's data does not change).
     """
     rng = rng or random.Random()
 
@@ -55,33 +108,57 @@ def evolve(
     history_best: List[float] = []
     history_avg: List[float] = []
 
-    for _gen in range(generations):
-        scored: List[Tuple[float, Dict[str, Any]]] = []
-
-        for g in population:
-            stats = evaluator(g)
-            fit = compute_fitness(stats)
-            scored.append((fit, g))
-
-            if fit > best_fitness:
-                best_fitness = fit
-                best_genome = g
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        fits = [x[0] for x in scored]
-        history_best.append(fits[0])
-        history_avg.append(sum(fits) / len(fits))
-
-        elites = [deepcopy_genome(x[1]) for x in scored[:elite_k]]
-
-        # refill: keep elites, then mutate randomly chosen elite parents
-        new_population: List[Dict[str, Any]] = elites[:]
-        while len(new_population) < population_size:
-            parent = rng.choice(elites)
-            child = mutate(parent, rate=mutation_rate, rng=rng)
-            new_population.append(child)
-
-        population = new_population
+    fitness_cache: Dict[str, float] = cache if cache is not None else {}
+    score = partial(_score, evaluator, _accepts_seed(evaluator))
+    evaluations = 0
+
+    ex, owned = _resolve_executor(executor, max_workers)
+    try:
+        for _gen in range(generations):
+            keys = [genome_hash(g) for g in population]
+
+            # unique cache misses, in population order
+            todo: Dict[str, Dict[str, Any]] = {}
+            for k, g in zip(keys, population):
+                if k not in fitness_cache and k not in todo:
+                    todo[k] = g
+            items = [(g, genome_seed(g, base_seed)) for g in todo.values()]
+            if ex is None:
+                fits_new = [score(it) for it in items]
+            else:
+                # a few chunks per worker: the evaluator is pickled once per chunk
+                workers = getattr(ex, "_max_workers", None) or 1
+                fits_new = list(ex.map(score, items, chunksize=max(1, len(items) // (4 * workers))))
+            fitness_cache.update(zip(todo.keys(), fits_new))
+            evaluations += len(items)
+
+            scored: List[Tuple[float, Dict[str, Any]]] = []
+            for k, g in zip(keys, population):
+                fit = fitness_cache[k]
+                scored.append((fit, g))
+
+                if fit > best_fitness:
+                    best_fitness = fit
+                    best_genome = g
+
+            scored.sort(key=lambda x: x[0], reverse=True)
+            fits = [x[0] for x in scored]
+            history_best.append(fits[0])
+            history_avg.append(sum(fits) / len(fits))
+
+            elites = [deepcopy_genome(x[1]) for x in scored[:elite_k]]
+
+            # refill: keep elites, then mutate randomly chosen elite parents
+            new_population: List[Dict[str, Any]] = elites[:]
+            while len(new_population) < population_size:
+                parent = rng.choice(elites)
+                child = mutate(parent, rate=mutation_rate, rng=rng)
+                new_population.append(child)
+
+            population = new_population
+    finally:
+        if owned and ex is not None:
+            ex.shutdown(wait=True)
 
     assert best_genome is not None
     return EvolutionResult(
@@ -89,6 +166,7 @@ def evolve(
         best_fitness=best_fitness,
         history_best=history_best,
         history_avg=history_avg,
+        evaluations=evaluations,
     )
 
 
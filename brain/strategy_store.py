@@ -31,8 +31,8 @@ class StrategyStore:
             payload = json.load(f)
         return payload.get("genome")
 
-        def save_as(self, genome: Dict[str, Any], path: str, meta: Optional[Dict[str, Any]] = None) -> None:
-            old_path = self.path
+    def save_as(self, genome: Dict[str, Any], path: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        old_path = self.path
         try:
             self.path = path
             self.save(genome, meta=meta)
@@ -2,13 +2,28 @@
 from __future__ import annotations
 
 import os
+import queue
+import random
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 from brain.strategy_store import StrategyStore
 from brain.strategy_evolver import evolve, EvolutionResult
 from brain.strategy_evaluator import StrategyEvaluator
+from brain.strategy_fitness import compute_fitness
+from brain.strategy_policy import StrategyPolicy
 from brain.strategy_safety_guard import StrategySafetyGuard
+from brain.trade_memory import TradeMemory
+
+
+# evolve() settings used by both the inline and the background upgrade
+EVOLVE_KWARGS: Dict[str, Any] = {
+    "generations": 5,
+    "population_size": 20,
+    "elite_k": 5,
+    "mutation_rate": 0.2,
+}
 
 
 @dataclass
@@ -22,6 +37,35 @@ class UpgradeReport:
     new_genome: Dict[str, Any]
 
 
+@dataclass
+class PendingUpgrade:
+    """Evolution result waiting for the next step boundary."""
+    trade_count: int
+    old_genome: Dict[str, Any]
+    old_fitness: float
+    new_genome: Dict[str, Any]
+    new_fitness: float
+    error: Optional[str] = None
+
+
+def _evolve_job(
+    memory: Dict[Any, Dict[str, Any]],
+    evaluator: Any,
+    old_genome: Dict[str, Any],
+    trade_count: int,
+    seed: Optional[int],
+    evolve_kwargs: Dict[str, Any],
+) -> PendingUpgrade:
+    # runs in the worker: only sees the TradeMemory snapshot taken at submit time
+    try:
+        ev = evaluator or StrategyEvaluator(TradeMemory(memory=memory))
+        old_fitness = compute_fitness(ev.evaluate(old_genome))
+        res = evolve(evaluator=ev.evaluate, rng=random.Random(seed), **evolve_kwargs)
+        return PendingUpgrade(trade_count, old_genome, old_fitness, res.best_genome, res.best_fitness)
+    except Exception as e:
+        return PendingUpgrade(trade_count, old_genome, 0.0, {}, 0.0, error=repr(e))
+
+
 @dataclass
 class RollbackReport:
     checked: bool
@@ -39,6 +83,9 @@ class StrategyUpgradeScheduler:
         every_n_trades: int = 50,
         min_improve: float = 0.01,
         previous_path: str = "data/previous_strategy.json",
+        executor=None,
+        max_workers: Optional[int] = None,
+        evaluator=None,
     ):
         self.trade_memory = trade_memory
         self.decision_engine = decision_engine
@@ -47,29 +94,53 @@ class StrategyUpgradeScheduler:
         self.every_n_trades = int(every_n_trades)
         self.min_improve = float(min_improve)
         self.previous_path = previous_path
+        # population evaluation: None (inline) / "thread" / "process" / Executor
+        self.executor = executor
+        self.max_workers = max_workers
+        # anything with evaluate(genome) -> stats, e.g. sim.strategy_replay.ReplayStrategyEvaluator;
+        # default: aggregate TradeMemory stats (genome-blind)
+        self.evaluator = evaluator
 
         self._last_checked_trades = 0
 
-    def maybe_upgrade(self, rng=None) -> UpgradeReport:
-        trade_count, samples = self._get_trade_count_and_samples()
+        # live policy: swapped by reference when an upgrade is applied
+        self.policy = StrategyPolicy(self.store.load() or {})
 
+        # background upgrade (submit_upgrade / poll_upgrade)
+        self._bg: Optional[Executor] = None
+        self._bg_owned = False  # created here (shut down by close()) vs caller's Executor
+        self._bg_future: Optional[Future] = None
+        self._results: "queue.Queue[PendingUpgrade]" = queue.Queue()
+        self._persist: Optional[ThreadPoolExecutor] = None
+
+    def _window_reason(self, trade_count: int, samples: int) -> Optional[str]:
+        """None when an upgrade run is due, else the skip reason."""
         # Guard gate (cooldown + min samples)
         gd = self.guard.can_upgrade(current_trade_count=trade_count, current_samples=samples)
         if not gd.allowed:
-            return UpgradeReport(False, False, gd.reason, 0.0, 0.0, {}, {})
+            return gd.reason
 
         if self.every_n_trades <= 0:
-            return UpgradeReport(False, False, "every_n_trades_disabled", 0.0, 0.0, {}, {})
+            return "every_n_trades_disabled"
 
         if trade_count < self.every_n_trades:
-            return UpgradeReport(False, False, "not_enough_trades_yet", 0.0, 0.0, {}, {})
+            return "not_enough_trades_yet"
 
         if (trade_count // self.every_n_trades) == (self._last_checked_trades // self.every_n_trades):
-            return UpgradeReport(False, False, "no_new_upgrade_window", 0.0, 0.0, {}, {})
+            return "no_new_upgrade_window"
+
+        return None
+
+    def maybe_upgrade(self, rng=None) -> UpgradeReport:
+        trade_count, samples = self._get_trade_count_and_samples()
+
+        reason = self._window_reason(trade_count, samples)
+        if reason is not None:
+            return UpgradeReport(False, False, reason, 0.0, 0.0, {}, {})
 
         self._last_checked_trades = trade_count
 
-        evaluator = StrategyEvaluator(self.trade_memory)
+        evaluator = self.evaluator or StrategyEvaluator(self.trade_memory)
 
         old_genome = self.store.load() or {}
         old_stats = evaluator.evaluate(old_genome)
@@ -77,33 +148,151 @@ class StrategyUpgradeScheduler:
 
         res: EvolutionResult = evolve(
             evaluator=evaluator.evaluate,
-            generations=5,
-            population_size=20,
-            elite_k=5,
-            mutation_rate=0.2,
             rng=rng,
+            executor=self.executor,
+            max_workers=self.max_workers,
+            **EVOLVE_KWARGS,
         )
         new_genome = res.best_genome
         new_fitness = res.best_fitness
 
         if new_fitness >= (old_fitness + self.min_improve):
-            # backup old
-            os.makedirs(os.path.dirname(self.previous_path), exist_ok=True)
-            self.store.save_as(old_genome, self.previous_path, meta={"fitness": old_fitness})
+            self.policy = StrategyPolicy(new_genome)
+            # mark upgraded for rollback logic
+            self.guard.mark_upgraded(trade_count, old_fitness, new_fitness)
+            self._save_upgrade(old_genome, old_fitness, new_genome, new_fitness)
+            return UpgradeReport(True, True, "upgraded", old_fitness, new_fitness, old_genome, new_genome)
 
-            # save new
+        return UpgradeReport(True, False, "not_improved_enough", old_fitness, new_fitness, old_genome, new_genome)
+
+    def _save_upgrade(self, old_genome, old_fitness, new_genome, new_fitness) -> None:
+        self._write_files(old_genome, old_fitness)
+
+        # save new
+        self.store.save(new_genome, meta={"fitness": new_fitness})
+
+        # reload live engine
+        self._reload_engine()
+
+    def _write_files(self, old_genome, old_fitness, new_genome=None, new_fitness=0.0) -> None:
+        # backup old (+ save new when given); file writes only, safe on the persist thread
+        os.makedirs(os.path.dirname(self.previous_path) or ".", exist_ok=True)
+        self.store.save_as(old_genome, self.previous_path, meta={"fitness": old_fitness})
+        if new_genome is not None:
             self.store.save(new_genome, meta={"fitness": new_fitness})
 
-            # mark upgraded for rollback logic
-            self.guard.mark_upgraded(trade_count, old_fitness, new_fitness)
+    def _reload_engine(self) -> None:
+        de = self.decision_engine
+        if hasattr(de, "strategy_policy"):
+            # engine holds a policy: hand the new one over by reference
+            de.strategy_policy = self.policy
+        elif hasattr(de, "reload_strategy"):
+            de.reload_strategy()
+
+    # -----------------------------
+    # Background upgrade
+    # -----------------------------
+    def submit_upgrade(self, seed: Optional[int] = None, executor: Any = "process") -> UpgradeReport:
+        """
+        Start evolution in a worker on a snapshot of TradeMemory and return at
+        once. The result is picked up by poll_upgrade() at a step boundary.
+
+        executor: "process" (default), "thread", or an Executor. A custom
+        evaluator must be picklable for "process".
+        """
+        if self._bg_future is not None and not self._bg_future.done():
+            return UpgradeReport(False, False, "upgrade_in_progress", 0.0, 0.0, {}, {})
 
-            # reload live engine
-            if hasattr(self.decision_engine, "reload_strategy"):
-                self.decision_engine.reload_strategy()
+        trade_count, samples = self._get_trade_count_and_samples()
+        reason = self._window_reason(trade_count, samples)
+        if reason is not None:
+            return UpgradeReport(False, False, reason, 0.0, 0.0, {}, {})
+        self._last_checked_trades = trade_count
 
-            return UpgradeReport(True, True, "upgraded", old_fitness, new_fitness, old_genome, new_genome)
+        mem = getattr(self.trade_memory, "memory", None)
+        snapshot = {k: dict(v) for k, v in mem.items()} if isinstance(mem, dict) else {}
+        old_genome = self.store.load() or {}
 
-        return UpgradeReport(True, False, "not_improved_enough", old_fitness, new_fitness, old_genome, new_genome)
+        if self._bg is None:
+            if isinstance(executor, Executor):
+                self._bg, self._bg_owned = executor, False
+            elif executor == "thread":
+                self._bg, self._bg_owned = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StrategyUpgrade"), True
+            elif executor == "process":
+                self._bg, self._bg_owned = ProcessPoolExecutor(max_workers=1), True
+            else:
+                raise ValueError(f"executor must be 'process', 'thread' or an Executor, got {executor!r}")
+
+        fut = self._bg.submit(_evolve_job, snapshot, self.evaluator, old_genome, trade_count, seed, dict(EVOLVE_KWARGS))
+        fut.add_done_callback(self._on_done)
+        self._bg_future = fut
+        return UpgradeReport(True, False, "submitted", 0.0, 0.0, old_genome, {})
+
+    def _on_done(self, fut: Future) -> None:
+        try:
+            self._results.put(fut.result())
+        except Exception as e:  # worker died / cancelled
+            self._results.put(PendingUpgrade(self._last_checked_trades, {}, 0.0, {}, 0.0, error=repr(e)))
+
+    def poll_upgrade(self) -> Optional[UpgradeReport]:
+        """
+        Call at a step boundary. None if no result is waiting; otherwise the
+        guard is re-checked against the current trade count and, if the new
+        genome still wins by min_improve, the policy is swapped here, in the
+        caller's thread: handed to decision_engine.strategy_policy, or via
+        reload_strategy() (the store is then saved first so the engine reads
+        the new genome). Only the remaining file writes go to a background thread.
+        """
+        try:
+            res = self._results.get_nowait()
+        except queue.Empty:
+            return None
+
+        if res.error is not None:
+            return UpgradeReport(True, False, f"worker_error: {res.error}", 0.0, 0.0, res.old_genome, {})
+
+        trade_count, samples = self._get_trade_count_and_samples()
+        gd = self.guard.can_upgrade(current_trade_count=trade_count, current_samples=samples)
+        if not gd.allowed:
+            return UpgradeReport(True, False, gd.reason, res.old_fitness, res.new_fitness, res.old_genome, res.new_genome)
+
+        if res.new_fitness < (res.old_fitness + self.min_improve):
+            return UpgradeReport(True, False, "not_improved_enough", res.old_fitness, res.new_fitness, res.old_genome, res.new_genome)
+
+        self.policy = StrategyPolicy(res.new_genome)
+        self.guard.mark_upgraded(trade_count, res.old_fitness, res.new_fitness)
+
+        de = self.decision_engine
+        if not hasattr(de, "strategy_policy") and hasattr(de, "reload_strategy"):
+            # reload_strategy() re-reads the store: it must hold the new genome first
+            self.store.save(res.new_genome, meta={"fitness": res.new_fitness})
+            new_genome = None
+        else:
+            new_genome = res.new_genome
+        self._reload_engine()
+
+        if self._persist is None:
+            self._persist = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StrategyPersist")
+        self._persist.submit(self._write_files, res.old_genome, res.old_fitness, new_genome, res.new_fitness)
+        return UpgradeReport(True, True, "upgraded", res.old_fitness, res.new_fitness, res.old_genome, res.new_genome)
+
+    @property
+    def upgrade_pending(self) -> bool:
+        return (self._bg_future is not None and not self._bg_future.done()) or not self._results.empty()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop the background workers (pending store writes are finished first).
+        An Executor passed to submit_upgrade() belongs to the caller and is
+        left running.
+        """
+        if self._persist is not None:
+            self._persist.shutdown(wait=True)
+            self._persist = None
+        if self._bg is not None:
+            if self._bg_owned:
+                self._bg.shutdown(wait=wait, cancel_futures=not wait)
+            self._bg, self._bg_owned = None, False
 
     def maybe_rollback(self, observed_fitness: float) -> RollbackReport:
         trade_count, _samples = self._get_trade_count_and_samples()
@@ -117,9 +306,9 @@ class StrategyUpgradeScheduler:
             return RollbackReport(True, False, "no_previous_strategy")
 
         self.store.save(prev, meta={"rollback": True})
+        self.policy = StrategyPolicy(prev)
 
-        if hasattr(self.decision_engine, "reload_strategy"):
-            self.decision_engine.reload_strategy()
+        self._reload_engine()
 
         return RollbackReport(True, True, "rolled_back")
 
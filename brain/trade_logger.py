@@ -1,60 +1,204 @@
-import pandas as pd
+import atexit
+import csv
+import glob
 import os
 
+import pandas as pd
+
 LOG_FILE = "trade_log.csv"
 
 
 # =============================
-# INIT LOGGER
+# SCHEMA
 # =============================
-def init_logger():
-
-    if not os.path.exists(LOG_FILE):
-
-        df = pd.DataFrame(columns=[
-
-            # ===== Trade Info =====
-            "ticket",
-            "time",
-            "symbol",
-            "session",
-
-            # ===== Market Context =====
-            "h1_bias",
-            "m5_structure",
-            "price_vs_ema",
-            "volume_ratio",
+LOG_COLUMNS = [
+
+    # ===== Trade Info =====
+    "ticket",
+    "time",
+    "symbol",
+    "session",
+
+    # ===== Market Context =====
+    "h1_bias",
+    "m5_structure",
+    "price_vs_ema",
+    "volume_ratio",
+
+    "distance_to_ob",
+    "distance_to_fvg",
+    "volatility",
+
+    # ===== Signal Validation =====
+    "ob_valid",
+    "fvg_valid",
+    "volume_confirm",
+    "candle_pattern",
+
+    # ===== Entry Info =====
+    "entry_type",
+    "entry_price",
+    "sl_price",
+    "tp_price",
+
+    # ===== Trade Outcome =====
+    "outcome",          # win / loss / breakeven
+    "result_R",         # R result (strategy_validation / MemoryAnalyzer)
+    "rr_realized",      # R result
+    "hold_minutes",
+    "exit_price",
+    "exit_time",
+
+    # ===== Performance Tracking =====
+    "equity",
+    "peak_equity",
+    "max_drawdown"
+]
 
-            "distance_to_ob",
-            "distance_to_fvg",
-            "volatility",
 
-            # ===== Signal Validation =====
-            "ob_valid",
-            "fvg_valid",
-            "volume_confirm",
-            "candle_pattern",
+# =============================
+# APPEND-ONLY WRITER
+# =============================
+def _cell(v):
+    # NaN → ô trống (giống pandas.to_csv)
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    return v
+
+
+class TradeLogWriter:
+    """
+    Append-only CSV writer with a fixed column order.
+
+    - Schema: LOG_COLUMNS for a new file; an existing file keeps its own
+      header (older logs may have extra columns). Missing keys are written
+      empty, keys outside the schema are ignored.
+    - Rows are buffered and appended every `flush_every` rows, on flush()
+      and at interpreter exit: one trade costs O(1) I/O instead of a full
+      read + rewrite.
+    - rollover_rows: once the live CSV holds that many rows it is moved to
+      a numbered part (<stem>.partNNNN.parquet when a Parquet engine is
+      installed, else .csv) and a fresh CSV is started. read_trade_log()
+      reads parts + live file back as one DataFrame.
+    """
+
+    def __init__(self, path=LOG_FILE, columns=None, flush_every=64, rollover_rows=None):
+        self.path = path
+        self.flush_every = max(int(flush_every), 1)
+        self.rollover_rows = int(rollover_rows) if rollover_rows else None
+        self._buf = []
+        self._rows = None   # rows in the live CSV (counted lazily)
+        self.columns = list(columns or LOG_COLUMNS)
+        self._init_file()
+
+    def _init_file(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "r", encoding="utf-8", newline="") as f:
+                header = next(csv.reader(f), None)
+            if header:
+                self.columns = header
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(self.columns)
+        self._rows = 0
+
+    def write(self, data_dict):
+        self._buf.append([_cell(data_dict.get(c)) for c in self.columns])
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buf:
+            return
+        if not os.path.exists(self.path):
+            self._init_file()
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(self._buf)
+        if self._rows is not None:
+            self._rows += len(self._buf)
+        self._buf = []
+        if self.rollover_rows:
+            self._maybe_rollover()
+
+    def _count_rows(self):
+        with open(self.path, "rb") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    def _maybe_rollover(self):
+        if self._rows is None:
+            self._rows = self._count_rows()
+        if self._rows < self.rollover_rows:
+            return
+
+        stem, _ = os.path.splitext(self.path)
+        k = len(part_paths(self.path))
+        df = pd.read_csv(self.path)
+        try:
+            df.to_parquet(f"{stem}.part{k:04d}.parquet", index=False)
+            os.remove(self.path)
+        except ImportError:
+            # không có pyarrow/fastparquet → giữ CSV part
+            os.replace(self.path, f"{stem}.part{k:04d}.csv")
+
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(self.columns)
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+
+
+def part_paths(path=LOG_FILE):
+    stem, _ = os.path.splitext(path)
+    parts = glob.glob(glob.escape(stem) + ".part*.parquet") + glob.glob(glob.escape(stem) + ".part*.csv")
+    return sorted(parts, key=lambda p: os.path.basename(p).split(".part")[-1])
+
+
+def read_trade_log(path=LOG_FILE):
+    """Rolled-over parts + live CSV as one DataFrame (oldest first)."""
+    w = _WRITERS.get(path)
+    if w is not None:
+        w.flush()
+    frames = []
+    for p in part_paths(path):
+        frames.append(pd.read_parquet(p) if p.endswith(".parquet") else pd.read_csv(p))
+    if os.path.exists(path):
+        frames.append(pd.read_csv(path))
+    if not frames:
+        return pd.DataFrame(columns=LOG_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+_WRITERS = {}
+
+
+def get_writer(path=None, **kwargs):
+    path = path or LOG_FILE
+    w = _WRITERS.get(path)
+    if w is None:
+        w = _WRITERS[path] = TradeLogWriter(path, **kwargs)
+    return w
+
+
+@atexit.register
+def flush_trade_log():
+    for w in list(_WRITERS.values()):
+        try:
+            w.flush()
+        except Exception:
+            pass
 
-            # ===== Entry Info =====
-            "entry_type",
-            "entry_price",
-            "sl_price",
-            "tp_price",
 
-            # ===== Trade Outcome =====
-            "outcome",          # win / loss / breakeven
-            "rr_realized",      # R result
-            "hold_minutes",
-            "exit_price",
-            "exit_time",
+# =============================
+# INIT LOGGER
+# =============================
+def init_logger():
 
-            # ===== Performance Tracking =====
-            "equity",
-            "peak_equity",
-            "max_drawdown"
-        ])
+    w = get_writer(LOG_FILE)
 
-        df.to_csv(LOG_FILE, index=False)
+    if not os.path.exists(LOG_FILE):
+        w._init_file()
 
 
 # =============================
@@ -65,15 +209,7 @@ def log_trade(data_dict):
     if not os.path.exists(LOG_FILE):
         init_logger()
 
-    df = pd.read_csv(LOG_FILE)
-
-    # đảm bảo snapshot có đủ key
-    for col in df.columns:
-        if col not in data_dict:
-            data_dict[col] = None
-
-    df = pd.concat([df, pd.DataFrame([data_dict])], ignore_index=True)
-
-    df.to_csv(LOG_FILE, index=False)
+    # append 1 dòng theo schema cố định (không đọc lại cả file)
+    get_writer(LOG_FILE).write(data_dict)
 
     print("Trade logged")
@@ -1,7 +1,15 @@
 # brain/trade_memory.py
 from __future__ import annotations
+import hashlib
+import math
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+# projection used when key_fields=DEFAULT_KEY_FIELDS is asked for
+DEFAULT_KEY_FIELDS = ("regime", "trend_state", "volatility_state", "v_z")
+DEFAULT_BINS = {"v_z": 0.5}
 
 
 def _freeze(x: Any) -> Any:
@@ -15,16 +23,91 @@ def _freeze(x: Any) -> Any:
     return x
 
 
+def key_hash(values: Tuple[Any, ...]) -> int:
+    """Stable 63-bit key (same across processes, unlike hash() on str)."""
+    d = hashlib.blake2b(repr(values).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(d, "little") >> 1
+
+
 @dataclass
 class TradeMemory:
     """
     Aggregated memory for outcomes by a snapshot key.
     Each entry:
       {"wins": int, "losses": int, "total_pnl": float, "samples": int}
+
+    Key modes:
+      - key_fields=None (default): the whole trade_features dict, frozen
+        (legacy; unbounded if features carry a candles window)
+      - key_fields=(...): only those fields (top level, else inside
+        trade_features["features"]); numbers listed in `bins` are floored to
+        the bin width; the tuple is hashed to an int (key_hash).
+    Bounds (any mode):
+      - capacity: max entries, least recently recorded evicted first
+        (get_stats is a plain O(1) lookup and does not reorder)
+      - ttl: entries not touched for `ttl` records are dropped
+    Bounded mode stays opt-in: the runners (ShadowRunner, PaperTradingLoop,
+    OutcomeLearner) take the TradeMemory their caller built, and memories
+    saved by CoreStateManager are keyed by the full frozen dict, which a
+    key_fields memory would no longer find. Long-running callers should build
+    TradeMemory(key_fields=DEFAULT_KEY_FIELDS, capacity=...) themselves.
     """
     memory: Dict[Any, Dict[str, Any]] = field(default_factory=dict)
+    key_fields: Optional[Sequence[str]] = None
+    bins: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BINS))
+    capacity: Optional[int] = None
+    ttl: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.key_fields is not None:
+            self.key_fields = tuple(self.key_fields)
+        self._clock = 0
+        self._touched: Dict[Any, int] = {}
+        self._sweep_at = 0
+        self.evicted = 0
+        self._adopt(self.memory)
+
+    # -------- bounded / indexed mode --------
+    @property
+    def bounded(self) -> bool:
+        return self.key_fields is not None or self.capacity is not None or self.ttl is not None
+
+    def _adopt(self, mem: Any) -> None:
+        # (re)wrap a dict assigned from outside (e.g. CoreStateManager.load_into)
+        if not isinstance(mem, dict):
+            mem = {}
+        if self.bounded:
+            if self.key_fields is not None:
+                # JSON round trip turns int keys into str
+                mem = {(int(k) if isinstance(k, str) and k.isdigit() else k): v for k, v in mem.items()}
+            mem = OrderedDict(mem)
+            self._touched = {k: self._clock for k in mem}
+        self.memory = mem
+        self._owned = mem
+        self._evict()
+
+    def _mem(self) -> Dict[Any, Dict[str, Any]]:
+        if self.memory is not self._owned:
+            self._adopt(self.memory)
+        return self.memory
+
+    def project(self, trade_features: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Values of key_fields, binned, in key_fields order (None if missing)."""
+        nested = trade_features.get("features")
+        nested = nested if isinstance(nested, dict) else {}
+        out = []
+        for f in self.key_fields or ():
+            v = trade_features.get(f, nested.get(f))
+            w = self.bins.get(f)
+            if w and isinstance(v, (int, float)) and not isinstance(v, bool):
+                fv = float(v)
+                v = int(math.floor(fv / w)) if math.isfinite(fv) else None
+            out.append(_freeze(v))
+        return tuple(out)
 
     def build_key(self, trade_features: Dict[str, Any]) -> Any:
+        if self.key_fields is not None:
+            return key_hash(self.project(trade_features))
         # Use full trade_features as snapshot key (stable + hashable)
         return _freeze(trade_features)
 
@@ -32,13 +115,43 @@ class TradeMemory:
     def _build_key(self, trade_features: Dict[str, Any]) -> Any:
         return self.build_key(trade_features)
 
+    def _touch(self, key: Any) -> None:
+        self._clock += 1
+        if not self.bounded:
+            return
+        self.memory.move_to_end(key)  # type: ignore[attr-defined]
+        self._touched[key] = self._clock
+        self._evict()
+
+    def _evict(self) -> None:
+        mem = self.memory
+        if not self.bounded or not mem:
+            return
+        if self.capacity is not None:
+            while len(mem) > max(int(self.capacity), 1):
+                k, _ = mem.popitem(last=False)  # type: ignore[call-arg]
+                self._touched.pop(k, None)
+                self.evicted += 1
+        # ttl sweep is amortized: at most once per ttl/4 records
+        if self.ttl is not None and self._clock >= self._sweep_at:
+            self._sweep_at = self._clock + max(int(self.ttl) // 4, 1)
+            cutoff = self._clock - int(self.ttl)
+            # LRU order == last-touch order: stale entries are at the front
+            while mem:
+                k = next(iter(mem))
+                if self._touched.get(k, 0) > cutoff:
+                    break
+                del mem[k]
+                self._touched.pop(k, None)
+                self.evicted += 1
+
+    # -------- stats --------
     def get_stats(self, trade_features: Dict[str, Any]) -> Dict[str, Any]:
         # Backward compat: if loaded old data where memory became list, fix it
-        if not isinstance(self.memory, dict):
-            self.memory = {}
+        mem = self._mem()
 
         key = self.build_key(trade_features)
-        data = self.memory.get(key)
+        data = mem.get(key)
         if not data or data.get("samples", 0) <= 0:
             return {"avg_pnl": 0.0, "samples": 0, "wins": 0, "losses": 0}
 
@@ -56,15 +169,14 @@ class TradeMemory:
         }
 
     def record(self, snapshot: Dict[str, Any], outcome: Dict[str, Any]) -> None:
-        if not isinstance(self.memory, dict):
-            self.memory = {}
+        mem = self._mem()
 
         key = self.build_key(snapshot)
 
-        entry = self.memory.get(key)
+        entry = mem.get(key)
         if entry is None:
             entry = {"wins": 0, "losses": 0, "total_pnl": 0.0, "samples": 0}
-            self.memory[key] = entry
+            mem[key] = entry
 
         pnl = float(outcome.get("pnl", 0.0))
         win = bool(outcome.get("win", pnl > 0))
@@ -75,3 +187,9 @@ class TradeMemory:
             entry["wins"] += 1
         else:
             entry["losses"] += 1
+
+        self._touch(key)
+
+    # OutcomeLearner calls update(trade_features, pnl)
+    def update(self, trade_features: Dict[str, Any], pnl: float) -> None:
+        self.record(trade_features, {"pnl": pnl})
@@ -0,0 +1,249 @@
+# brain/weight_log.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from brain.weight_store import WeightStore, _atomic_write_text
+
+
+_BASE_RE = re.compile(r"^base_(\d+)\.json$")
+_WAL_RE = re.compile(r"^wal_(\d+)\.jsonl$")
+
+
+def _dumps(obj: Any) -> str:
+    # compact + float repr round-trips exactly
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def apply_record(ws: WeightStore, rec: Dict[str, Any]) -> None:
+    """Re-run one logged operation on ws (replay side of WeightStore._log_op)."""
+    op = rec.get("op")
+    if op == "update":
+        ws.update(
+            rec["expert"], rec["regime"], rec["reward"],
+            lr=rec.get("lr", 0.05),
+            autosave=False,
+            apply_decay=bool(rec.get("decay", 1)),
+            clamp=bool(rec.get("clamp", 1)),
+            normalize=bool(rec.get("normalize", 1)),
+        )
+    elif op == "update_weight":
+        ws.update_weight(rec["bucket"], rec["key"], rec["delta"], lr=rec.get("lr", 0.05))
+    elif op == "set":
+        ws.set(rec["bucket"], rec["key"], rec["value"])
+    elif op == "decay":
+        ws.apply_decay()
+    elif op == "clamp":
+        ws.clamp_all()
+    elif op == "normalize":
+        ws.normalize_bucket(rec["bucket"])
+
+
+class WeightLog:
+    """
+    Append-only write-ahead log for WeightStore.
+
+    Directory layout:
+      base_<seq>.json   full weights after op #seq (written at compaction, atomic)
+      wal_<seq>.jsonl   ops seq+1, seq+2, ... one compact JSON object per line
+
+    Every logged op is one short line (flushed, optionally fsync'ed), so an
+    update costs an append instead of a full-file rewrite. After
+    `compact_every` ops (or on WeightStore.maybe_snapshot) the current state
+    becomes a new base and a new WAL segment starts. The last `keep_bases`
+    bases and their segments are kept: any point in that range can be
+    rebuilt with store_at(ts=... / seq=...).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        compact_every: int = 10_000,
+        keep_bases: int = 3,
+        fsync: bool = False,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compact_every = max(int(compact_every), 1)
+        self.keep_bases = max(int(keep_bases), 1)
+        self.fsync = bool(fsync)
+
+        self._lock = threading.Lock()
+        self._fh: Optional[Any] = None
+        self.seq = 0          # last op seq written
+        self.base_seq = -1    # seq of the newest base (-1: none yet)
+        self._open_tail()
+
+    # -----------------------------
+    # Files
+    # -----------------------------
+    def _scan(self, rx: "re.Pattern[str]") -> List[Tuple[int, Path]]:
+        out = []
+        for p in self.root.iterdir():
+            m = rx.match(p.name)
+            if m:
+                out.append((int(m.group(1)), p))
+        out.sort()
+        return out
+
+    def bases(self) -> List[Tuple[int, Path]]:
+        return self._scan(_BASE_RE)
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        return self._scan(_WAL_RE)
+
+    def _base_path(self, seq: int) -> Path:
+        return self.root / f"base_{seq:012d}.json"
+
+    def _wal_path(self, seq: int) -> Path:
+        return self.root / f"wal_{seq:012d}.jsonl"
+
+    def _open_tail(self) -> None:
+        """Find the last seq on disk; cut a torn last line (crash mid-append)."""
+        bases = self.bases()
+        self.base_seq = bases[-1][0] if bases else -1
+        self.seq = max(self.base_seq, 0)
+        segs = self.segments()
+        if not segs:
+            return
+        start, path = segs[-1]
+        self.seq = max(self.seq, start)
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break
+                self.seq = max(self.seq, int(rec.get("seq", self.seq)))
+                good += len(line)
+        if good != path.stat().st_size:
+            with open(path, "r+b") as f:
+                f.truncate(good)
+
+    def _writer(self) -> Any:
+        if self._fh is None:
+            start = self.base_seq if self.base_seq >= 0 else 0
+            self._fh = open(self._wal_path(start), "a", encoding="utf-8")
+        return self._fh
+
+    # -----------------------------
+    # Write side
+    # -----------------------------
+    def append(self, rec: Dict[str, Any]) -> bool:
+        """Log one op (seq/ts are filled in). Returns True when compaction is due."""
+        with self._lock:
+            self.seq += 1
+            line = _dumps({"seq": self.seq, "ts": time.time(), **rec})
+            fh = self._writer()
+            fh.write(line + "\n")
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+            return self.seq - max(self.base_seq, 0) >= self.compact_every
+
+    def compact(self, weights: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write `weights` (the state after op #seq) as a new base, start a new
+        WAL segment and drop history older than the last keep_bases bases.
+        """
+        with self._lock:
+            seq = self.seq
+            path = self._base_path(seq)
+            if seq == self.base_seq and path.exists():
+                return str(path)
+            doc = {"seq": seq, "ts": time.time(), "params": dict(params or {}), "weights": weights}
+            _atomic_write_text(path, _dumps(doc))
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self.base_seq = seq
+            self._prune()
+            return str(path)
+
+    def _prune(self) -> None:
+        bases = self.bases()
+        if len(bases) <= self.keep_bases:
+            return
+        oldest = bases[-self.keep_bases][0]
+        for s, p in bases[: -self.keep_bases]:
+            p.unlink(missing_ok=True)
+        for s, p in self.segments():
+            if s < oldest:
+                p.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    # -----------------------------
+    # Read side
+    # -----------------------------
+    def records(self, after_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """Logged ops with seq > after_seq, oldest first (torn tail lines skipped)."""
+        segs = self.segments()
+        for i, (start, path) in enumerate(segs):
+            nxt = segs[i + 1][0] if i + 1 < len(segs) else None
+            if nxt is not None and nxt <= after_seq:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break
+                    if int(rec.get("seq", 0)) > after_seq:
+                        yield rec
+
+    def _load_base(self, path: Path) -> Dict[str, Any]:
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def store_at(
+        self,
+        ts: Optional[float] = None,
+        seq: Optional[int] = None,
+        **store_kwargs: Any,
+    ) -> WeightStore:
+        """
+        Rebuild the weights as of op `seq` / wall time `ts` (default: latest):
+        newest base at or before the target + replay of the WAL up to it.
+        Raises ValueError if that point was already compacted away.
+        """
+        chosen: Optional[Dict[str, Any]] = None
+        for s, p in reversed(self.bases()):
+            doc = self._load_base(p)
+            if (seq is None or s <= seq) and (ts is None or float(doc.get("ts", 0.0)) <= ts):
+                chosen = doc
+                break
+
+        if chosen is None:
+            if self.base_seq >= 0:
+                raise ValueError(f"weight history before the oldest kept base is compacted away ({self.root})")
+            chosen = {"seq": 0, "params": {}, "weights": None}
+
+        kwargs = {**chosen.get("params", {}), **store_kwargs}
+        ws = WeightStore(data=chosen.get("weights"), **kwargs)
+        for rec in self.records(after_seq=int(chosen.get("seq", 0))):
+            if seq is not None and int(rec["seq"]) > seq:
+                break
+            if ts is not None and float(rec.get("ts", 0.0)) > ts:
+                break
+            apply_record(ws, rec)
+        return ws
+
+    def restore(self, **store_kwargs: Any) -> WeightStore:
+        """Latest state with this log attached (ready to keep logging)."""
+        ws = self.store_at(**store_kwargs)
+        ws.attach_log(self, compact=False)
+        return ws
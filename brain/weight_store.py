@@ -1,12 +1,20 @@
 # brain/weight_store.py
 from __future__ import annotations
 
+import atexit
+import heapq
 import json
 import math
+import os
+import tempfile
+import threading
 import time
+import weakref
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def _safe_float(x: Any, default: float = 0.0) -> float:
@@ -21,6 +29,225 @@ def _safe_float(x: Any, default: float = 0.0) -> float:
         return default
 
 
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file in the same dir + os.replace: readers never see a half file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, str(path))
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# write-behind stores still holding unsaved updates at interpreter exit
+_LIVE_STORES: "weakref.WeakSet[WeightStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_stores() -> None:
+    for ws in list(_LIVE_STORES):
+        try:
+            ws.close()
+        except Exception:
+            pass
+
+
+_BUCKETS = ("session", "pattern", "structure", "trend", "expert_regime")
+
+
+class _LazyBucket:
+    """
+    Deferred decay/normalize for one bucket dict.
+
+    The dict holds stored values s; the real weight is a * s + b. Decay and
+    normalize only change (a, b) (both are affine maps applied to every key),
+    so they cost O(1). A running sum of s gives the bucket mean for normalize,
+    and min/max heaps over s (a > 0 keeps the order) find the keys a clamp
+    has to touch. materialize() folds (a, b) back into the dict.
+    """
+
+    __slots__ = ("d", "a", "b", "total", "lo", "hi", "ops", "table")
+
+    REBASE_SCALE = 1e-4      # fold (a, b) before a gets small enough to cost precision
+    REBASE_OPS = 20_000      # ... and periodically, to re-sum `total` exactly
+
+    def __init__(self, d: Dict[str, Any], table: Optional["_ExpertRegimeTable"] = None) -> None:
+        self.d = d
+        self.table = table  # mirror of stored values (expert_regime bucket only)
+        self.materialize()
+
+    def value(self, key: str) -> float:
+        return self.a * self.d[key] + self.b
+
+    def set(self, key: str, value: float) -> None:
+        s = (float(value) - self.b) / self.a
+        old = self.d.get(key)
+        if old is not None:
+            self.total -= old
+        self.d[key] = s
+        self.total += s
+        if self.table is not None:
+            self.table.put(key, s)
+        heapq.heappush(self.lo, (s, key))
+        heapq.heappush(self.hi, (-s, key))
+        self._tick()
+
+    def affine(self, mul: float, add: float) -> None:
+        """real' = mul * real + add for every key."""
+        self.a *= mul
+        self.b = mul * self.b + add
+        self._tick()
+
+    def mean(self) -> float:
+        n = len(self.d)
+        return (self.a * self.total + self.b * n) / n if n else 0.0
+
+    def scale(self, div: float) -> None:
+        """real' = real / div for every key."""
+        self.a /= div
+        self.b /= div
+        self._tick()
+
+    def clamp(self, mn: float, mx: float) -> None:
+        # a > 0: smallest stored value is the smallest real value.
+        # A just-clamped key can read back a rounding step past the bound: stop there.
+        done = set()
+        while self.lo:
+            s, k = self.lo[0]
+            if self.d.get(k) != s:
+                heapq.heappop(self.lo)  # stale entry
+                continue
+            if k in done or self.a * s + self.b >= mn:
+                break
+            heapq.heappop(self.lo)
+            self.set(k, mn)
+            done.add(k)
+        done.clear()
+        while self.hi:
+            ns, k = self.hi[0]
+            if self.d.get(k) != -ns:
+                heapq.heappop(self.hi)
+                continue
+            if k in done or self.a * -ns + self.b <= mx:
+                break
+            heapq.heappop(self.hi)
+            self.set(k, mx)
+            done.add(k)
+
+    def export(self) -> Dict[str, float]:
+        a, b = self.a, self.b
+        return {k: a * v + b for k, v in self.d.items()}
+
+    def materialize(self) -> None:
+        a = getattr(self, "a", 1.0)
+        b = getattr(self, "b", 0.0)
+        d = self.d
+        for k, v in list(d.items()):
+            fv = _safe_float(v, 1.0)
+            d[k] = a * fv + b if (a != 1.0 or b != 0.0) else fv
+        self.a = 1.0
+        self.b = 0.0
+        self.total = sum(d.values())
+        self.lo = [(v, k) for k, v in d.items()]
+        self.hi = [(-v, k) for k, v in d.items()]
+        heapq.heapify(self.lo)
+        heapq.heapify(self.hi)
+        self.ops = 0
+        if self.table is not None:
+            self.table.rebuild(d)
+
+    def _tick(self) -> None:
+        self.ops += 1
+        n = len(self.d)
+        if (
+            self.a < self.REBASE_SCALE
+            or self.a > 1.0 / self.REBASE_SCALE
+            or self.ops >= self.REBASE_OPS
+            or len(self.lo) > 4 * n + 64
+        ):
+            self.materialize()
+
+
+class _ExpertRegimeTable:
+    """
+    Dense float64 [expert_id, regime_id] mirror of the expert_regime bucket's
+    stored values (NaN = key absent). Expert/regime names are interned to ids
+    once, so a whole regime column is one indexed read.
+    """
+
+    def __init__(self) -> None:
+        self.experts: Dict[str, int] = {}
+        self.regimes: Dict[str, int] = {}
+        self.arr = np.full((8, 4), np.nan, dtype=np.float64)
+        self._idx_cache: Dict[Tuple[str, ...], Tuple[np.ndarray, bool]] = {}
+
+    @staticmethod
+    def split(key: str) -> Optional[Tuple[str, str]]:
+        expert, sep, regime = key.rpartition("|")
+        if not sep or not expert or not regime:
+            return None
+        return expert, regime
+
+    def _intern(self, names: Dict[str, int], name: str, axis: int) -> int:
+        i = names.get(name)
+        if i is None:
+            i = len(names)
+            names[name] = i
+            if i >= self.arr.shape[axis]:
+                shape = list(self.arr.shape)
+                shape[axis] = max(2 * shape[axis], i + 1)
+                grown = np.full(shape, np.nan, dtype=np.float64)
+                grown[: self.arr.shape[0], : self.arr.shape[1]] = self.arr
+                self.arr = grown
+            if axis == 0:
+                self._idx_cache.clear()
+        return i
+
+    def put(self, key: str, s: float) -> None:
+        er = self.split(key)
+        if er is None:
+            return
+        e = self._intern(self.experts, er[0], 0)
+        r = self._intern(self.regimes, er[1], 1)
+        self.arr[e, r] = s
+
+    def rebuild(self, d: Dict[str, Any]) -> None:
+        self.arr[:] = np.nan
+        for k, v in d.items():
+            self.put(k, v)
+
+    def expert_ids(self, experts: Sequence[str]) -> Tuple[np.ndarray, bool]:
+        """(ids, all_known); unknown experts get id -1."""
+        key = tuple(experts)
+        hit = self._idx_cache.get(key)
+        if hit is None:
+            idx = np.array([self.experts.get(e, -1) for e in key], dtype=np.int64)
+            hit = (idx, bool((idx >= 0).all()))
+            self._idx_cache[key] = hit
+        return hit
+
+    def column(self, experts: Sequence[str], regime: str) -> np.ndarray:
+        """Stored values for (experts, regime); NaN where absent."""
+        idx, all_known = self.expert_ids(experts)
+        r = self.regimes.get(regime)
+        if r is None:
+            return np.full(len(idx), np.nan, dtype=np.float64)
+        if all_known:
+            return self.arr[idx, r]
+        out = np.full(len(idx), np.nan, dtype=np.float64)
+        ok = idx >= 0
+        out[ok] = self.arr[idx[ok], r]
+        return out
+
+
 @dataclass
 class WeightUpdate:
     key: str
@@ -43,6 +270,22 @@ class WeightStore:
       - Backward compatible with previous versions
       - Works even if file missing/corrupted
       - Supports update, decay, normalization, snapshots
+
+    lazy_decay=True (default): decay / clamp / normalize are kept as a per-bucket
+    affine transform instead of rewriting every key, so update() is O(1)
+    (amortized; clamps touch only offending keys). get() equals the eager
+    sweep up to float rounding; to_dict()/.weights fold the transform back in
+    (and drop the lazy state, so writes into the returned dict are seen).
+
+    write_behind=True: update(autosave=True) only marks the store dirty; a
+    background thread saves after `flush_every` updates or `flush_interval`
+    seconds, whichever comes first. flush()/close() (and interpreter exit)
+    write any pending state. Saves are atomic (tmp file + rename).
+
+    log=WeightLog(...) (brain/weight_log.py): every mutating call is appended
+    to a write-ahead log as one op record; update(autosave=True) then relies
+    on the log instead of rewriting the JSON file, and full copies are only
+    written as compaction bases (every log.compact_every ops / maybe_snapshot).
     """
 
     def __init__(
@@ -53,6 +296,11 @@ class WeightStore:
         clamp_max: float = 10.0,
         decay: float = 0.9995,
         normalize: bool = True,
+        write_behind: bool = False,
+        flush_every: int = 50,
+        flush_interval: float = 5.0,
+        lazy_decay: bool = True,
+        log: Optional[Any] = None,
     ) -> None:
         self.path = str(path) if path else None
         self.clamp_min = float(clamp_min)
@@ -60,7 +308,20 @@ class WeightStore:
         self.decay = float(decay)
         self.normalize = bool(normalize)
 
-        self.weights: Dict[str, Any] = data if isinstance(data, dict) else {
+        self.write_behind = bool(write_behind)
+        self.flush_every = max(int(flush_every), 1)
+        self.flush_interval = max(float(flush_interval), 0.0)
+
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        # orders file writes; always taken before _lock, never while holding it
+        self._io_lock = threading.Lock()
+        self._dirty_path: Optional[str] = None
+        self._pending = 0
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._weights: Dict[str, Any] = data if isinstance(data, dict) else {
             "session": {},
             "pattern": {},
             "structure": {},
@@ -74,11 +335,24 @@ class WeightStore:
         }
 
         for k in ["session", "pattern", "structure", "trend", "expert_regime", "meta"]:
-            if k not in self.weights or not isinstance(self.weights[k], dict):
-                self.weights[k] = {} if k != "meta" else {"updated_at": time.time()}
+            if k not in self._weights or not isinstance(self._weights[k], dict):
+                self._weights[k] = {} if k != "meta" else {"updated_at": time.time()}
 
         self._last_snapshot_ts: float = 0.0
 
+        self.lazy_decay = bool(lazy_decay)
+        self._lazy: Dict[str, _LazyBucket] = {}
+
+        # bumped by every mutating method; keys the weights_for_regime row cache
+        self._version = 0
+        self._row_cache: Dict[Tuple[Tuple[str, ...], str], Tuple[int, np.ndarray]] = {}
+
+        # write-ahead op log (WeightLog); _log_mute > 0 inside composite ops
+        self.log: Optional[Any] = None
+        self._log_mute = 0
+        if log is not None:
+            self.attach_log(log)
+
     # -----------------------------
     # IO
     # -----------------------------
@@ -100,11 +374,120 @@ class WeightStore:
         out = str(path) if path else self.path
         if not out:
             return
-        p = Path(out)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        self.weights.setdefault("meta", {})
-        self.weights["meta"]["updated_at"] = time.time()
-        p.write_text(json.dumps(self.weights, indent=2, ensure_ascii=False), encoding="utf-8")
+        with self._io_lock:
+            # serialize under the lock, write outside it: update()/get() never wait on disk
+            with self._lock:
+                self._weights.setdefault("meta", {})
+                self._weights["meta"]["updated_at"] = time.time()
+                text = json.dumps(self._export(), indent=2, ensure_ascii=False)
+                taken = 0
+                if self._dirty_path == out:
+                    taken = self._pending
+                    self._dirty_path = None
+                    self._pending = 0
+            try:
+                _atomic_write_text(Path(out), text)
+            except BaseException:
+                if taken:
+                    # write failed: stay dirty so the flusher / close() retries
+                    with self._lock:
+                        if self._dirty_path in (None, out):
+                            self._dirty_path = out
+                            self._pending += taken
+                raise
+
+    # -----------------------------
+    # Write-behind
+    # -----------------------------
+    def _mark_dirty(self, path: Optional[str]) -> None:
+        out = str(path) if path else self.path
+        if not out:
+            return
+        with self._lock:
+            prev = self._dirty_path
+        if prev is not None and prev != out:
+            # target changed: write the old target now, keep one pending path
+            self.save(prev)
+        with self._lock:
+            self._dirty_path = out
+            self._pending += 1
+            closed = self._closed
+            if not closed:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="WeightStoreFlush", daemon=True)
+                    self._flusher.start()
+                    _LIVE_STORES.add(self)
+                if self._pending >= self.flush_every:
+                    self._wake.notify()
+        if closed:
+            self.flush()  # no flusher after close(): write through
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                if self._pending < self.flush_every:
+                    self._wake.wait(timeout=self.flush_interval or None)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                pass  # keep dirty; next round / close() retries
+
+    def flush(self) -> bool:
+        """Write pending write-behind state now. Returns True if something was saved."""
+        with self._lock:
+            out = self._dirty_path
+        if out is None:
+            return False
+        self.save(out)
+        return True
+
+    def close(self) -> None:
+        """Stop the flush thread and write any pending state."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+            t = self._flusher
+            self._flusher = None
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout=5.0)
+        self.flush()
+        _LIVE_STORES.discard(self)
+        if self.log is not None:
+            self.log.close()
+
+    # -----------------------------
+    # Op log
+    # -----------------------------
+    def attach_log(self, log: Any, compact: bool = True) -> None:
+        """Log every mutation to `log` from now on (compact=True: current state becomes its base)."""
+        with self._lock:
+            self.log = log
+            if compact:
+                log.compact(self._export(), self._log_params())
+
+    def _log_params(self) -> Dict[str, Any]:
+        return {"clamp_min": self.clamp_min, "clamp_max": self.clamp_max, "decay": self.decay, "normalize": self.normalize}
+
+    def _log_op(self, op: str, **fields: Any) -> None:
+        # caller holds self._lock, so log order == apply order
+        if self.log is None or self._log_mute:
+            return
+        if self.log.append({"op": op, **fields}):
+            self.log.compact(self._export(), self._log_params())
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_path is not None
+
+    def __enter__(self) -> "WeightStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     # backward compat
     def load_json(self, path: Optional[str] = None) -> "WeightStore":
@@ -118,47 +501,153 @@ class WeightStore:
             decay=self.decay,
             normalize=self.normalize,
         )
-        self.path = loaded.path
-        self.weights = loaded.weights
+        with self._lock:
+            self.path = loaded.path
+            self._weights = loaded._weights
+            self._lazy = {}
+            self._version += 1
+            if self.log is not None:
+                self.log.compact(self._export(), self._log_params())
         return self
 
     def save_json(self, path: Optional[str] = None) -> None:
         self.save(path)
 
+    @property
+    def weights(self) -> Dict[str, Any]:
+        """
+        The live weights dict (real values). Callers may write into it, as
+        before lazy_decay: handing it out folds the lazy transforms in and
+        drops the lazy state, which is rebuilt from the dict on next use.
+        Re-read .weights / to_dict() before writing again after other calls.
+        """
+        with self._lock:
+            self._release()
+        return self._weights
+
+    @weights.setter
+    def weights(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._weights = data
+            self._lazy = {}
+            self._version += 1
+
     def to_dict(self) -> Dict[str, Any]:
         return self.weights
 
+    def _release(self) -> None:
+        """The dict may be written from outside: real values in it, no derived state kept."""
+        self._materialize()
+        # lazy buckets + their dense expert x regime tables are rebuilt on next use,
+        # cached weights_for_regime rows are dropped (eager mode caches rows too)
+        self._lazy = {}
+        self._version += 1
+
+    def _export(self) -> Dict[str, Any]:
+        """Real-valued copy of the lazy buckets (state untouched; safe from the flush thread)."""
+        if not self._lazy:
+            return self._weights
+        out = dict(self._weights)
+        for bucket, lz in self._lazy.items():
+            if out.get(bucket) is lz.d:
+                out[bucket] = lz.export()
+        return out
+
+    def _materialize(self) -> None:
+        """Fold lazy transforms into the dicts (plain real values again)."""
+        for lz in self._lazy.values():
+            if lz.a != 1.0 or lz.b != 0.0:
+                lz.materialize()
+
     # -----------------------------
     # Get/Set helpers
     # -----------------------------
     def _bucket(self, bucket: str) -> Dict[str, float]:
-        b = self.weights.get(bucket)
+        b = self._weights.get(bucket)
         if not isinstance(b, dict):
             b = {}
-            self.weights[bucket] = b
+            self._weights[bucket] = b
         return b  # type: ignore[return-value]
 
+    def _lz(self, bucket: str) -> _LazyBucket:
+        b = self._bucket(bucket)
+        lz = self._lazy.get(bucket)
+        if lz is None or lz.d is not b:
+            table = _ExpertRegimeTable() if bucket == "expert_regime" else None
+            lz = _LazyBucket(b, table)
+            self._lazy[bucket] = lz
+        return lz
+
+    def _read(self, bucket: str, key: str) -> Any:
+        """Real value of a present key (lazy transform applied)."""
+        if self.lazy_decay:
+            lz = self._lz(bucket)
+            return lz.value(key)
+        return self._bucket(bucket).get(key)
+
     def get(self, key: str, regime: Optional[str] = None, default: float = 1.0) -> float:
         if regime:
             k = f"{key}|{regime}"
-            v = self._bucket("expert_regime").get(k, default)
-            return _safe_float(v, default)
+            if k not in self._bucket("expert_regime"):
+                return _safe_float(default, default)
+            return _safe_float(self._read("expert_regime", k), default)
 
         for bucket in ("session", "pattern", "structure", "trend"):
             b = self._bucket(bucket)
             if key in b:
-                return _safe_float(b.get(key), default)
+                return _safe_float(self._read(bucket, key), default)
 
         if key in self._bucket("expert_regime"):
-            return _safe_float(self._bucket("expert_regime").get(key), default)
+            return _safe_float(self._read("expert_regime", key), default)
 
         return float(default)
 
+    def weights_for_regime(
+        self,
+        experts: Sequence[str],
+        regime: Optional[str],
+        default: float = 1.0,
+    ) -> np.ndarray:
+        """
+        [get(e, regime, default) for e in experts] as one array read from the
+        dense expert x regime table (lazy mode). Same values as get().
+        Rows are cached until the next mutating call; the array is read-only.
+        """
+        if not regime:
+            return np.array([self.get(e, regime, default) for e in experts], dtype=np.float64)
+
+        key = (tuple(experts), str(regime))
+        hit = self._row_cache.get(key)
+        if hit is not None and hit[0] == self._version and default == 1.0:
+            return hit[1]
+
+        with self._lock:
+            version = self._version
+            if not self.lazy_decay or "|" in key[1]:
+                out = np.array([self.get(e, regime, default) for e in experts], dtype=np.float64)
+            else:
+                lz = self._lz("expert_regime")
+                col = lz.table.column(key[0], key[1])  # type: ignore[union-attr]
+                out = col * lz.a + lz.b
+                if not np.isfinite(out).all():
+                    out[~np.isfinite(out)] = _safe_float(default, default)
+            if default == 1.0:
+                out.flags.writeable = False
+                if len(self._row_cache) > 256:
+                    self._row_cache.clear()
+                self._row_cache[key] = (version, out)
+        return out
+
     def set(self, bucket: str, key: str, value: float) -> None:
-        b = self._bucket(bucket)
-        b[key] = float(value)
-        self.weights.setdefault("meta", {})
-        self.weights["meta"]["updated_at"] = time.time()
+        with self._lock:
+            self._version += 1
+            if self.lazy_decay:
+                self._lz(bucket).set(key, float(value))
+            else:
+                self._bucket(bucket)[key] = float(value)
+            self._weights.setdefault("meta", {})
+            self._weights["meta"]["updated_at"] = time.time()
+            self._log_op("set", bucket=bucket, key=key, value=float(value))
 
     # -----------------------------
     # Learning / Update logic
@@ -167,36 +656,61 @@ class WeightStore:
         d = float(self.decay)
         if d <= 0.0 or d >= 1.0:
             return
-        for bucket in ("session", "pattern", "structure", "trend", "expert_regime"):
-            b = self._bucket(bucket)
-            for k, v in list(b.items()):
-                fv = _safe_float(v, 1.0)
-                b[k] = 1.0 + (fv - 1.0) * d
+        with self._lock:
+            self._version += 1
+            if self.lazy_decay:
+                # 1 + (v - 1) * d == d * v + (1 - d)
+                for bucket in _BUCKETS:
+                    if self._bucket(bucket):
+                        self._lz(bucket).affine(d, 1.0 - d)
+            else:
+                for bucket in ("session", "pattern", "structure", "trend", "expert_regime"):
+                    b = self._bucket(bucket)
+                    for k, v in list(b.items()):
+                        fv = _safe_float(v, 1.0)
+                        b[k] = 1.0 + (fv - 1.0) * d
+            # after the change: a compaction triggered by this append snapshots the new weights
+            self._log_op("decay")
 
     def clamp_all(self) -> None:
         mn, mx = self.clamp_min, self.clamp_max
-        for bucket in ("session", "pattern", "structure", "trend", "expert_regime"):
-            b = self._bucket(bucket)
-            for k, v in list(b.items()):
-                fv = _safe_float(v, 1.0)
-                if fv < mn:
-                    fv = mn
-                if fv > mx:
-                    fv = mx
-                b[k] = fv
+        with self._lock:
+            self._version += 1
+            if self.lazy_decay:
+                for bucket in _BUCKETS:
+                    if self._bucket(bucket):
+                        self._lz(bucket).clamp(mn, mx)
+            else:
+                for bucket in ("session", "pattern", "structure", "trend", "expert_regime"):
+                    b = self._bucket(bucket)
+                    for k, v in list(b.items()):
+                        fv = _safe_float(v, 1.0)
+                        if fv < mn:
+                            fv = mn
+                        if fv > mx:
+                            fv = mx
+                        b[k] = fv
+            self._log_op("clamp")
 
     def normalize_bucket(self, bucket: str) -> None:
         b = self._bucket(bucket)
         if not b:
             return
-        vals = [_safe_float(v, 1.0) for v in b.values()]
-        if not vals:
-            return
-        mean = sum(vals) / max(1, len(vals))
-        if mean <= 0:
-            return
-        for k, v in list(b.items()):
-            b[k] = _safe_float(v, 1.0) / mean
+        with self._lock:
+            self._version += 1
+            if self.lazy_decay:
+                lz = self._lz(bucket)
+                mean = lz.mean()
+                if mean > 0:
+                    lz.scale(mean)
+            else:
+                vals = [_safe_float(v, 1.0) for v in b.values()]
+                mean = sum(vals) / max(1, len(vals))
+                if mean > 0:
+                    for k, v in list(b.items()):
+                        b[k] = _safe_float(v, 1.0) / mean
+            # logged even when mean <= 0: replay makes the same (no-op) call
+            self._log_op("normalize", bucket=bucket)
 
     def normalize_all(self) -> None:
         if not self.normalize:
@@ -212,10 +726,16 @@ class WeightStore:
         lr: float = 0.05,
         meta: Optional[Dict[str, Any]] = None,
     ) -> WeightUpdate:
-        b = self._bucket(bucket)
-        prev = _safe_float(b.get(key, 1.0), 1.0)
-        new = prev + float(lr) * float(delta)
-        b[key] = new
+        with self._lock:
+            self._version += 1
+            b = self._bucket(bucket)
+            prev = _safe_float(self._read(bucket, key) if key in b else 1.0, 1.0)
+            new = prev + float(lr) * float(delta)
+            if self.lazy_decay:
+                self._lz(bucket).set(key, new)
+            else:
+                b[key] = new
+            self._log_op("update_weight", bucket=bucket, key=key, delta=float(delta), lr=float(lr))
 
         upd = WeightUpdate(
             key=key,
@@ -224,8 +744,8 @@ class WeightStore:
             delta=float(delta),
             meta=meta or {},
         )
-        self.weights.setdefault("meta", {})
-        self.weights["meta"]["updated_at"] = time.time()
+        self._weights.setdefault("meta", {})
+        self._weights["meta"]["updated_at"] = time.time()
         return upd
 
     def update_expert_regime(
@@ -269,15 +789,25 @@ class WeightStore:
             # no-op but return a neutral update record
             return WeightUpdate(key=f"{expert_s}|{regime_s}", prev=1.0, new=1.0, delta=0.0, meta=meta or {})
 
-        upd = self.update_expert_regime(expert_s, regime_s, delta=float(reward), lr=float(lr), meta=meta)
-
-        # stability stack (lightweight)
-        if apply_decay:
-            self.apply_decay()
-        if clamp:
-            self.clamp_all()
-        if normalize and self.normalize:
-            self.normalize_all()
+        with self._lock:
+            # one "update" record for the whole stack (replay re-runs it)
+            self._log_mute += 1
+            try:
+                upd = self.update_expert_regime(expert_s, regime_s, delta=float(reward), lr=float(lr), meta=meta)
+
+                # stability stack (lightweight)
+                if apply_decay:
+                    self.apply_decay()
+                if clamp:
+                    self.clamp_all()
+                if normalize and self.normalize:
+                    self.normalize_all()
+            finally:
+                self._log_mute -= 1
+            self._log_op(
+                "update", expert=expert_s, regime=regime_s, reward=float(reward), lr=float(lr),
+                decay=int(bool(apply_decay)), clamp=int(bool(clamp)), normalize=int(bool(normalize)),
+            )
 
         if log:
             try:
@@ -285,9 +815,13 @@ class WeightStore:
             except Exception:
                 pass
 
-        if autosave:
+        # with an op log the appended record is the durable copy
+        if autosave and self.log is None:
             try:
-                self.save(save_path or self.path)
+                if self.write_behind:
+                    self._mark_dirty(save_path or self.path)
+                else:
+                    self.save(save_path or self.path)
             except Exception:
                 pass
 
@@ -298,9 +832,14 @@ class WeightStore:
         if (now - self._last_snapshot_ts) < float(every_sec):
             return None
         self._last_snapshot_ts = now
+        if self.log is not None:
+            # compact into a base instead of another full snapshot file
+            with self._lock:
+                return self.log.compact(self._export(), self._log_params())
         p = Path(out_dir) / f"weights_snapshot_{int(now)}.json"
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(json.dumps(self.weights, indent=2, ensure_ascii=False), encoding="utf-8")
+        with self._lock:
+            text = json.dumps(self._export(), indent=2, ensure_ascii=False)
+        _atomic_write_text(p, text)
         return str(p)
 
     def size(self) -> int:
@@ -1,39 +1,40 @@
 from data.historical_loader import connect_mt5, load_data
 import MetaTrader5 as mt5
+import numpy as np
 
-from brain.trade_logger import log_trade
+from brain.trade_logger import flush_trade_log, log_trade
 from brain.session_detector import get_session
+from sim.sl_tp_resolver import HIT_SL, HIT_TP, resolve_sl_tp
 
 from datetime import datetime
 
 
-# ===== SIMULATE TRADE =====
-def simulate_trade(entry_price, sl_price, tp_price, df_future, trade_type):
-
-    for _, row in df_future.iterrows():
-
-        high = row["high"]
-        low = row["low"]
-
-        # BUY
-        if trade_type == "BUY":
-
-            if low <= sl_price:
-                return -1   # SL hit
-
-            if high >= tp_price:
-                return 2.5  # TP hit
-
-
-        # SELL
-        if trade_type == "SELL":
+# ===== R MULTIPLES (giữ nguyên quy ước cũ) =====
+SL_R = -1
+TP_R = 2.5
+HORIZON = 49    # df.iloc[i+1:i+50]
 
-            if high >= sl_price:
-                return -1
 
-            if low <= tp_price:
-                return 2.5
+# ===== SIMULATE TRADE =====
+def simulate_trade(entry_price, sl_price, tp_price, df_future, trade_type):
 
+    res = resolve_sl_tp(
+        df_future["high"].to_numpy(dtype=np.float64),
+        df_future["low"].to_numpy(dtype=np.float64),
+        [-1],       # entry ngay trước df_future → xét bar 0..len-1
+        sl_price,
+        tp_price,
+        side=trade_type,
+        horizon=len(df_future),
+        sl_r=SL_R,
+        tp_r=TP_R,
+    )
+
+    k = int(res.kind[0])
+    if k == HIT_SL:
+        return -1   # SL hit
+    if k == HIT_TP:
+        return 2.5  # TP hit
     return None
 
 
@@ -52,6 +53,20 @@ def simple_strategy(df, i):
     return None
 
 
+def simple_strategy_signals(df, start=50, stop=None):
+    """simple_strategy cho mọi bar một lần: (idx, type, sl, tp) dạng array."""
+
+    o = df["open"].to_numpy(dtype=np.float64)
+    c = df["close"].to_numpy(dtype=np.float64)
+    l = df["low"].to_numpy(dtype=np.float64)
+
+    stop = len(df) if stop is None else stop
+    idx = np.arange(start, max(stop, start), dtype=np.int64)
+    idx = idx[c[idx] > o[idx]]
+
+    return idx, np.full(len(idx), "BUY"), l[idx] - 1, c[idx] + 2
+
+
 # ===== RUN BACKTEST =====
 def run_backtest():
 
@@ -59,25 +74,28 @@ def run_backtest():
 
     df = load_data("XAUUSD", mt5.TIMEFRAME_M5, 3000)
 
-    for i in range(50, len(df)-50):
+    idx, types, sl, tp = simple_strategy_signals(df, 50, len(df) - 50)
 
-        signal = simple_strategy(df, i)
+    # tất cả SL/TP giải một lần (thay vì iterrows từng lệnh)
+    res = resolve_sl_tp(
+        df["high"].to_numpy(dtype=np.float64),
+        df["low"].to_numpy(dtype=np.float64),
+        idx, sl, tp,
+        side=types,
+        horizon=HORIZON,
+        sl_r=SL_R,
+        tp_r=TP_R,
+    )
 
-        if signal is None:
-            continue
+    close = df["close"].to_numpy()
+    times = df["time"].to_numpy()
 
-        entry_price = df["close"].iloc[i]
+    for j, i in enumerate(idx.tolist()):
 
-        result = simulate_trade(
-            entry_price,
-            signal["sl"],
-            signal["tp"],
-            df.iloc[i+1:i+50],
-            signal["type"]
-        )
+        result = {HIT_SL: SL_R, HIT_TP: TP_R}.get(int(res.kind[j]))
 
         log_trade({
-            "time": df["time"].iloc[i],
+            "time": times[i],
             "symbol": "XAUUSD",
             "session": get_session(),
 
@@ -97,16 +115,19 @@ def run_backtest():
             "volume_confirm": False,
             "candle_pattern": "TEST",
 
-            "entry_type": signal["type"],
-            "entry_price": entry_price,
-            "sl_price": signal["sl"],
-            "tp_price": signal["tp"],
+            "entry_type": types[j],
+            "entry_price": close[i],
+            "sl_price": sl[j],
+            "tp_price": tp[j],
 
             "result_R": result,
+            "rr_realized": result,
             "max_drawdown": None,
             "hold_minutes": None
         })
 
+    flush_trade_log()
+
     print("Backtest finished")
 
 
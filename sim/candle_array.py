@@ -0,0 +1,182 @@
+# sim/candle_array.py
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+CANDLE_FIELDS = ("ts", "o", "h", "l", "c", "v")
+
+# on-disk record layout (one row per candle) used by the .npy cache
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("o", "<f8"),
+    ("h", "<f8"),
+    ("l", "<f8"),
+    ("c", "<f8"),
+    ("v", "<f8"),
+])
+
+# long-name aliases accepted by column access: arr["close"] -> arr.c
+_FIELD_ALIASES = {
+    "time": "ts",
+    "timestamp": "ts",
+    "open": "o",
+    "high": "h",
+    "low": "l",
+    "close": "c",
+    "volume": "v",
+}
+
+
+class CandleArray:
+    """
+    Columnar OHLCV store backed by contiguous NumPy arrays:
+      ts: int64 unix seconds
+      o,h,l,c,v: float64
+
+    Dict-compatible so existing candle consumers keep working:
+      - arr[i]        -> {"ts","o","h","l","c","v"} dict (built on access)
+      - arr[a:b]      -> CandleArray view (zero-copy, O(1))
+      - arr["c"]      -> close column (np.ndarray)
+      - iter(arr)     -> candle dicts
+      - len(arr)
+    """
+
+    __slots__ = ("ts", "o", "h", "l", "c", "v")
+
+    def __init__(
+        self,
+        ts: Any,
+        o: Any,
+        h: Any,
+        l: Any,
+        c: Any,
+        v: Any = None,
+    ) -> None:
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.o = np.asarray(o, dtype=np.float64)
+        self.h = np.asarray(h, dtype=np.float64)
+        self.l = np.asarray(l, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        if v is None:
+            v = np.zeros(len(self.ts), dtype=np.float64)
+        self.v = np.asarray(v, dtype=np.float64)
+
+        n = len(self.ts)
+        for name in CANDLE_FIELDS[1:]:
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"column length mismatch: {name}={len(getattr(self, name))} ts={n}")
+
+    # -----------------------------
+    # Constructors
+    # -----------------------------
+    @classmethod
+    def empty(cls) -> "CandleArray":
+        return cls(ts=[], o=[], h=[], l=[], c=[], v=[])
+
+    @classmethod
+    def from_dicts(cls, candles: Iterable[Dict[str, Any]]) -> "CandleArray":
+        """
+        Build from standard candle dicts {"ts","o","h","l","c","v"}.
+        Missing ts/v default to 0.
+        """
+        if isinstance(candles, CandleArray):
+            return candles
+        rows = list(candles)
+        return cls(
+            ts=[int(x.get("ts", 0) or 0) for x in rows],
+            o=[float(x["o"]) for x in rows],
+            h=[float(x["h"]) for x in rows],
+            l=[float(x["l"]) for x in rows],
+            c=[float(x["c"]) for x in rows],
+            v=[float(x.get("v", 0.0) or 0.0) for x in rows],
+        )
+
+    @classmethod
+    def from_structured(cls, rec: np.ndarray) -> "CandleArray":
+        """Wrap a CANDLE_DTYPE record array; columns are strided views (no copy)."""
+        return cls(ts=rec["ts"], o=rec["o"], h=rec["h"], l=rec["l"], c=rec["c"], v=rec["v"])
+
+    @classmethod
+    def load_npy(cls, path: str, *, mmap: bool = True) -> "CandleArray":
+        rec = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if rec.dtype != CANDLE_DTYPE:
+            raise ValueError(f"unexpected candle cache dtype: {rec.dtype}")
+        return cls.from_structured(rec)
+
+    def to_structured(self) -> np.ndarray:
+        rec = np.empty(len(self), dtype=CANDLE_DTYPE)
+        for f in CANDLE_FIELDS:
+            rec[f] = getattr(self, f)
+        return rec
+
+    def save_npy(self, path: str) -> None:
+        with open(path, "wb") as f:
+            np.save(f, self.to_structured(), allow_pickle=False)
+
+    # -----------------------------
+    # Sequence / dict compat
+    # -----------------------------
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Any:
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return CandleArray(
+                self.ts[key], self.o[key], self.h[key], self.l[key], self.c[key], self.v[key]
+            )
+        i = int(key)
+        return {
+            "ts": int(self.ts[i]),
+            "o": float(self.o[i]),
+            "h": float(self.h[i]),
+            "l": float(self.l[i]),
+            "c": float(self.c[i]),
+            "v": float(self.v[i]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # tolist() converts a whole column in C; cheaper than per-element numpy scalars
+        cols = [getattr(self, f).tolist() for f in CANDLE_FIELDS]
+        for ts, o, h, l, c, v in zip(*cols):
+            yield {"ts": ts, "o": o, "h": h, "l": l, "c": c, "v": v}
+
+    def __repr__(self) -> str:
+        if len(self) == 0:
+            return "CandleArray(n=0)"
+        return f"CandleArray(n={len(self)}, ts=[{int(self.ts[0])}..{int(self.ts[-1])}])"
+
+    def column(self, name: str) -> np.ndarray:
+        key = _FIELD_ALIASES.get(name, name)
+        if key not in CANDLE_FIELDS:
+            raise KeyError(name)
+        return getattr(self, key)
+
+    def window(self, end: int, size: int) -> "CandleArray":
+        """View of the `size` candles ending before index `end` (like candles[end-size:end])."""
+        start = max(int(end) - int(size), 0)
+        return self[start:int(end)]
+
+    def copy(self) -> "CandleArray":
+        """Owned copy (slices and CandleWindow.view() share memory with their source)."""
+        return CandleArray(self.ts.copy(), self.o.copy(), self.h.copy(), self.l.copy(), self.c.copy(), self.v.copy())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(iter(self))
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, f).nbytes for f in CANDLE_FIELDS))
+
+
+def as_candle_array(candles: Optional[Sequence[Dict[str, Any]]]) -> CandleArray:
+    """Return candles as a CandleArray (passthrough when already columnar)."""
+    if candles is None:
+        return CandleArray.empty()
+    if isinstance(candles, CandleArray):
+        return candles
+    return CandleArray.from_dicts(candles)
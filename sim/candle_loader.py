@@ -2,10 +2,17 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import json
 import os
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sim.candle_array import CandleArray
 
 
 @dataclass(frozen=True)
@@ -64,15 +71,16 @@ def _parse_ts(value: str) -> int:
     if v == "":
         raise ValueError("empty timestamp")
 
-    # numeric unix?
-    try:
-        fv = float(v)
-        iv = int(fv)
-        if iv > 10_000_000_000:  # treat as ms
-            return int(iv / 1000)
-        return iv
-    except Exception:
-        pass
+    # numeric unix? (skip the float() attempt for obvious date strings: it would only raise)
+    if ":" not in v and not (len(v) >= 8 and v[4] == "-"):
+        try:
+            fv = float(v)
+            iv = int(fv)
+            if iv > 10_000_000_000:  # treat as ms
+                return int(iv / 1000)
+            return iv
+        except Exception:
+            pass
 
     # MT5 date format 2025.01.01 -> convert to 2025-01-01 for parsing
     v = v.replace(".", "-")
@@ -104,6 +112,135 @@ def _parse_ts(value: str) -> int:
     return int(dt.timestamp())
 
 
+# -----------------------------
+# Binary sidecar cache
+# -----------------------------
+_CACHE_VERSION = 1
+_FINGERPRINT_BLOCK = 1 << 16  # bytes hashed from head and tail of the CSV
+
+
+def candle_cache_paths(path: str) -> Tuple[str, str]:
+    """Sidecar files for a CSV: (<csv>.candles.npy, <csv>.candles.json)."""
+    return path + ".candles.npy", path + ".candles.json"
+
+
+def _csv_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    Cheap content key: size + mtime + blake2b over the first/last 64KB.
+    Hashing the whole file would cost as much as a parse on multi-GB exports.
+    """
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(_FINGERPRINT_BLOCK))
+        if st.st_size > _FINGERPRINT_BLOCK:
+            f.seek(max(st.st_size - _FINGERPRINT_BLOCK, _FINGERPRINT_BLOCK))
+            h.update(f.read(_FINGERPRINT_BLOCK))
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns), "hash": h.hexdigest()}
+
+
+def _cache_key(path: str, **options: Any) -> Dict[str, Any]:
+    return {"version": _CACHE_VERSION, "csv": _csv_fingerprint(path), "options": options}
+
+
+def _load_cached(path: str, key: Dict[str, Any]) -> Optional[CandleArray]:
+    npy_path, meta_path = candle_cache_paths(path)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta != key:
+            return None
+        return CandleArray.load_npy(npy_path, mmap=True)
+    except Exception:
+        return None
+
+
+def _write_cache(path: str, key: Dict[str, Any], arr: CandleArray) -> None:
+    """Atomic best-effort write (read-only data dirs just skip caching)."""
+    npy_path, meta_path = candle_cache_paths(path)
+    try:
+        arr.save_npy(npy_path + ".tmp")
+        os.replace(npy_path + ".tmp", npy_path)
+        # meta last: a crash between the two writes leaves a stale key -> cache miss
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(key, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except Exception:
+        for tmp in (npy_path + ".tmp", meta_path + ".tmp"):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+# Fixed-width formats handled by the batch path; everything else goes through _parse_ts.
+_TS_FORMATS = {
+    "mt5": re.compile(r"\d{4}\.\d{2}\.\d{2}(?: \d{2}:\d{2}(?::\d{2})?)?"),
+    "iso": re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?Z?"),
+    "unix": re.compile(r"\d+(?:\.\d*)?"),
+}
+_TS_DETECT_ROWS = 64
+
+
+def _detect_ts_format(values: List[str]) -> Optional[str]:
+    sample = [v.strip() for v in values[:_TS_DETECT_ROWS] if v and v.strip()]
+    if not sample:
+        return None
+    best, best_hits = None, 0
+    for name, pat in _TS_FORMATS.items():
+        hits = sum(1 for v in sample if pat.fullmatch(v))
+        if hits > best_hits:
+            best, best_hits = name, hits
+    # require a clear majority, otherwise the batch path buys nothing
+    return best if best_hits * 2 > len(sample) else None
+
+
+def _batch_convert(fmt: str, values: List[str]) -> np.ndarray:
+    if fmt == "unix":
+        iv = np.asarray(values, dtype=np.float64).astype(np.int64)
+        ms = iv > 10_000_000_000
+        if ms.any():
+            iv[ms] = np.trunc(iv[ms] / 1000).astype(np.int64)
+        return iv
+    if fmt == "mt5":
+        values = [v.replace(".", "-", 2) for v in values]
+    else:
+        values = [v[:-1] if v.endswith("Z") else v for v in values]
+    return np.asarray(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def _parse_ts_column(values: List[str]) -> np.ndarray:
+    """
+    Vectorized _parse_ts for a whole column.
+    Detects the format from the first rows, converts all matching rows in one
+    NumPy call and only sends non-matching rows through the per-row parser.
+    Results are identical to calling _parse_ts on each value.
+    """
+    n = len(values)
+    out = np.empty(n, dtype=np.int64)
+    fmt = _detect_ts_format(values)
+    if fmt is None:
+        for i, v in enumerate(values):
+            out[i] = _parse_ts(v)
+        return out
+
+    pat = _TS_FORMATS[fmt]
+    stripped = [v.strip() for v in values]
+    match = np.fromiter((pat.fullmatch(v) is not None for v in stripped), dtype=bool, count=n)
+    hit_idx = np.flatnonzero(match)
+    try:
+        out[hit_idx] = _batch_convert(fmt, [stripped[i] for i in hit_idx])
+    except ValueError:
+        # regex-valid but calendar-invalid value somewhere (e.g. month 13): per-row
+        match[:] = False
+
+    for i in np.flatnonzero(~match):
+        out[i] = _parse_ts(values[i])
+    return out
+
+
 def _find_col(headers: List[str], target: str) -> Optional[str]:
     aliases = _COL_ALIASES[target]
     for h in headers:
@@ -122,10 +259,13 @@ def load_candles_csv(
     limit: Optional[int] = None,
     sort_by_ts: bool = True,
     drop_duplicates: bool = True,
-) -> List[Dict[str, Any]]:
+    cache: bool = True,
+) -> CandleArray:
     """
-    Load XAUUSD historical CSV into standard candle dicts:
+    Load XAUUSD historical CSV into a columnar CandleArray.
+    Indexing returns standard candle dicts:
       {"ts": int, "o": float, "h": float, "l": float, "c": float, "v": float}
+    and slicing returns zero-copy window views.
 
     Supports MT5 export:
       <DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<TICKVOL>,<VOL>,<SPREAD>
@@ -133,78 +273,170 @@ def load_candles_csv(
     Notes:
     - Delimiter auto-detected.
     - Volume optional (defaults to 0.0).
+    - cache=True keeps a memory-mapped .npy sidecar next to the CSV, keyed by
+      file size, mtime, a content hash and the load options. Later loads of an
+      unchanged file skip parsing entirely.
     """
     if not os.path.exists(path):
         raise FileNotFoundError(path)
 
+    key: Optional[Dict[str, Any]] = None
+    if cache:
+        key = _cache_key(path, limit=limit, sort_by_ts=sort_by_ts, drop_duplicates=drop_duplicates)
+        cached = _load_cached(path, key)
+        if cached is not None:
+            return cached
+
+    arr = _parse_csv(path, limit=limit, sort_by_ts=sort_by_ts, drop_duplicates=drop_duplicates)
+    if key is not None:
+        _write_cache(path, key, arr)
+    return arr
+
+
+def _parse_csv(
+    path: str,
+    *,
+    limit: Optional[int],
+    sort_by_ts: bool,
+    drop_duplicates: bool,
+) -> CandleArray:
+    """
+    Fast path: read raw string columns, then convert each column in one batch
+    (timestamps via _parse_ts_column, OHLCV via NumPy float conversion).
+    Any failure re-scans with the strict per-row loop so errors still report
+    the first bad line exactly as before.
+    """
     with open(path, "r", encoding="utf-8-sig", newline="") as f:
         sample = f.read(4096)
         f.seek(0)
         delim = _detect_delimiter(sample)
 
-        reader = csv.DictReader(f, delimiter=delim)
-        if reader.fieldnames is None:
+        reader = csv.reader(f, delimiter=delim)
+        headers = next(reader, None)
+        if headers is None:
             raise ValueError("CSV has no header row")
 
-        headers = list(reader.fieldnames)
-
-        # Detect MT5 split date/time columns
-        col_date = None
-        col_time = None
-        for h in headers:
-            nh = _norm(h)
-            if nh == "date":
-                col_date = h
-            elif nh == "time":
-                col_time = h
-
-        use_split_dt = (col_date is not None and col_time is not None)
-
-        # OHLCV columns
-        col_t = _find_col(headers, "time")  # for non-split timestamp column
-        col_o = _find_col(headers, "open")
-        col_h = _find_col(headers, "high")
-        col_l = _find_col(headers, "low")
-        col_c = _find_col(headers, "close")
-        col_v = _find_col(headers, "volume")  # optional
-
-        # Required columns check
-        missing = []
-        if not use_split_dt and col_t is None:
-            missing.append("time")
-        if col_o is None:
-            missing.append("open")
-        if col_h is None:
-            missing.append("high")
-        if col_l is None:
-            missing.append("low")
-        if col_c is None:
-            missing.append("close")
-
-        if missing:
-            raise ValueError(f"Missing required columns: {missing}. Found headers={headers}")
-
-        out: List[Candle] = []
+        cols = _resolve_columns(headers)
+        pos = {h: i for i, h in enumerate(headers)}
+        width = len(headers)
+
+        ts_raw: List[str] = []
+        raw: Tuple[List[str], ...] = ([], [], [], [], [])
+        idx = [pos[cols[k]] for k in ("open", "high", "low", "close")]
+        iv = pos[cols["volume"]] if cols["volume"] is not None else None
+        if cols["date"] is not None:
+            i_date, i_time = pos[cols["date"]], pos[cols["time"]]
+        else:
+            i_date, i_time = None, pos[cols["ts"]]
+
+        for i, row in enumerate(reader):
+            if limit is not None and i >= limit:
+                break
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            if i_date is not None:
+                ts_raw.append(f"{row[i_date]} {row[i_time]}")
+            else:
+                ts_raw.append(row[i_time])
+            for col, j in zip(raw, idx):
+                col.append(row[j])
+            if iv is not None:
+                raw[4].append(row[iv].strip() or "0")
+
+    try:
+        ts = _parse_ts_column(ts_raw)
+        o, h, l, c = (np.asarray(col, dtype=np.float64) for col in raw[:4])
+        v = np.asarray(raw[4], dtype=np.float64) if iv is not None else np.zeros(len(ts_raw), dtype=np.float64)
+        ok = (l <= o) & (o <= h) & (l <= c) & (c <= h)
+        if not ok.all():
+            raise ValueError("invalid OHLC range")
+    except Exception:
+        # slow path only to raise the precise legacy error message
+        _raise_first_bad_row(path, delim, limit=limit)
+        raise
+
+    return _finalize_columns(
+        CandleArray(ts=ts, o=o, h=h, l=l, c=c, v=v),
+        sort_by_ts=sort_by_ts,
+        drop_duplicates=drop_duplicates,
+    )
+
+
+def _resolve_columns(headers: List[str]) -> Dict[str, Optional[str]]:
+    # Detect MT5 split date/time columns
+    col_date = None
+    col_time = None
+    for h in headers:
+        nh = _norm(h)
+        if nh == "date":
+            col_date = h
+        elif nh == "time":
+            col_time = h
+
+    use_split_dt = (col_date is not None and col_time is not None)
+
+    # OHLCV columns
+    col_t = _find_col(headers, "time")  # for non-split timestamp column
+    col_o = _find_col(headers, "open")
+    col_h = _find_col(headers, "high")
+    col_l = _find_col(headers, "low")
+    col_c = _find_col(headers, "close")
+    col_v = _find_col(headers, "volume")  # optional
+
+    # Required columns check
+    missing = []
+    if not use_split_dt and col_t is None:
+        missing.append("time")
+    if col_o is None:
+        missing.append("open")
+    if col_h is None:
+        missing.append("high")
+    if col_l is None:
+        missing.append("low")
+    if col_c is None:
+        missing.append("close")
+
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}. Found headers={headers}")
+
+    return {
+        "date": col_date if use_split_dt else None,
+        "time": col_time if use_split_dt else None,
+        "ts": col_t,
+        "open": col_o,
+        "high": col_h,
+        "low": col_l,
+        "close": col_c,
+        "volume": col_v,
+    }
+
+
+def _raise_first_bad_row(path: str, delim: str, *, limit: Optional[int]) -> None:
+    """Strict per-row validation (the original loader loop); raises on the first bad row."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f, delimiter=delim)
+        cols = _resolve_columns(list(reader.fieldnames or []))
+        col_v = cols["volume"]
+
         for i, row in enumerate(reader):
             if limit is not None and i >= limit:
                 break
 
             try:
-                if use_split_dt:
-                    ts = _parse_ts(f"{row[col_date]} {row[col_time]}")  # type: ignore[index]
+                if cols["date"] is not None:
+                    _parse_ts(f"{row[cols['date']]} {row[cols['time']]}")  # type: ignore[index]
                 else:
-                    ts = _parse_ts(row[col_t])  # type: ignore[index]
+                    _parse_ts(row[cols["ts"]])  # type: ignore[index]
 
-                o = float(row[col_o])  # type: ignore[index]
-                h = float(row[col_h])  # type: ignore[index]
-                l = float(row[col_l])  # type: ignore[index]
-                c = float(row[col_c])  # type: ignore[index]
+                o = float(row[cols["open"]])  # type: ignore[index]
+                h = float(row[cols["high"]])  # type: ignore[index]
+                l = float(row[cols["low"]])  # type: ignore[index]
+                c = float(row[cols["close"]])  # type: ignore[index]
 
-                v = 0.0
                 if col_v is not None:
                     vv = (row.get(col_v, "") or "").strip()
                     if vv != "":
-                        v = float(vv)
+                        float(vv)
             except Exception as e:
                 raise ValueError(f"Bad row at line={i+2}: {row}. Err={e}") from e
 
@@ -212,20 +444,23 @@ def load_candles_csv(
             if not (l <= o <= h and l <= c <= h):
                 raise ValueError(f"Invalid OHLC range at line={i+2}: {row}")
 
-            out.append(Candle(ts=ts, o=o, h=h, l=l, c=c, v=v))
+
+def _finalize_columns(arr: CandleArray, *, sort_by_ts: bool, drop_duplicates: bool) -> CandleArray:
+    """
+    Sort (stable) and drop duplicate timestamps, keeping the later row
+    of each consecutive duplicate run (same rule as the old list path).
+    """
+    if len(arr) == 0:
+        return arr
 
     if sort_by_ts:
-        out.sort(key=lambda x: x.ts)
-
-    if drop_duplicates:
-        dedup: List[Candle] = []
-        last_ts: Optional[int] = None
-        for c in out:
-            if last_ts is not None and c.ts == last_ts:
-                dedup[-1] = c  # keep later
-            else:
-                dedup.append(c)
-            last_ts = c.ts
-        out = dedup
+        order = np.argsort(arr.ts, kind="stable")
+        arr = CandleArray(arr.ts[order], arr.o[order], arr.h[order], arr.l[order], arr.c[order], arr.v[order])
+
+    if drop_duplicates and len(arr) > 1:
+        keep = np.ones(len(arr), dtype=bool)
+        keep[:-1] = arr.ts[:-1] != arr.ts[1:]
+        if not keep.all():
+            arr = CandleArray(arr.ts[keep], arr.o[keep], arr.h[keep], arr.l[keep], arr.c[keep], arr.v[keep])
 
-    return [c.to_dict() for c in out]
+    return arr
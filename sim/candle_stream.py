@@ -0,0 +1,243 @@
+# sim/candle_stream.py
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from sim.candle_array import CANDLE_FIELDS, CandleArray
+from sim.candle_loader import (
+    _detect_delimiter,
+    _parse_ts_column,
+    _raise_first_bad_row,
+    _resolve_columns,
+)
+
+
+@dataclass
+class StreamStats:
+    rows: int = 0
+    emitted: int = 0
+    duplicates: int = 0
+    out_of_order: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "emitted": self.emitted,
+            "duplicates": self.duplicates,
+            "out_of_order": self.out_of_order,
+        }
+
+
+def iter_candle_chunks(
+    path: str,
+    *,
+    chunk_size: int = 50_000,
+    limit: Optional[int] = None,
+) -> Iterator[CandleArray]:
+    """
+    Parse a candle CSV in file order, chunk_size rows at a time.
+    Same column detection and batch conversion as load_candles_csv, but only
+    one chunk of raw strings is alive at once. No sorting/dedup here.
+    """
+    chunk_size = max(int(chunk_size), 1)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delim = _detect_delimiter(sample)
+
+        reader = csv.reader(f, delimiter=delim)
+        headers = next(reader, None)
+        if headers is None:
+            raise ValueError("CSV has no header row")
+
+        cols = _resolve_columns(headers)
+        pos = {h: i for i, h in enumerate(headers)}
+        width = len(headers)
+        idx = [pos[cols[k]] for k in ("open", "high", "low", "close")]
+        iv = pos[cols["volume"]] if cols["volume"] is not None else None
+        if cols["date"] is not None:
+            i_date, i_time = pos[cols["date"]], pos[cols["time"]]
+        else:
+            i_date, i_time = None, pos[cols["ts"]]
+
+        n_read = 0
+        while True:
+            # before reading: limit=0 yields nothing (same as load_candles_csv)
+            if limit is not None and n_read >= limit:
+                return
+            ts_raw: List[str] = []
+            raw: List[List[str]] = [[], [], [], [], []]
+            for row in reader:
+                if len(row) < width:
+                    row = row + [""] * (width - len(row))
+                if i_date is not None:
+                    ts_raw.append(f"{row[i_date]} {row[i_time]}")
+                else:
+                    ts_raw.append(row[i_time])
+                for col, j in zip(raw, idx):
+                    col.append(row[j])
+                if iv is not None:
+                    raw[4].append(row[iv].strip() or "0")
+                n_read += 1
+                if len(ts_raw) >= chunk_size or (limit is not None and n_read >= limit):
+                    break
+
+            if not ts_raw:
+                return
+
+            try:
+                ts = _parse_ts_column(ts_raw)
+                o, h, l, c = (np.asarray(col, dtype=np.float64) for col in raw[:4])
+                v = np.asarray(raw[4], dtype=np.float64) if iv is not None else None
+                if not ((l <= o) & (o <= h) & (l <= c) & (c <= h)).all():
+                    raise ValueError("invalid OHLC range")
+            except Exception:
+                _raise_first_bad_row(path, delim, limit=limit)
+                raise
+
+            yield CandleArray(ts=ts, o=o, h=h, l=l, c=c, v=v)
+
+
+def iter_candles(
+    path: str,
+    *,
+    chunk_size: int = 50_000,
+    limit: Optional[int] = None,
+    drop_duplicates: bool = True,
+    on_out_of_order: str = "drop",
+    stats: Optional[StreamStats] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream candle dicts from a CSV in bounded memory.
+
+    - drop_duplicates: consecutive equal ts keep the later row (same rule as
+      load_candles_csv); one candle is held back to allow this.
+    - on_out_of_order: "drop" skips rows older than the last emitted ts,
+      "raise" stops with ValueError, "keep" passes them through.
+      (load_candles_csv sorts in memory instead; a stream cannot.)
+    """
+    if on_out_of_order not in ("drop", "raise", "keep"):
+        raise ValueError(f"on_out_of_order must be drop/raise/keep, got {on_out_of_order!r}")
+    st = stats if stats is not None else StreamStats()
+
+    pending: Optional[Dict[str, Any]] = None
+    for chunk in iter_candle_chunks(path, chunk_size=chunk_size, limit=limit):
+        for cd in chunk:
+            st.rows += 1
+            if pending is not None:
+                if drop_duplicates and cd["ts"] == pending["ts"]:
+                    st.duplicates += 1
+                    pending = cd  # keep later
+                    continue
+                if cd["ts"] < pending["ts"]:
+                    st.out_of_order += 1
+                    if on_out_of_order == "raise":
+                        raise ValueError(f"out-of-order candle at row={st.rows}: ts={cd['ts']} < {pending['ts']}")
+                    if on_out_of_order == "drop":
+                        continue
+                st.emitted += 1
+                yield pending
+            pending = cd
+
+    if pending is not None:
+        st.emitted += 1
+        yield pending
+
+
+class CandleWindow:
+    """
+    Fixed-capacity ring buffer of the most recent candles.
+
+    Each column is stored twice (slots i and i+capacity), so the newest
+    `capacity` bars are always one contiguous slice: view() is a zero-copy
+    CandleArray and push() is O(1).
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(int(capacity), 1)
+        self._cols = {
+            f: np.zeros(2 * self.capacity, dtype=np.int64 if f == "ts" else np.float64)
+            for f in CANDLE_FIELDS
+        }
+        self._head = 0  # next write slot in [0, capacity)
+        self.total = 0  # candles pushed so far
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def push(self, candle: Dict[str, Any]) -> None:
+        i = self._head
+        j = i + self.capacity
+        for f in CANDLE_FIELDS:
+            if f == "ts":
+                x = int(candle.get("ts", 0) or 0)
+            elif f == "v":
+                x = float(candle.get("v", 0.0) or 0.0)
+            else:
+                x = float(candle[f])
+            col = self._cols[f]
+            col[i] = x
+            col[j] = x
+        self._head = (i + 1) % self.capacity
+        self.total += 1
+
+    def view(self) -> CandleArray:
+        """Oldest -> newest view of the buffered candles (shares memory with the buffer)."""
+        n = len(self)
+        end = self._head + self.capacity
+        start = end - n
+        c = self._cols
+        return CandleArray(
+            c["ts"][start:end], c["o"][start:end], c["h"][start:end],
+            c["l"][start:end], c["c"][start:end], c["v"][start:end],
+        )
+
+
+class StreamingCandleDataSource:
+    """
+    MockCandleDataSource-compatible adapter (next/seek/pos) over iter_candles.
+    Forward seeks skip ahead in the stream; backward seeks reopen the file.
+    Optionally keeps the last `lookback` candles in a CandleWindow.
+    """
+
+    def __init__(self, path: str, *, chunk_size: int = 50_000, lookback: int = 0, **stream_kwargs: Any) -> None:
+        self.path = path
+        self.chunk_size = int(chunk_size)
+        self.stream_kwargs = dict(stream_kwargs)
+        self.lookback = int(lookback)
+        self._open()
+
+    def _open(self) -> None:
+        self.stats = StreamStats()
+        self._it = iter_candles(self.path, chunk_size=self.chunk_size, stats=self.stats, **self.stream_kwargs)
+        self.idx = 0
+        self._window = CandleWindow(self.lookback) if self.lookback > 0 else None
+
+    def next(self) -> Optional[Dict[str, Any]]:
+        c = next(self._it, None)
+        if c is None:
+            return None
+        self.idx += 1
+        if self._window is not None:
+            self._window.push(c)
+        return c
+
+    def seek(self, idx: int) -> None:
+        idx = max(0, int(idx))
+        if idx < self.idx:
+            self._open()
+        while self.idx < idx:
+            if self.next() is None:
+                break
+
+    def pos(self) -> int:
+        return int(self.idx)
+
+    def window(self) -> CandleArray:
+        if self._window is None:
+            return CandleArray.empty()
+        return self._window.view()
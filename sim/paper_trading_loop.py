@@ -28,6 +28,10 @@ class PaperTradingLoop:
         run_id: str = "",
         strategy_hash: str = "",
         checkpoint_every: int = 10,
+        journal_logger=None,
+        heartbeat_every: int = 0,
+        state_manager: Optional[CoreStateManager] = None,
+        state_every: int = 0,
     ):
         self.data_source = data_source
         self.lifecycle_sim = lifecycle_sim
@@ -40,8 +44,6 @@ class PaperTradingLoop:
         self.metrics = Metrics()
         self.state_manager = state_manager
         self.state_every = int(state_every)
-        self.state_manager.load_into(rl, trade_memory, session_guard, lifecycle=self.lifecycle_sim)
-        self.state_manager.save(rl, trade_memory, session_guard, lifecycle=self.lifecycle_sim)
         self._stop = False
 
         self.steps = 0
@@ -53,7 +55,27 @@ class PaperTradingLoop:
     def stop(self):
         self._stop = True
 
+    def flush(self):
+        """Push buffered journal events to disk (BufferedJournal); no-op otherwise."""
+        if self.journal_logger is None:
+            return
+        try:
+            self.journal_logger.flush()
+        except Exception:
+            pass
+
+    def close(self):
+        """Flush and close the journal (run() does this on exit)."""
+        if self.journal_logger is None:
+            return
+        try:
+            self.journal_logger.close()
+        except Exception:
+            pass
+
     def _save_state(self):
+        # journal on disk first: a resumed run never skips events it already counted
+        self.flush()
         if self.state_store is None:
             return
         st = LoopState(idx=self.data_source.pos(), run_id=self.run_id, strategy_hash=self.strategy_hash)
@@ -103,44 +125,48 @@ class PaperTradingLoop:
             
         self.metrics.on_step()
 
-        while not self._stop:
-            if max_steps is not None and self.steps >= int(max_steps):
-                break
-
-            candle = self.data_source.next()
-            if candle is None:
-                break
-
-            self.steps += 1
-            out = self.lifecycle_sim.step(candle)
-            if out is None:
+        try:
+            while not self._stop:
+                if max_steps is not None and self.steps >= int(max_steps):
+                    break
+
+                candle = self.data_source.next()
+                if candle is None:
+                    break
+
+                self.steps += 1
+                out = self.lifecycle_sim.step(candle)
+                if out is None:
+                    if self.checkpoint_every > 0 and (self.steps % self.checkpoint_every == 0):
+                        self._save_state()
+                    continue
+
+                self.metrics.on_decision()
+                if out.get("order") is not None:
+                    self.metrics.on_order()
+                if out.get("execution") is not None:
+                    self.metrics.on_execution()
+                if out.get("outcome") is not None:
+                    oc = out["outcome"]
+                    self.metrics.on_outcome(pnl=float(oc.get("pnl", 0.0)), win=bool(oc.get("win", False)))
                 if self.checkpoint_every > 0 and (self.steps % self.checkpoint_every == 0):
                     self._save_state()
-                continue
-
-            self.metrics.on_decision()
-            if out.get("order") is not None:
-                self.metrics.on_order()
-            if out.get("execution") is not None:
-                self.metrics.on_execution()
-            if out.get("outcome") is not None:
-                oc = out["outcome"]
-                self.metrics.on_outcome(pnl=float(oc.get("pnl", 0.0)), win=bool(oc.get("win", False)))
-            if self.checkpoint_every > 0 and (self.steps % self.checkpoint_every == 0):
-                self._save_state()
-            if self.journal_logger is not None and self.heartbeat_every > 0:
-                if self.metrics.steps % self.heartbeat_every == 0:
-                    try:
-                        self.journal_logger.log_heartbeat({
-                            "run_id": self.run_id,
-                            "strategy_hash": self.strategy_hash,
-                            "idx": self.data_source.pos(),
-                            "metrics": self.metrics.to_dict(),
-                        })
-                    except Exception:
-                         pass
-        # final save on exit
-        self._save_state()
+                if self.journal_logger is not None and self.heartbeat_every > 0:
+                    if self.metrics.steps % self.heartbeat_every == 0:
+                        try:
+                            self.journal_logger.log_heartbeat({
+                                "run_id": self.run_id,
+                                "strategy_hash": self.strategy_hash,
+                                "idx": self.data_source.pos(),
+                                "metrics": self.metrics.to_dict(),
+                            })
+                        except Exception:
+                             pass
+            # final save on exit
+            self._save_state()
+        finally:
+            # journal closed even when a step raises
+            self.close()
 
         return LoopReport(
             steps=self.steps,
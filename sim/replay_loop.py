@@ -18,29 +18,67 @@ class ReplayLoop:
       - maintains a rolling candle window
       - computes features via FeatureSet
       - calls DecisionEngine.evaluate_trade(features)
+
+    When the feature set supports update() and `window` covers its
+    required_window(), features are computed incrementally (O(1) per bar)
+    instead of re-running compute() over the whole window.
+
+    run() on a fresh loop with a full history precomputes every bar's features
+    with FeatureSet.compute_all() and only looks up row i per step.
     """
 
-    def __init__(self, feature_set, decision_engine, window: int = 50):
+    def __init__(
+        self,
+        feature_set,
+        decision_engine,
+        window: int = 50,
+        incremental: bool = True,
+        precompute: bool = True,
+    ):
         self.feature_set = feature_set
         self.decision_engine = decision_engine
         self.window = int(window)
 
+        self.precompute = bool(precompute and hasattr(feature_set, "compute_all"))
+
         self._candles: List[Dict[str, Any]] = []
+        self._seen = 0
+        self.incremental = bool(
+            incremental
+            and hasattr(feature_set, "update")
+            and self.window >= int(feature_set.required_window())
+        )
+        if self.incremental and hasattr(feature_set, "reset"):
+            feature_set.reset()
 
     def step(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self._candles.append(candle)
-        if len(self._candles) < 2:
-            return None
+        if self.incremental:
+            self._seen += 1
+            trade_features = self.feature_set.update(candle)
+            if self._seen < 2:
+                return None
+        else:
+            self._candles.append(candle)
+            if len(self._candles) < 2:
+                return None
+
+            if len(self._candles) > self.window:
+                self._candles = self._candles[-self.window :]
 
-        if len(self._candles) > self.window:
-            self._candles = self._candles[-self.window :]
+            trade_features = self.feature_set.compute(self._candles)
 
-        trade_features = self.feature_set.compute(self._candles)
+        return self._decide(trade_features)
+
+    def _decide(self, trade_features: Dict[str, Any]) -> Dict[str, Any]:
         allow, score, risk = self.decision_engine.evaluate_trade(trade_features)
 
         return {"allow": allow, "score": score, "risk": risk, "features": trade_features}
 
     def run(self, candles: Sequence[Dict[str, Any]]) -> ReplayResult:
+        fresh = self._seen == 0 and not self._candles
+        if self.precompute and fresh and hasattr(candles, "__len__") and hasattr(candles, "__getitem__"):
+            return self._run_precomputed(candles)
+
         steps = 0
         decisions = 0
         allows = 0
@@ -53,3 +91,27 @@ class ReplayLoop:
             if out["allow"]:
                 allows += 1
         return ReplayResult(steps=steps, decisions=decisions, allows=allows)
+
+    def _run_precomputed(self, candles: Sequence[Dict[str, Any]]) -> ReplayResult:
+        fm = self.feature_set.compute_all(candles, window=self.window)
+        n = len(fm)
+
+        decisions = 0
+        allows = 0
+        for i in range(1, n):
+            out = self._decide(fm.row(i))
+            decisions += 1
+            if out["allow"]:
+                allows += 1
+
+        # leave the loop where step() would be, so it can keep going afterwards
+        tail = list(candles[max(0, n - self.window):])
+        if self.incremental:
+            self.feature_set.reset()
+            for c in tail:
+                self.feature_set.update(c)
+            self._seen = n
+        else:
+            self._candles = tail
+
+        return ReplayResult(steps=n, decisions=decisions, allows=allows)
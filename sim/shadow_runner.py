@@ -6,6 +6,8 @@ from typing import Any, Dict, Optional
 import random
 import traceback
 
+from sim.candle_stream import CandleWindow
+
 
 def _regime_key(risk_cfg: Dict[str, Any]) -> str:
     if not isinstance(risk_cfg, dict):
@@ -81,6 +83,9 @@ class ShadowRunner:
     - __init__ accepts risk_engine (optional) to avoid 'unexpected keyword'
     - run() accepts candles in many forms:
         run(candles, ...) OR run(candles=...) OR run(rows=...) OR run(data=...)
+    - optional feature_set (FeatureSet): per-step features are merged into
+      trade_features; on sequence input they are precomputed once with
+      compute_all() and looked up per step.
     """
 
     def __init__(
@@ -90,9 +95,11 @@ class ShadowRunner:
         outcome_updater=None,
         seed: Optional[int] = None,
         train: bool = False,
+        feature_set=None,
         **kwargs,
     ) -> None:
         self.de = decision_engine
+        self.feature_set = feature_set
         self.risk_engine = risk_engine
         self.outcome_updater = outcome_updater
         self.train = bool(train)
@@ -143,108 +150,166 @@ class ShadowRunner:
             except Exception:
                 pass
 
+        if not hasattr(candles, "__len__") or not hasattr(candles, "__getitem__"):
+            # iterator/generator input (e.g. sim.candle_stream.iter_candles): bounded memory
+            self._run_stream(candles, stats, int(lookback), int(max_steps), int(horizon), train_mode, journal)
+            return stats
+
         n = len(candles)
         start = max(int(lookback), 0)
         end = min(n - int(horizon), start + int(max_steps))
         if end <= start:
             return stats
 
+        # row i - 1 of the matrix == features of candles[i - lookback : i]
+        fm = None
+        if self.feature_set is not None and hasattr(self.feature_set, "compute_all"):
+            fm = self.feature_set.compute_all(candles[:end], window=max(lookback, 1))
+
         for i in range(start, end):
             stats.steps += 1
             window = candles[i - lookback : i]
-            trade_features = {"candles": window, "step": i}
+            feats = fm.row(i - 1) if fm is not None and i > 0 else None
+            self._run_step(stats, i, window, train_mode, journal, features=feats)
 
-            try:
-                allow, score, risk_cfg = self.de.evaluate_trade(trade_features)
-                stats.decisions += 1
-
-                risk_cfg = risk_cfg or {}
-                forced = bool(risk_cfg.get("forced", False))
-
-                regime = _regime_key(risk_cfg)
-                conf = _regime_conf(risk_cfg)
-                row = stats._rb_row(regime)
-                row["decisions"] += 1
-                if conf > 0:
-                    row["conf_sum"] += float(conf)
-                    row["conf_n"] += 1
-
-                if bool(allow):
-                    stats.allow += 1
-                    row["allow"] += 1
-                    if forced:
-                        stats.forced_entries += 1
-                        row["forced"] += 1
-                else:
-                    stats.deny += 1
-                    row["deny"] += 1
-
-                if journal is not None:
-                    try:
-                        journal.log_decision(
-                            step=i,
-                            allow=bool(allow),
-                            score=float(score),
-                            risk=risk_cfg,
-                            forced=forced,
-                            payload={"candles_len": len(window)},
-                        )
-                    except Exception:
-                        pass
+        return stats
 
-                # training outcome
-                if train_mode and bool(allow):
-                    outcome = self.simulate_outcome(float(score))
-                    stats.outcomes += 1
-                    row["outcomes"] += 1
-
-                    if outcome.get("win"):
-                        stats.wins += 1
-                        row["wins"] += 1
-                    else:
-                        stats.losses += 1
-                        row["losses"] += 1
-
-                    pnl = float(outcome.get("pnl", 0.0))
-                    stats.total_pnl += pnl
-                    row["pnl"] += pnl
-
-                    snapshot = {
-                        "step": i,
-                        "features": trade_features,
-                        "risk_cfg": risk_cfg,
-                        "meta": (risk_cfg.get("meta", {}) or {}),
-                    }
-                    if self.outcome_updater is not None:
-                        try:
-                            self.outcome_updater.process_outcome(snapshot, outcome)
-                        except Exception:
-                            pass
-
-                    if journal is not None:
-                        try:
-                            journal.log_outcome(step=i, outcome=outcome)
-                        except Exception:
-                            pass
-
-            except Exception as e:
-                stats.errors += 1
+    def _run_stream(
+        self,
+        candles,
+        stats: ShadowStats,
+        lookback: int,
+        max_steps: int,
+        horizon: int,
+        train_mode: bool,
+        journal,
+    ) -> None:
+        """
+        Same steps as the list path, but only lookback + horizon + 1 bars are
+        ever held (ring buffer). Step i runs once bar i + horizon has arrived,
+        which matches the list path's `end = len(candles) - horizon` rule.
+        """
+        lookback = max(lookback, 0)
+        buf = CandleWindow(lookback + horizon + 1)
+        i = lookback
+        end = lookback + max_steps
+        if end <= i:
+            return
+
+        for c in candles:
+            buf.push(c)
+            if buf.total - 1 < i + horizon:
+                continue
+            stats.steps += 1
+            # copied out of the ring buffer: trade_features["candles"] may be kept
+            # (lifecycle / outcome snapshots) after later bars overwrite the slots
+            window = buf.view()[:lookback].copy()
+            feats = self.feature_set.compute(window) if self.feature_set is not None else None
+            self._run_step(stats, i, window, train_mode, journal, features=feats)
+            i += 1
+            if i >= end:
+                break
+
+    def _run_step(
+        self,
+        stats: ShadowStats,
+        i: int,
+        window,
+        train_mode: bool,
+        journal,
+        features: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        trade_features = dict(features) if features else {}
+        trade_features.update({"candles": window, "step": i})
+
+        try:
+            allow, score, risk_cfg = self.de.evaluate_trade(trade_features)
+            stats.decisions += 1
+
+            risk_cfg = risk_cfg or {}
+            forced = bool(risk_cfg.get("forced", False))
+
+            regime = _regime_key(risk_cfg)
+            conf = _regime_conf(risk_cfg)
+            row = stats._rb_row(regime)
+            row["decisions"] += 1
+            if conf > 0:
+                row["conf_sum"] += float(conf)
+                row["conf_n"] += 1
+
+            if bool(allow):
+                stats.allow += 1
+                row["allow"] += 1
+                if forced:
+                    stats.forced_entries += 1
+                    row["forced"] += 1
+            else:
+                stats.deny += 1
+                row["deny"] += 1
+
+            if journal is not None:
                 try:
-                    risk_cfg_local = locals().get("risk_cfg") or {}
-                    regime = _regime_key(risk_cfg_local)
-                    stats._rb_row(regime)["errors"] += 1
+                    journal.log_decision(
+                        step=i,
+                        allow=bool(allow),
+                        score=float(score),
+                        risk=risk_cfg,
+                        forced=forced,
+                        payload={"candles_len": len(window)},
+                    )
                 except Exception:
                     pass
 
-                if stats.errors <= 3:
-                    print("[ShadowRunner] FIRST ERROR:", repr(e))
-                    traceback.print_exc()
+            # training outcome
+            if train_mode and bool(allow):
+                outcome = self.simulate_outcome(float(score))
+                stats.outcomes += 1
+                row["outcomes"] += 1
+
+                if outcome.get("win"):
+                    stats.wins += 1
+                    row["wins"] += 1
+                else:
+                    stats.losses += 1
+                    row["losses"] += 1
+
+                pnl = float(outcome.get("pnl", 0.0))
+                stats.total_pnl += pnl
+                row["pnl"] += pnl
+
+                snapshot = {
+                    "step": i,
+                    "features": trade_features,
+                    "risk_cfg": risk_cfg,
+                    "meta": (risk_cfg.get("meta", {}) or {}),
+                }
+                if self.outcome_updater is not None:
+                    try:
+                        self.outcome_updater.process_outcome(snapshot, outcome)
+                    except Exception:
+                        pass
 
                 if journal is not None:
                     try:
-                        journal.log_error(step=i, error=traceback.format_exc())
+                        journal.log_outcome(step=i, outcome=outcome)
                     except Exception:
                         pass
-                continue
 
-        return stats
+        except Exception as e:
+            stats.errors += 1
+            try:
+                risk_cfg_local = locals().get("risk_cfg") or {}
+                regime = _regime_key(risk_cfg_local)
+                stats._rb_row(regime)["errors"] += 1
+            except Exception:
+                pass
+
+            if stats.errors <= 3:
+                print("[ShadowRunner] FIRST ERROR:", repr(e))
+                traceback.print_exc()
+
+            if journal is not None:
+                try:
+                    journal.log_error(step=i, error=traceback.format_exc())
+                except Exception:
+                    pass
@@ -0,0 +1,116 @@
+# sim/sl_tp_resolver.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+
+HIT_NONE = 0
+HIT_SL = 1
+HIT_TP = 2
+
+# rows x horizon cells handled per chunk (bounds the temporary masks)
+_CHUNK_CELLS = 1 << 21
+
+
+@dataclass
+class SLTPResult:
+    """
+    Per-entry resolution, all arrays of len(entries):
+      hit_idx: bar index of the first SL/TP touch (-1 if none in the horizon)
+      kind:    HIT_NONE / HIT_SL / HIT_TP
+      r:       R-multiple (NaN when nothing was hit)
+    """
+    hit_idx: np.ndarray
+    kind: np.ndarray
+    r: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.kind.shape[0])
+
+
+def _sides(side: Any, n: int) -> np.ndarray:
+    """+1 buy / -1 sell from a scalar or array of strings / signs."""
+    s = np.asarray(side)
+    if s.dtype.kind in "UO":
+        low = np.char.lower(s.astype(str))
+        out = np.where(low == "sell", -1, 1).astype(np.int8)
+    else:
+        out = np.where(s.astype(np.float64) < 0, -1, 1).astype(np.int8)
+    return np.broadcast_to(out, (n,))
+
+
+def resolve_sl_tp(
+    high: Any,
+    low: Any,
+    entries: Any,
+    sl: Any,
+    tp: Any,
+    side: Any = "buy",
+    horizon: int = 50,
+    *,
+    entry_price: Any = None,
+    sl_r: float = -1.0,
+    tp_r: Optional[float] = None,
+) -> SLTPResult:
+    """
+    First bar in (entry, entry + horizon] where an entry's SL or TP is touched,
+    for all entries at once.
+
+    Same rule as the bar loop (sim.shadow_execution._hit_tp_sl):
+      buy:  low <= sl -> SL, else high >= tp -> TP
+      sell: high >= sl -> SL, else low <= tp -> TP
+    so a bar touching both counts as SL. Windows are cut at the end of data.
+
+    R: SL -> sl_r; TP -> tp_r if given, else |tp - entry| / |entry - sl|
+    (needs entry_price).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    idx = np.asarray(entries, dtype=np.int64).reshape(-1)
+    n = idx.shape[0]
+    sl = np.broadcast_to(np.asarray(sl, dtype=np.float64), (n,))
+    tp = np.broadcast_to(np.asarray(tp, dtype=np.float64), (n,))
+    buy = _sides(side, n) > 0
+    H = max(int(horizon), 0)
+    m = high.shape[0]
+
+    hit_idx = np.full(n, -1, dtype=np.int64)
+    kind = np.zeros(n, dtype=np.int8)
+
+    if n and H and m:
+        steps = np.arange(1, H + 1, dtype=np.int64)
+        rows = max(_CHUNK_CELLS // H, 1)
+        for a in range(0, n, rows):
+            b = min(a + rows, n)
+            bars = idx[a:b, None] + steps            # (rows, H) bar indices
+            valid = bars < m
+            safe = np.minimum(bars, m - 1)
+            hi = high[safe]
+            lo = low[safe]
+            bb = buy[a:b, None]
+            s = sl[a:b, None]
+            t = tp[a:b, None]
+            sl_hit = np.where(bb, lo <= s, hi >= s) & valid
+            tp_hit = np.where(bb, hi >= t, lo <= t) & valid
+            any_hit = sl_hit | tp_hit
+            first = any_hit.argmax(axis=1)
+            has = any_hit[np.arange(b - a), first]
+            k = np.where(sl_hit[np.arange(b - a), first], HIT_SL, HIT_TP)
+            kind[a:b] = np.where(has, k, HIT_NONE)
+            hit_idx[a:b] = np.where(has, idx[a:b] + 1 + first, -1)
+
+    r = np.full(n, np.nan, dtype=np.float64)
+    r[kind == HIT_SL] = float(sl_r)
+    is_tp = kind == HIT_TP
+    if tp_r is not None:
+        r[is_tp] = float(tp_r)
+    elif is_tp.any():
+        if entry_price is None:
+            raise ValueError("entry_price is required when tp_r is None")
+        e = np.broadcast_to(np.asarray(entry_price, dtype=np.float64), (n,))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r[is_tp] = np.abs(tp[is_tp] - e[is_tp]) / np.abs(e[is_tp] - sl[is_tp])
+    return SLTPResult(hit_idx=hit_idx, kind=kind, r=r)
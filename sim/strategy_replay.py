@@ -0,0 +1,214 @@
+# sim/strategy_replay.py
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from brain.experts.expert_gate import ExpertGate
+from brain.experts.experts_basic import DEFAULT_EXPERTS
+from brain.regime_detector import RegimeDetector
+from brain.strategy_policy import StrategyPolicy
+from sim.candle_array import CandleArray, as_candle_array
+from sim.sl_tp_resolver import HIT_NONE, resolve_sl_tp
+
+
+TREND_REGIMES = ("trend_up", "trend_down", "trend")
+
+
+def atr_series(high: Any, low: Any, close: Any, period: int = 14) -> np.ndarray:
+    """Simple moving average of the true range (NaN until `period` bars exist)."""
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    n = len(c)
+    out = np.full(n, np.nan, dtype=np.float64)
+    p = max(int(period), 1)
+    if n < p:
+        return out
+    prev = np.concatenate(([c[0]], c[:-1]))
+    tr = np.maximum(h - l, np.maximum(np.abs(h - prev), np.abs(l - prev)))
+    cs = np.concatenate(([0.0], np.cumsum(tr)))
+    out[p - 1:] = (cs[p:] - cs[:-p]) / p
+    return out
+
+
+@dataclass
+class ReplayFeatures:
+    """
+    Genome-independent per-bar inputs, computed once per history:
+      score[i]    best expert-gate score on candles[..i]
+      side[i]     +1 buy / -1 sell (sign of the regime slope)
+      trend[i]    regime is a trend regime   (StrategyPolicy.only_trend)
+      high_vol[i] volatility_state "high"    (StrategyPolicy.avoid_high_vol)
+      atr[i]      ATR at bar i
+    """
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    score: np.ndarray
+    side: np.ndarray
+    regime: np.ndarray
+    trend: np.ndarray
+    high_vol: np.ndarray
+    atr: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.close.shape[0])
+
+    @classmethod
+    def compute(
+        cls,
+        candles: Any,
+        *,
+        gate: Optional[ExpertGate] = None,
+        weight_store: Any = None,
+        regime_detector: Optional[RegimeDetector] = None,
+        window: Optional[int] = 300,
+        atr_period: int = 14,
+        high_vol_q: float = 0.8,
+    ) -> "ReplayFeatures":
+        arr: CandleArray = as_candle_array(candles)
+        det = regime_detector or RegimeDetector()
+        res = det.detect_series(arr.c)
+        regimes = [r.regime for r in res]
+        slope = np.array([r.slope for r in res], dtype=np.float64)
+
+        gate = gate or ExpertGate(list(DEFAULT_EXPERTS), weight_store=weight_store)
+        score = gate.pick_batch(arr, regimes, window=window).best_score
+
+        atr = atr_series(arr.h, arr.l, arr.c, atr_period)
+        reg = np.array(regimes, dtype=object)
+        # "high" = volatile regime or ATR (relative to price) in the top quantile
+        rel = atr / np.where(np.abs(arr.c) > 1e-12, np.abs(arr.c), 1.0)
+        ok = np.isfinite(rel)
+        cut = np.quantile(rel[ok], high_vol_q) if ok.any() else np.inf
+        high_vol = (reg == "volatile") | (ok & (np.nan_to_num(rel, nan=0.0) > cut))
+
+        return cls(
+            high=arr.h,
+            low=arr.l,
+            close=arr.c,
+            score=np.asarray(score, dtype=np.float64),
+            side=np.where(slope < 0, -1, 1).astype(np.int8),
+            regime=reg,
+            trend=np.isin(reg, TREND_REGIMES),
+            high_vol=high_vol,
+            atr=atr,
+        )
+
+
+class ReplayStrategyEvaluator:
+    """
+    Genome-aware evaluator: replays a fixed history under StrategyPolicy(genome).
+
+    Every bar with a valid ATR and a full horizon ahead is a candidate entry at
+    its close, SL/TP at sl_atr_mult / tp_atr_mult ATRs. Per genome:
+      1. entry mask from the cached features (score >= entry_threshold,
+         only_trend, avoid_high_vol)  - O(n) boolean ops
+      2. R per candidate for (sl_atr_mult, tp_atr_mult), resolved once for
+         all candidates with sim.sl_tp_resolver and kept in an LRU cache
+      3. stats of the masked trades, in the shape compute_fitness() expects
+
+    Trades without a hit inside the horizon are marked to market at the
+    horizon close. drawdown = max drawdown of cumulative R / trade count.
+    """
+
+    def __init__(
+        self,
+        candles: Any = None,
+        *,
+        features: Optional[ReplayFeatures] = None,
+        horizon: int = 50,
+        warmup: int = 60,
+        max_cache: int = 256,
+        **feature_kwargs: Any,
+    ) -> None:
+        if features is None:
+            if candles is None:
+                raise ValueError("candles or features is required")
+            features = ReplayFeatures.compute(candles, **feature_kwargs)
+        self.f = features
+        self.horizon = max(int(horizon), 1)
+        self.max_cache = max(int(max_cache), 1)
+
+        n = len(features)
+        idx = np.arange(n)
+        valid = np.isfinite(features.atr) & (features.atr > 0) & (idx >= int(warmup)) & (idx + self.horizon < n)
+        self.entries = np.nonzero(valid)[0]
+        self._r_cache: "OrderedDict[Tuple[float, float], np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _r_multiples(self, sl_mult: float, tp_mult: float) -> np.ndarray:
+        key = (round(float(sl_mult), 9), round(float(tp_mult), 9))
+        r = self._r_cache.get(key)
+        if r is not None:
+            self.hits += 1
+            self._r_cache.move_to_end(key)
+            return r
+        self.misses += 1
+
+        f, e, H = self.f, self.entries, self.horizon
+        entry = f.close[e]
+        side = f.side[e].astype(np.float64)
+        risk = sl_mult * f.atr[e]
+        res = resolve_sl_tp(
+            f.high, f.low, e,
+            entry - side * risk,
+            entry + side * tp_mult * f.atr[e],
+            side=side,
+            horizon=H,
+            tp_r=tp_mult / sl_mult,
+        )
+        r = res.r
+        open_ = res.kind == HIT_NONE
+        r[open_] = side[open_] * (f.close[e[open_] + H] - entry[open_]) / risk[open_]
+
+        self._r_cache[key] = r
+        if len(self._r_cache) > self.max_cache:
+            self._r_cache.popitem(last=False)
+        return r
+
+    def entry_mask(self, policy: StrategyPolicy) -> np.ndarray:
+        f, e = self.f, self.entries
+        mask = f.score[e] >= policy.entry_threshold
+        if policy.only_trend:
+            mask &= f.trend[e]
+        if policy.avoid_high_vol:
+            mask &= ~f.high_vol[e]
+        return mask
+
+    def trades(self, genome: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """(entry bar indices, R per trade) of `genome` over the history."""
+        policy = StrategyPolicy(genome)
+        mask = self.entry_mask(policy)
+        if not mask.any():
+            return self.entries[:0], np.zeros(0, dtype=np.float64)
+        r = self._r_multiples(policy.sl_atr_mult, policy.tp_atr_mult)
+        return self.entries[mask], r[mask]
+
+    def evaluate(self, genome: Dict[str, Any]) -> Dict[str, Any]:
+        _idx, r = self.trades(genome)
+        return summarize_r(r)
+
+
+def summarize_r(r: Sequence[float]) -> Dict[str, Any]:
+    r = np.asarray(r, dtype=np.float64)
+    samples = int(r.shape[0])
+    if samples == 0:
+        return {"avg_pnl": 0.0, "win_rate": 0.0, "drawdown": 0.0, "samples": 0, "total_pnl": 0.0, "wins": 0, "losses": 0}
+    eq = np.cumsum(r)
+    dd = float(np.max(np.maximum.accumulate(np.maximum(eq, 0.0)) - eq))
+    wins = int(np.count_nonzero(r > 0))
+    return {
+        "avg_pnl": float(r.mean()),
+        "win_rate": wins / samples,
+        "drawdown": dd / samples,
+        "samples": samples,
+        "total_pnl": float(eq[-1]),
+        "wins": wins,
+        "losses": samples - wins,
+    }
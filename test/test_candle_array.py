@@ -0,0 +1,115 @@
+# test/test_candle_array.py
+import os
+import tempfile
+
+import numpy as np
+
+from sim.candle_array import CandleArray
+from sim.candle_loader import _parse_ts, _parse_ts_column, candle_cache_paths, load_candles_csv
+from sim.candle_stream import CandleWindow, StreamStats, iter_candle_chunks, iter_candles
+from sim.data_validator import validate_candles
+
+
+MT5_CSV = (
+    "<DATE>\t<TIME>\t<OPEN>\t<HIGH>\t<LOW>\t<CLOSE>\t<TICKVOL>\t<VOL>\t<SPREAD>\n"
+    "2025.01.01\t00:10\t101.0\t102.0\t100.0\t101.5\t12\t0\t5\n"
+    "2025.01.01\t00:00\t100.0\t101.0\t99.0\t100.5\t10\t0\t5\n"
+    "2025.01.01\t00:05\t100.5\t101.5\t99.5\t101.0\t11\t0\t5\n"
+    "2025.01.01\t00:05\t100.5\t101.6\t99.5\t101.1\t13\t0\t5\n"
+)
+
+
+def _write(d, text):
+    p = os.path.join(d, "xau.csv")
+    with open(p, "w", encoding="utf-8") as f:
+        f.write(text)
+    return p
+
+
+def test_loader_returns_sorted_dedup_candle_array():
+    with tempfile.TemporaryDirectory() as d:
+        arr = load_candles_csv(_write(d, MT5_CSV))
+
+    assert isinstance(arr, CandleArray)
+    assert len(arr) == 3
+    assert arr.ts.tolist() == [1735689600, 1735689900, 1735690200]
+    # duplicate 00:05 keeps the later row
+    assert arr[1] == {"ts": 1735689900, "o": 100.5, "h": 101.6, "l": 99.5, "c": 101.1, "v": 13.0}
+
+    rep = validate_candles(arr)
+    assert rep.n == 3 and rep.duplicates == 0 and rep.out_of_order == 0
+
+
+def test_candle_array_dict_compat_and_views():
+    candles = [{"ts": i * 60, "o": 1.0 + i, "h": 2.0 + i, "l": 0.5 + i, "c": 1.5 + i, "v": float(i)} for i in range(10)]
+    arr = CandleArray.from_dicts(candles)
+
+    assert arr.to_dicts() == candles
+    assert arr[-1]["c"] == 10.5
+    assert arr[-1].get("close", arr[-1].get("c")) == 10.5
+
+    w = arr[2:7]
+    assert isinstance(w, CandleArray) and len(w) == 5
+    assert np.shares_memory(w.c, arr.c)
+    assert [x["ts"] for x in w] == [120, 180, 240, 300, 360]
+    assert w["close"] is w.c
+
+
+def test_loader_cache_roundtrip_and_invalidation():
+    with tempfile.TemporaryDirectory() as d:
+        p = _write(d, MT5_CSV)
+        first = load_candles_csv(p)
+        npy_path, meta_path = candle_cache_paths(p)
+        assert os.path.exists(npy_path) and os.path.exists(meta_path)
+
+        cached = load_candles_csv(p)
+        assert isinstance(cached.c.base, np.memmap) or isinstance(cached.c, np.memmap)
+        assert cached.to_dicts() == first.to_dicts()
+
+        # appended row changes size/hash -> re-parse
+        with open(p, "a", encoding="utf-8") as f:
+            f.write("2025.01.01\t00:15\t101.5\t103.0\t101.0\t102.5\t9\t0\t5\n")
+        assert len(load_candles_csv(p)) == 4
+        assert len(load_candles_csv(p, cache=False)) == 4
+
+
+def test_batch_ts_parse_matches_per_row():
+    mixed = [
+        "2025.01.01 00:05",
+        "2025.01.01 00:05:30",
+        " 2025.01.01 00:10 ",
+        "2025.01.01",
+        "2025-01-01T12:30:00Z",
+        "2025-01-01T12:30:00+02:00",
+        "1735689600",
+        "1735689600123",
+    ]
+    for values in (mixed, ["2025.01.01 00:05"] * 80 + mixed, ["1735689600"] * 80 + mixed):
+        assert _parse_ts_column(values).tolist() == [_parse_ts(v) for v in values]
+
+
+def test_iter_candles_dedups_in_stream_and_window_is_bounded():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "plain.csv")
+        with open(p, "w", encoding="utf-8") as f:
+            f.write("time,open,high,low,close,volume\n")
+            for i, t in enumerate([60, 120, 120, 180, 100, 240, 300]):
+                f.write(f"{t},1,2,0,1.5,{i}\n")
+
+        st = StreamStats()
+        out = list(iter_candles(p, chunk_size=2, stats=st))
+
+        # limit counts raw rows, checked before each read (as load_candles_csv)
+        assert list(iter_candle_chunks(p, limit=0)) == []
+        assert list(iter_candles(p, limit=0)) == []
+        assert [len(ch) for ch in iter_candle_chunks(p, chunk_size=2, limit=3)] == [2, 1]
+        assert [len(ch) for ch in iter_candle_chunks(p, chunk_size=2, limit=4)] == [2, 2]
+
+    assert [c["ts"] for c in out] == [60, 120, 180, 240, 300]
+    assert out[1]["v"] == 2.0  # later duplicate kept
+    assert st.duplicates == 1 and st.out_of_order == 1
+
+    win = CandleWindow(3)
+    for c in out:
+        win.push(c)
+    assert win.view().ts.tolist() == [180, 240, 300]
@@ -0,0 +1,73 @@
+# test/test_context_memory.py
+from brain.context_intelligence import ContextIntelligence
+from brain.context_memory import ContextMemory
+
+
+F = {"regime": "range", "session": "LONDON"}
+
+
+def test_plain_sums_and_avg_outcome():
+    cm = ContextMemory()
+    for o in (1.0, -0.5, 2.0, -1.0):
+        cm.store(dict(F), 0.6, {}, o)
+    s = cm.get_stats(dict(F))
+    assert s["wins"] == 2 and s["losses"] == 2 and s["samples"] == 4 and s["count"] == 4
+    assert s["avg_outcome"] == 1.5 / 4
+    assert cm.history == {}
+    assert ContextIntelligence(cm).evaluate_context(dict(F))["samples"] == 4
+
+
+def test_decay_follows_regime_change():
+    plain, decayed = ContextMemory(), ContextMemory(half_life=20)
+    for i in range(400):
+        o = 1.0 if i < 300 else -1.0   # edge disappears after 300 trades
+        plain.store(dict(F), 0.5, {}, o)
+        decayed.store(dict(F), 0.5, {}, o)
+
+    assert plain.get_strength(F) == 0.75
+    assert decayed.get_strength(F) < 0.05
+    s = decayed.get_stats(F)
+    assert s["count"] == 400 and s["samples"] < 30          # ~ half_life / ln 2
+    assert s["avg_outcome"] < -0.9
+
+
+def test_reservoir_is_bounded_and_key_cached():
+    cm = ContextMemory(reservoir=8, seed=1)
+    f = dict(F)
+    cm.get_stats(f)
+    k = cm._key
+    assert cm._step_key(f, keep=False) is k  # store() after get_stats() reuses the key
+    assert cm._key is None
+    for i in range(500):
+        cm.store(f, 0.5, {"i": i}, 1.0)
+    (buf,) = cm.history.values()
+    assert len(buf) == 8
+    assert len({r["risk"]["i"] for r in buf}) == 8 and max(r["risk"]["i"] for r in buf) > 8
+
+
+def test_reused_dict_mutated_in_place_gets_fresh_key():
+    cm = ContextMemory()
+    f = {"regime": "trend_up", "features": {"v": 1}}
+    cm.store(f, 0.5, {}, 1.0)
+    f["features"]["v"] = 2  # nested change, same dict
+    assert cm.get_stats(f)["samples"] == 0
+    cm.new_step()
+    f["features"]["v"] = 1
+    assert cm.get_stats(f)["samples"] == 1
+    cm.store(f, 0.5, {}, 1.0)  # same step as get_stats(): cached key, then dropped
+    f["regime"] = "range"
+    assert cm.get_stats(f)["samples"] == 0
+
+
+def test_decayed_contexts_are_pruned():
+    cm = ContextMemory(half_life=10, reservoir=2)
+    for i in range(10_000):
+        cm.store({"regime": "range", "v": i * 0.001}, 0.5, {}, 1.0)  # continuous feature: all distinct
+    assert len(cm.memory) < 300 and cm.pruned > 9_000
+    assert cm.history.keys() == cm.memory.keys()
+    assert cm.get_stats({"regime": "range", "v": 9.999})["samples"] > 0.9
+
+    plain = ContextMemory()
+    for i in range(500):
+        plain.store({"v": i}, 0.5, {}, 1.0)
+    assert len(plain.memory) == 500  # no half_life -> plain sums, nothing pruned
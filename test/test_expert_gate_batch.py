@@ -0,0 +1,58 @@
+# test/test_expert_gate_batch.py
+import random
+
+import numpy as np
+import pytest
+
+from brain.experts.expert_gate import ExpertGate
+from brain.experts.experts_basic import DEFAULT_EXPERTS
+from brain.regime_detector import RegimeDetector
+from brain.weight_store import WeightStore
+from sim.candle_array import CandleArray
+
+
+class _ScalarOnly:
+    name = "SCALAR_ONLY"
+
+    def decide(self, features, context):
+        c = features["candles"]
+        return {"score": 0.5 if len(c) % 7 == 0 else 0.1}
+
+
+def _candles(n, seed=5):
+    rnd = random.Random(seed)
+    px, out = 2000.0, []
+    for i in range(n):
+        o = px
+        px += rnd.gauss(0.3 if (i // 80) % 2 else -0.3, 2.0)
+        out.append({"ts": i * 60, "o": o, "h": max(o, px) + 1, "l": min(o, px) - 1, "c": px, "v": 1.0})
+    return out
+
+
+def test_pick_batch_matches_scalar_pick():
+    candles = _candles(300)
+    regimes = [r.regime for r in RegimeDetector().detect_series([c["c"] for c in candles])]
+    regimes[5] = None
+    regimes[150] = "breakout"
+
+    ws = WeightStore()
+    ws.set("expert_regime", "TREND_MA|trend_up", 1.7)
+    ws.set("expert_regime", "MEAN_REVERT|range", 1.3)
+    ws.set("expert_regime", "SCALAR_ONLY|range", 2.0)
+
+    gate = ExpertGate(list(DEFAULT_EXPERTS) + [_ScalarOnly()], weight_store=ws)
+    window = 120
+    res = gate.pick_batch(CandleArray.from_dicts(candles), regimes, window=window)
+    assert len(res) == len(candles)
+
+    best_names = res.best_expert
+    best_scores = res.best_score
+    for i in range(len(candles)):
+        feats = {"candles": candles[max(0, i + 1 - window): i + 1]}
+        best, _ = gate.pick(feats, {"regime": regimes[i]})
+        assert best_names[i] == best.expert, i
+        # batch scores are weighted in array form: equal up to rounding
+        assert best_scores[i] == pytest.approx(best.score, rel=1e-9, abs=1e-12), i
+
+    assert len(set(best_names)) >= 3
+    assert np.all(res.weights[np.array(regimes, dtype=object) == "trend_up", 1] == 1.7)
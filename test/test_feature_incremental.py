@@ -0,0 +1,61 @@
+# test/test_feature_incremental.py
+import random
+
+import pytest
+
+from brain.feature.feature_set import FeatureSet
+
+
+def _candles(n, seed=7):
+    rnd = random.Random(seed)
+    out = []
+    px = 2000.0
+    for i in range(n):
+        o = px
+        c = o + rnd.gauss(0, 2.0)
+        h = max(o, c) + abs(rnd.gauss(0, 1.0))
+        l = min(o, c) - abs(rnd.gauss(0, 1.0))
+        # flat stretch exercises the zero-variance path after outliers slide out
+        v = 100.0 if 200 <= i < 300 else float(rnd.randint(50, 500) * (20 if i % 97 == 0 else 1))
+        out.append({"ts": i * 60, "o": o, "h": h, "l": l, "c": c, "v": v})
+        px = c
+    return out
+
+
+def _assert_same(a, b):
+    assert a.keys() == b.keys()
+    for k, v in a.items():
+        if isinstance(v, float):
+            assert b[k] == pytest.approx(v, rel=1e-9, abs=1e-9), k
+        else:
+            assert b[k] == v, k
+
+
+@pytest.mark.parametrize("window", [50, 80])
+def test_update_matches_batch_compute(window):
+    candles = _candles(600)
+    batch = FeatureSet()
+    inc = FeatureSet()
+    assert window >= inc.required_window()
+
+    for i, c in enumerate(candles):
+        expect = batch.compute(candles[max(0, i + 1 - window): i + 1])
+        got = inc.update(c)
+        _assert_same(expect, got)
+
+    inc.reset()
+    _assert_same(batch.compute(candles[:1]), inc.update(candles[0]))
+
+
+@pytest.mark.parametrize("window", [None, 50, 5])
+def test_compute_all_rows_match_compute(window):
+    from sim.candle_array import CandleArray
+
+    candles = _candles(400)
+    fs = FeatureSet()
+    fm = fs.compute_all(CandleArray.from_dicts(candles), window=window)
+    assert len(fm) == len(candles)
+
+    for i in range(len(candles)):
+        start = 0 if window is None else max(0, i + 1 - window)
+        _assert_same(fs.compute(candles[start: i + 1]), fm.row(i))
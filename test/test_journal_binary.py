@@ -0,0 +1,107 @@
+# test/test_journal_binary.py
+import os
+import random
+import tempfile
+
+from brain.journal import Journal
+from brain.journal_binary import BinaryJournal, JournalReader, convert_jsonl, is_binary_journal, iter_events
+from tools.health_dashboard import read_journal
+
+
+def _write_events(j, n=600, seed=1):
+    rnd = random.Random(seed)
+    for i in range(n):
+        run = "run-a" if i < n // 2 else "run-b"
+        j.append("decision", {"run_id": run, "payload": {"step": i, "allow": rnd.random() < 0.5}})
+        if i % 7 == 0:
+            j.append("order_plan", {"run_id": run, "step": i})
+        if i % 11 == 0:
+            j.append("outcome", {"run_id": run, "step": i, "pnl": rnd.uniform(-2, 2), "win": rnd.random() < 0.5})
+        if i % 50 == 0:
+            j.append("heartbeat", {"run_id": run, "idx": i, "metrics": {"steps": i, "decisions": i // 2}})
+        if i % 97 == 0:
+            j.append("risk_pause", {"run_id": run, "step": i})
+
+
+def test_binary_journal_filters_match_jsonl():
+    with tempfile.TemporaryDirectory() as d:
+        jl, jb = os.path.join(d, "j.jsonl"), os.path.join(d, "j.xjb")
+        _write_events(Journal(jl))
+        with BinaryJournal(jb) as j:
+            _write_events(j)
+        assert is_binary_journal(jb) and not is_binary_journal(jl)
+
+        for kw in (
+            {},
+            {"types": ("decision",), "step_min": 100, "step_max": 120},
+            {"types": ("outcome", "heartbeat"), "run_id": "run-b"},
+            {"limit": 50, "types": ("order_plan",)},
+            {"run_id": "nope"},
+        ):
+            assert list(iter_events(jb, **kw)) == list(iter_events(jl, **kw))
+
+        r = JournalReader(jb)
+        assert r.counts()["decision"] == 600
+        # any iterable, generators included
+        ids = r.type_ids(("outcome", "heartbeat"))
+        assert len(ids) == 2 and r.type_ids(t for t in ("outcome", "heartbeat")) == ids
+        assert read_journal(jb) == read_journal(jl)
+        assert read_journal(jl).decisions > 0 and read_journal(jl).max_seen_step == 595
+
+
+def test_binary_journal_recovers_torn_tail_and_stale_index():
+    with tempfile.TemporaryDirectory() as d:
+        jb = os.path.join(d, "j.xjb")
+        with BinaryJournal(jb) as j:
+            _write_events(j, n=100)
+        n = len(JournalReader(jb))
+
+        # crash mid-frame + index that never got the last entries
+        with open(jb, "ab") as f:
+            f.write(b"\xff\x00\x00\x00{\"type\":")
+        with open(jb + ".idx", "r+b") as f:
+            f.truncate(os.path.getsize(jb + ".idx") - 3 * 27)
+        assert len(JournalReader(jb)) == n
+
+        with BinaryJournal(jb) as j:  # reopen: torn frame cut, appends continue
+            j.append("decision", {"payload": {"step": 1000}})
+        r = JournalReader(jb)
+        assert len(r) == n + 1
+        assert [e["payload"]["step"] for e in r.events(step_min=1000)] == [1000]
+
+        jl = os.path.join(d, "back.jsonl")
+        j2 = Journal(jl)
+        for ev in iter_events(jb):
+            j2.append(ev.pop("type"), ev)
+        assert convert_jsonl(jl, os.path.join(d, "again.xjb")) == n + 1
+
+
+def test_health_checkpoint_incremental_matches_full_read():
+    from tools.health_dashboard import follow, read_journal_incremental
+
+    with tempfile.TemporaryDirectory() as d:
+        for name, make in (("j.jsonl", Journal), ("j.xjb", BinaryJournal)):
+            p, cp = os.path.join(d, name), os.path.join(d, name + ".health.json")
+            j = make(p)
+            for part in range(3):
+                _write_events(j, n=120, seed=part)
+                j.flush()
+                assert read_journal_incremental(p, cp) == read_journal(p)
+            if name.endswith(".jsonl"):
+                with open(p, "a", encoding="utf-8") as f:
+                    f.write('{"type":"decision","step":9999')  # line still being written
+                assert read_journal_incremental(p, cp).max_seen_step < 9999
+                with open(p, "a", encoding="utf-8") as f:
+                    f.write("}\n")
+                assert read_journal_incremental(p, cp).max_seen_step == 9999
+            j.close()
+
+            lines = []
+            s = follow(p, checkpoint_path=cp, interval=0.0, max_rounds=2, emit=lines.append)
+            assert s == read_journal(p) and lines[0].startswith("[health] +0")
+
+        # journal replaced by a shorter file -> checkpoint restarts from zero
+        p, cp = os.path.join(d, "j.jsonl"), os.path.join(d, "j.jsonl.health.json")
+        Journal(os.path.join(d, "x.jsonl")).append("decision", {"step": 1})
+        os.replace(os.path.join(d, "x.jsonl"), p)
+        assert read_journal_incremental(p, cp).decisions == 1
@@ -0,0 +1,56 @@
+# test/test_journal_buffered.py
+import json
+import os
+import tempfile
+
+from brain.journal import BufferedJournal, Journal, JournalEvent
+from brain.journal_logger import JournalLogger
+
+
+def _read(p):
+    with open(p, encoding="utf-8") as f:
+        return [json.loads(x) for x in f]
+
+
+def test_buffered_journal_matches_plain_journal():
+    with tempfile.TemporaryDirectory() as d:
+        plain, buf = os.path.join(d, "a.jsonl"), os.path.join(d, "sub", "b.jsonl")
+        j1 = Journal(plain)
+        j2 = BufferedJournal(buf, max_queue=16, batch_size=8, fsync="batch")
+        for i in range(500):
+            for j in (j1, j2):
+                j.append("decision", {"step": i, "allow": i % 2 == 0})
+                j.append(JournalEvent(type="outcome", payload={"step": i}))
+        j2.flush()
+        assert j2.written == 1000 and j2.pending == 0
+        j2.close()
+        j2.close()
+        assert _read(buf) == _read(plain)
+
+
+def test_buffered_journal_payload_snapshot_and_drop_policy():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "j.jsonl")
+        payload = {"x": 1}
+        with BufferedJournal(p) as j:
+            j.append("heartbeat", payload)
+            payload["x"] = 2  # mutation after append must not leak into the log
+        assert _read(p) == [{"type": "heartbeat", "x": 1}]
+
+        j = BufferedJournal(p, max_queue=1, on_full="drop", flush_interval=60.0)
+        for i in range(2000):
+            j.append("e", {"i": i})
+        j.close()
+        assert j.dropped > 0 and j.written + j.dropped == 2000
+
+
+def test_journal_logger_flush_close_hooks():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "j.jsonl")
+        logger = JournalLogger(journal=BufferedJournal(p), run_id="r1")
+        logger.log_heartbeat({"idx": 3})
+        logger.log_decision("i1", {"allow": True})
+        logger.flush()
+        rows = _read(p)
+        assert [r["type"] for r in rows] == ["heartbeat", "decision"]
+        logger.close()
@@ -0,0 +1,50 @@
+# test/test_market_view.py
+import random
+
+import numpy as np
+
+from brain.experts.experts_basic import DEFAULT_EXPERTS
+from brain.market_view import MarketView
+from brain.regime_detector import RegimeDetector
+from sim.candle_array import CandleArray
+
+
+def _candles(n, seed=11):
+    rnd = random.Random(seed)
+    px, out = 2000.0, []
+    for i in range(n):
+        o = px
+        px += rnd.gauss(0, 3.0)
+        out.append({"ts": i * 60, "o": o, "h": max(o, px) + 1.0, "l": min(o, px) - 1.0, "c": px, "v": 1.0})
+    return out
+
+
+def test_experts_and_regime_same_with_market_view():
+    candles = _candles(200)
+    det = RegimeDetector()
+
+    for end in (10, 45, 55, 70, 200):
+        window = candles[:end]
+        features = {"candles": window}
+        view = MarketView.from_candles(window)
+        assert view is not None and len(view) == end
+        assert det.detect(features, view=view) == det.detect(features)
+
+        for regime in ("range", "trend_up", "breakout"):
+            legacy = [e.decide(features, {"regime": regime}) for e in DEFAULT_EXPERTS]
+            shared = [e.decide(features, {"regime": regime, "market_view": view}) for e in DEFAULT_EXPERTS]
+            assert shared == legacy
+
+
+def test_market_view_readonly_and_fallbacks():
+    candles = _candles(20)
+    arr = CandleArray.from_dicts(candles)
+    view = MarketView.from_candles(arr)
+    assert np.shares_memory(view.closes, arr.c)
+    assert not view.closes.flags.writeable
+    assert view.tail(3) == [c["c"] for c in candles[-3:]]
+
+    # non-standard rows -> no view (callers keep legacy parsing)
+    assert MarketView.from_candles([{"close": 1.0}]) is None
+    assert MarketView.from_candles([{"x": "a\tb\tc\td\te\t1.0"}]) is None
+    assert MarketView.from_candles([(1, 2, 0, 1.5, 1.5)]) is None
@@ -0,0 +1,54 @@
+# test/test_paper_trading_loop.py
+import pytest
+
+from sim.paper_trading_loop import PaperTradingLoop
+
+
+class _Source:
+    def __init__(self, n):
+        self.i, self.n = 0, n
+
+    def next(self):
+        if self.i >= self.n:
+            return None
+        self.i += 1
+        return {"c": 1.0}
+
+    def pos(self):
+        return self.i
+
+    def seek(self, i):
+        self.i = i
+
+
+class _Lifecycle:
+    def __init__(self, fail_at=None):
+        self.fail_at, self.n = fail_at, 0
+
+    def step(self, candle):
+        self.n += 1
+        if self.n == self.fail_at:
+            raise RuntimeError("boom")
+        return None
+
+
+class _Logger:
+    def __init__(self):
+        self.closed = 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed += 1
+
+
+def test_run_closes_journal_on_exit_and_on_error():
+    log = _Logger()
+    rep = PaperTradingLoop(_Source(5), _Lifecycle(), journal_logger=log).run()
+    assert rep.steps == 5 and log.closed == 1
+
+    log = _Logger()
+    with pytest.raises(RuntimeError):
+        PaperTradingLoop(_Source(5), _Lifecycle(fail_at=3), journal_logger=log).run()
+    assert log.closed == 1
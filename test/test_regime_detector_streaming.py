@@ -0,0 +1,59 @@
+# test/test_regime_detector_streaming.py
+import random
+
+import pytest
+
+from brain.regime_detector import RegimeDetector
+from sim.candle_array import CandleArray
+
+
+def _closes(n, seed=3):
+    rnd = random.Random(seed)
+    px, out = 2000.0, []
+    for i in range(n):
+        drift = 0.8 if (i // 60) % 3 == 0 else (-0.8 if (i // 60) % 3 == 1 else 0.0)
+        px += drift + rnd.gauss(0, 1.5 if i % 150 < 120 else 8.0)
+        out.append(px)
+    return out
+
+
+def _same(got, want):
+    # regime must match exactly; vol/slope/confidence may differ in the last ulps:
+    # update() keeps a running sum of returns, detect() sums the window afresh,
+    # and detect_series() adds in array order (3.12+ sum() is compensated)
+    assert got.regime == want.regime
+    assert (got.vol, got.slope, got.confidence) == pytest.approx(
+        (want.vol, want.slope, want.confidence), rel=1e-9, abs=1e-12
+    )
+
+
+def test_streaming_and_series_match_detect():
+    closes = _closes(500)
+    candles = [{"o": c, "h": c + 1, "l": c - 1, "c": c, "v": 1.0} for c in closes]
+
+    ref = RegimeDetector()
+    stream = RegimeDetector()
+    series = RegimeDetector().detect_series(closes)
+    arr = CandleArray.from_dicts(candles)
+
+    regimes = set()
+    for i, c in enumerate(closes):
+        expect = ref.detect({"candles": candles[: i + 1]})
+        _same(stream.update(c), expect)
+        _same(series[i], expect)
+        _same(ref.detect({"candles": arr[: i + 1]}), expect)
+        regimes.add(expect.regime)
+
+    assert len(regimes) >= 3
+
+
+def test_streaming_running_sum_resums_and_stays_close():
+    closes = _closes(3000, seed=7)
+    ref = RegimeDetector(window=64)
+    stream = RegimeDetector(window=64)
+    stream.RESUM_EVERY = 500  # exercise the periodic exact re-sum
+    for i, c in enumerate(closes):
+        got = stream.update(c)
+        if i % 97 == 0 or i == len(closes) - 1:
+            _same(got, ref.detect({"candles": [{"c": x} for x in closes[max(0, i - 63): i + 1]]}))
+    assert abs(stream._ret_sum - sum(stream._abs_rets)) < 1e-12
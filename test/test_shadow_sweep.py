@@ -0,0 +1,40 @@
+# test/test_shadow_sweep.py
+import random
+
+from sim.candle_array import as_candle_array
+from tools.shadow_sweep import aggregate, grid_points, parse_space, random_points, run_sweep
+
+
+def _candles(n, seed=3):
+    rnd = random.Random(seed)
+    px, out = 2000.0, []
+    for i in range(n):
+        o = px
+        px += rnd.gauss(0, 3.0)
+        out.append({"ts": i * 300, "o": o, "h": max(o, px) + 1.0, "l": min(o, px) - 1.0, "c": px, "v": 1.0})
+    return out
+
+
+def test_space_and_points():
+    space = parse_space(["horizon=10,20", "seed=1,2", "train=true"])
+    assert space == {"horizon": [10, 20], "seed": [1, 2], "train": [True]}
+    pts = grid_points(space)
+    assert len(pts) == 4 and pts[0] == {"horizon": 10, "seed": 1, "train": True}
+    assert random_points(space, 2, seed=0) == random_points(space, 2, seed=0)
+    assert len(random_points(space, 99)) == 4
+
+
+def test_process_pool_matches_in_process_and_aggregates():
+    arr = as_candle_array(_candles(260))
+    points = grid_points({"lookback": [120], "max_steps": [60], "horizon": [10, 20], "seed": [1, 2], "train": [True]})
+
+    serial = run_sweep(arr, points, workers=1)
+    pooled = run_sweep(arr, points, workers=2)
+
+    assert [r["error"] for r in pooled] == [None] * 4
+    assert [r["stats"] for r in pooled] == [r["stats"] for r in serial]
+
+    rows = aggregate(pooled)
+    assert len(rows) == 2
+    assert all(r["runs"] == 2 and sorted(r["seeds"]) == [1, 2] and "seed" not in r["params"] for r in rows)
+    assert rows[0]["mean"]["total_pnl"] >= rows[1]["mean"]["total_pnl"]
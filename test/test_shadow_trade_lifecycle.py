@@ -43,3 +43,23 @@ def test_shadow_runner_produces_outcomes():
     assert stats.decisions > 0
     assert stats.outcomes > 0
     assert (stats.wins + stats.losses) >= 1
+
+
+class KeepWindowsEngine:
+    def __init__(self):
+        self.kept = []
+
+    def evaluate_trade(self, trade_features):
+        self.kept.append((trade_features["step"], trade_features["candles"]))
+        return False, 0.0, {}
+
+
+def test_stream_windows_outlive_the_step():
+    candles = [{"ts": i * 60, "o": 1.0, "h": 2.0, "l": 0.0, "c": 1.0, "v": 1.0} for i in range(60)]
+    de = KeepWindowsEngine()
+    stats = ShadowRunner(decision_engine=de).run(iter(candles), lookback=10, horizon=5, max_steps=40)
+
+    assert stats.steps == 40
+    for step, window in de.kept:
+        # window of step i is candles[i - lookback : i], even after later bars arrived
+        assert window.ts.tolist() == [c["ts"] for c in candles[step - 10: step]]
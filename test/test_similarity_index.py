@@ -0,0 +1,60 @@
+# test/test_similarity_index.py
+import numpy as np
+import pytest
+
+from brain.memory_intelligence import MemoryIntelligence
+from brain.similarity_index import FeatureProjection, IVFIndex, SimilarityRecall
+
+
+def _brute(x, q, k):
+    d2 = ((x - q) ** 2).sum(axis=1)
+    return set(np.argsort(d2, kind="stable")[:k].tolist())
+
+
+def test_ivf_matches_brute_force_and_stays_bounded():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 4)) * 4
+    x = (centers[rng.integers(0, 20, 6000)] + rng.normal(size=(6000, 4))).astype(np.float32)
+
+    ix = IVFIndex(4, capacity=4000, nlist=32, nprobe=4, train_size=2000)
+    ix.add_batch(x[:1500], 0.0, True)
+    assert not ix.trained
+    s, _ = ix.search(x[7], 10)
+    assert set(s.tolist()) == _brute(x[:1500], x[7], 10)   # exact before training
+
+    ix.add_batch(x[1500:], 0.0, True)
+    assert ix.trained and len(ix) == 4000
+    # ring: slots hold x[2000:6000]; slot = seq % capacity
+    live = np.empty_like(x[:4000])
+    live[np.arange(2000, 6000) % 4000] = x[2000:]
+    hits = []
+    for q in x[-50:]:
+        s, d2 = ix.search(q, 10)
+        assert np.all(np.diff(d2) >= 0) and len(s) == 10
+        hits.append(len(set(s.tolist()) & _brute(live, q, 10)) / 10)
+    assert np.mean(hits) > 0.9
+
+
+def test_recall_stats_feed_memory_intelligence():
+    proj = FeatureProjection(["v_z", "atr"], scales={"atr": 2.0})
+    rec = SimilarityRecall(proj, k=8, capacity=1000, nlist=4)
+    for i in range(400):
+        vz = (i % 20) / 10.0
+        rec.record({"features": {"v_z": vz, "atr": 1.0}}, {"pnl": 1.0 if vz > 1.0 else -1.0})
+
+    hi, lo = rec.get_stats({"v_z": 1.8, "atr": 1.0}), rec.get_stats({"v_z": 0.2, "atr": 1.0})
+    assert hi["samples"] == 8 and hi["win_rate"] == 1.0 and hi["avg_pnl"] == 1.0
+    assert lo["win_rate"] == 0.0 and lo["losses"] == 8
+
+    mi = MemoryIntelligence(recall=rec)
+    assert MemoryIntelligence().evaluate({}) == 0.5
+    assert mi.evaluate({}, {"v_z": 1.8, "atr": 1.0}) > 0.5 > mi.evaluate({}, {"v_z": 0.2, "atr": 1.0})
+
+
+def test_evaluate_prefers_exact_win_rate():
+    mi = MemoryIntelligence()
+    # 3 neighbours, weighted win rate 0.6 -> wins rounds to 2 (0.667)
+    stats = {"samples": 3, "wins": 2, "losses": 1, "avg_pnl": 0.0, "win_rate": 0.6}
+    assert mi.evaluate(stats) == pytest.approx(0.5 + 0.3 * 0.1)
+    del stats["win_rate"]
+    assert mi.evaluate(stats) == pytest.approx(0.5 + 0.3 * (2 / 3 - 0.5))
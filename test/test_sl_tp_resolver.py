@@ -0,0 +1,42 @@
+# test/test_sl_tp_resolver.py
+import numpy as np
+
+from sim.shadow_execution import _hit_tp_sl
+from sim.sl_tp_resolver import HIT_NONE, HIT_SL, HIT_TP, resolve_sl_tp
+
+
+def _loop(high, low, i, sl, tp, side, horizon):
+    for j in range(i + 1, min(i + 1 + horizon, len(high))):
+        hit = _hit_tp_sl(side, {"h": high[j], "l": low[j]}, tp, sl)
+        if hit is not None:
+            return j, HIT_SL if hit == "sl" else HIT_TP
+    return -1, HIT_NONE
+
+
+def test_resolver_matches_bar_loop():
+    rnd = np.random.default_rng(7)
+    close = 2000 + np.cumsum(rnd.normal(0, 1.0, 3000))
+    high = close + rnd.uniform(0, 1.5, len(close))
+    low = close - rnd.uniform(0, 1.5, len(close))
+
+    idx = np.sort(rnd.choice(len(close), 800, replace=False))
+    side = np.where(rnd.random(len(idx)) < 0.5, "buy", "sell")
+    width = rnd.uniform(0.5, 4.0, len(idx))
+    sl = np.where(side == "buy", close[idx] - width, close[idx] + width)
+    tp = np.where(side == "buy", close[idx] + 2 * width, close[idx] - 2 * width)
+
+    res = resolve_sl_tp(high, low, idx, sl, tp, side=side, horizon=49, entry_price=close[idx])
+    for j, i in enumerate(idx.tolist()):
+        assert (int(res.hit_idx[j]), int(res.kind[j])) == _loop(high, low, i, sl[j], tp[j], side[j], 49)
+
+    assert set(np.unique(res.kind)) == {HIT_NONE, HIT_SL, HIT_TP}
+    assert np.all(res.r[res.kind == HIT_SL] == -1.0)
+    assert np.allclose(res.r[res.kind == HIT_TP], 2.0)
+    assert np.isnan(res.r[res.kind == HIT_NONE]).all()
+
+
+def test_same_bar_touch_counts_as_sl():
+    high = np.array([10.0, 13.0, 10.0])
+    low = np.array([10.0, 7.0, 10.0])
+    res = resolve_sl_tp(high, low, [0], sl=8.0, tp=12.0, side="BUY", horizon=5, tp_r=2.5)
+    assert res.kind.tolist() == [HIT_SL] and res.hit_idx.tolist() == [1] and res.r.tolist() == [-1.0]
@@ -0,0 +1,43 @@
+# test/test_strategy_evolver.py
+import random
+
+from brain.strategy_evolver import evolve, genome_seed
+
+
+def noisy_eval(genome, seed=0):
+    # stochastic evaluator: reproducible only through the per-genome seed
+    rnd = random.Random(seed)
+    return {
+        "avg_pnl": genome["tp_atr_mult"] / genome["sl_atr_mult"] + rnd.gauss(0, 0.1),
+        "win_rate": genome["entry_threshold"],
+        "drawdown": genome["risk_per_trade"] * 10,
+        "samples": 50,
+    }
+
+
+def test_results_do_not_depend_on_executor():
+    kw = dict(generations=4, population_size=12, elite_k=3, mutation_rate=0.3, base_seed=7)
+    ref = evolve(noisy_eval, rng=random.Random(1), **kw)
+    for ex in ("thread", "process"):
+        res = evolve(noisy_eval, rng=random.Random(1), executor=ex, max_workers=3, **kw)
+        assert res.best_genome == ref.best_genome
+        assert res.history_best == ref.history_best and res.history_avg == ref.history_avg
+
+
+def test_elites_are_not_re_evaluated():
+    calls = []
+
+    def ev(g):
+        calls.append(g)
+        return noisy_eval(g, seed=genome_seed(g))
+
+    res = evolve(ev, generations=5, population_size=10, elite_k=4, mutation_rate=0.2, rng=random.Random(3))
+    assert res.evaluations == len(calls)
+    # gen 0 scores the whole population, later gens at most the 6 new children
+    assert len(calls) <= 10 + 4 * 6
+
+    cache = {}
+    evolve(ev, generations=2, population_size=10, elite_k=4, rng=random.Random(3), cache=cache)
+    n = len(calls)
+    again = evolve(ev, generations=2, population_size=10, elite_k=4, rng=random.Random(3), cache=cache)
+    assert again.evaluations == 0 and len(calls) == n
@@ -0,0 +1,128 @@
+# test/test_strategy_upgrade_async.py
+import os
+import tempfile
+
+from brain.strategy_safety_guard import StrategySafetyGuard
+from brain.strategy_store import StrategyStore
+from brain.strategy_upgrade_scheduler import StrategyUpgradeScheduler
+from brain.trade_memory import TradeMemory
+
+
+class RatioEvaluator:
+    # module level -> picklable for the process worker
+    def evaluate(self, genome):
+        ratio = float(genome.get("tp_atr_mult", 3.0)) / float(genome.get("sl_atr_mult", 1.5))
+        return {"avg_pnl": ratio, "win_rate": 0.5, "drawdown": 0.0, "samples": 100}
+
+
+def _memory(n):
+    tm = TradeMemory()
+    for i in range(n):
+        tm.record({"k": i % 5}, {"pnl": 1.0 if i % 3 else -1.0})
+    return tm
+
+
+def test_background_upgrade_applies_at_step_boundary():
+    with tempfile.TemporaryDirectory() as d:
+        store = StrategyStore(os.path.join(d, "best.json"))
+        tm = _memory(60)
+        sch = StrategyUpgradeScheduler(
+            tm,
+            decision_engine=None,
+            store=store,
+            guard=StrategySafetyGuard(cooldown_trades=50, min_samples=30),
+            every_n_trades=50,
+            previous_path=os.path.join(d, "prev.json"),
+            evaluator=RatioEvaluator(),
+        )
+        before = sch.policy
+
+        rep = sch.submit_upgrade(seed=1)
+        assert rep.triggered and rep.reason == "submitted"
+        assert sch.submit_upgrade(seed=1).reason in ("upgrade_in_progress", "no_new_upgrade_window")
+
+        # trading continues while the worker evolves; memory changes are not seen by it
+        tm.record({"k": 99}, {"pnl": 5.0})
+
+        sch._bg_future.result(timeout=60)
+        rep = None
+        while rep is None:
+            rep = sch.poll_upgrade()
+        assert rep.upgraded, rep.reason
+        assert rep.new_fitness > rep.old_fitness
+        assert sch.policy is not before
+        assert sch.policy.genome == rep.new_genome
+        assert sch.poll_upgrade() is None
+
+        sch.close()
+        assert store.load() == rep.new_genome
+        assert os.path.exists(os.path.join(d, "prev.json"))
+
+
+class PolicyEngine:
+    strategy_policy = None
+
+
+class ReloadEngine:
+    def __init__(self, store):
+        self.store, self.genome = store, None
+
+    def reload_strategy(self):
+        self.genome = self.store.load()
+
+
+def _apply_one(engine, d, store):
+    sch = StrategyUpgradeScheduler(
+        _memory(60),
+        decision_engine=engine,
+        store=store,
+        guard=StrategySafetyGuard(cooldown_trades=50, min_samples=30),
+        every_n_trades=50,
+        previous_path=os.path.join(d, "prev.json"),
+        evaluator=RatioEvaluator(),
+    )
+    sch.submit_upgrade(seed=1, executor="thread")
+    sch._bg_future.result(timeout=60)
+    rep = None
+    while rep is None:
+        rep = sch.poll_upgrade()
+    assert rep.upgraded, rep.reason
+    return sch, rep
+
+
+def test_poll_upgrade_swaps_engine_policy_synchronously():
+    with tempfile.TemporaryDirectory() as d:
+        engine = PolicyEngine()
+        sch, rep = _apply_one(engine, d, StrategyStore(os.path.join(d, "best.json")))
+        # no waiting on the persist thread: the engine already trades on the new genome
+        assert engine.strategy_policy is sch.policy
+        assert engine.strategy_policy.genome == rep.new_genome
+        sch.close()
+
+    with tempfile.TemporaryDirectory() as d:
+        store = StrategyStore(os.path.join(d, "best.json"))
+        engine = ReloadEngine(store)
+        sch, rep = _apply_one(engine, d, store)
+        assert engine.genome == rep.new_genome
+        sch.close()
+        assert os.path.exists(os.path.join(d, "prev.json"))
+
+
+def test_close_leaves_caller_executor_running():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.TemporaryDirectory() as d:
+        ex = ThreadPoolExecutor(max_workers=1)
+        sch = StrategyUpgradeScheduler(
+            _memory(60),
+            decision_engine=None,
+            store=StrategyStore(os.path.join(d, "best.json")),
+            guard=StrategySafetyGuard(cooldown_trades=50, min_samples=30),
+            every_n_trades=50,
+            previous_path=os.path.join(d, "prev.json"),
+            evaluator=RatioEvaluator(),
+        )
+        sch.submit_upgrade(seed=1, executor=ex)
+        sch.close()
+        assert ex.submit(lambda: 7).result(timeout=10) == 7
+        ex.shutdown()
@@ -0,0 +1,69 @@
+# test/test_trade_logger.py
+import csv
+import os
+import tempfile
+
+import pandas as pd
+
+from brain import strategy_validation, trade_logger
+from brain.memory_analyzer import MemoryAnalyzer
+from brain.trade_logger import LOG_COLUMNS, TradeLogWriter, part_paths, read_trade_log
+
+
+def _row(i):
+    return {"time": f"2025-01-01 00:{i % 60:02d}:00", "symbol": "XAUUSD", "entry_price": 2000.0 + i,
+            "ob_valid": i % 2 == 0, "result_R": float("nan") if i % 5 == 0 else -1.0,
+            "rr_realized": float("nan") if i % 5 == 0 else -1.0, "not_in_schema": 1}
+
+
+def test_writer_appends_fixed_schema_like_pandas_rewrite():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "trade_log.csv")
+        w = TradeLogWriter(p, flush_every=7)
+        for i in range(20):
+            w.write(_row(i))
+        w.close()
+
+        with open(p, encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == LOG_COLUMNS and len(rows) == 21
+
+        # same frame the old read/concat/rewrite produced (extra keys dropped)
+        want = pd.DataFrame([{c: _row(i).get(c) for c in LOG_COLUMNS} for i in range(20)], columns=LOG_COLUMNS)
+        old = os.path.join(d, "old.csv")
+        want.to_csv(old, index=False)
+        pd.testing.assert_frame_equal(pd.read_csv(p), pd.read_csv(old))
+
+
+def test_existing_header_kept_and_rollover_parts():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "trade_log.csv")
+        pd.DataFrame(columns=LOG_COLUMNS + ["legacy_note"]).to_csv(p, index=False)
+        w = TradeLogWriter(p, flush_every=4, rollover_rows=10)
+        assert w.columns[-1] == "legacy_note"
+        for i in range(25):
+            w.write({**_row(i), "legacy_note": i})
+        w.close()
+
+        assert len(part_paths(p)) == 2
+        df = read_trade_log(p)
+        assert len(df) == 25 and df["legacy_note"].tolist() == list(range(25))
+
+
+def test_log_trade_module_api(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "trade_log.csv")
+        monkeypatch.setattr(trade_logger, "LOG_FILE", p)
+        trade_logger.init_logger()
+        for i in range(3):
+            trade_logger.log_trade(_row(i))
+        trade_logger.flush_trade_log()
+        assert len(pd.read_csv(p)) == 3
+        trade_logger._WRITERS.pop(p, None)
+
+        # readers of the R column still find it
+        monkeypatch.setattr(strategy_validation, "LOG_PATH", p)
+        assert strategy_validation.validate_strategy()["total_trades"] == 2
+        ma = MemoryAnalyzer(p)
+        ma.load_memory()
+        assert "error" not in ma.basic_performance()
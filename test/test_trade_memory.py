@@ -0,0 +1,52 @@
+# test/test_trade_memory.py
+import json
+
+from brain.trade_memory import DEFAULT_KEY_FIELDS, TradeMemory, key_hash
+
+
+def _features(i, candles=200):
+    return {
+        "candles": [{"c": 2000.0 + j} for j in range(candles)],
+        "step": i,
+        "regime": ("trend_up", "range")[i % 2],
+        "trend_state": "up",
+        "volatility_state": "normal",
+        "v_z": (i % 7) * 0.3,
+    }
+
+
+def test_legacy_full_key_unchanged():
+    tm = TradeMemory()
+    f = {"a": 1, "b": [1, 2]}
+    tm.record(f, {"pnl": 2.0})
+    tm.update(f, -1.0)
+    assert tm.get_stats(f) == {"avg_pnl": 0.5, "samples": 2, "wins": 1, "losses": 1}
+    assert list(tm.memory) == [(("a", 1), ("b", (1, 2)))]
+
+
+def test_projected_keys_are_small_binned_and_bounded():
+    tm = TradeMemory(key_fields=DEFAULT_KEY_FIELDS, capacity=5)
+    for i in range(1000):
+        tm.record(_features(i), {"pnl": 1.0})
+
+    # candles / step never reach the key; v_z 0.0/0.3 share bin 0
+    assert all(isinstance(k, int) for k in tm.memory)
+    assert tm.project(_features(0)) == ("trend_up", "up", "normal", 0)
+    assert tm.build_key(_features(0)) == tm.build_key(_features(14)) == key_hash(("trend_up", "up", "normal", 0))
+    assert len(tm.memory) == 5 and tm.evicted > 0
+    # nested features dict is also searched
+    assert tm.get_stats({"features": _features(998)})["samples"] > 0
+
+    # JSON round trip (CoreStateStore) turns int keys into str; adopted back on access
+    k = tm.build_key(_features(999))
+    tm.memory = json.loads(json.dumps(tm.memory))
+    assert tm.get_stats(_features(999)) == {"avg_pnl": 1.0, "samples": tm.memory[k]["samples"], "wins": tm.memory[k]["samples"], "losses": 0}
+
+
+def test_ttl_drops_stale_entries():
+    tm = TradeMemory(key_fields=("k",), ttl=20)
+    tm.record({"k": "old"}, {"pnl": 1.0})
+    for _ in range(50):
+        tm.record({"k": "hot"}, {"pnl": 1.0})
+    assert tm.get_stats({"k": "old"})["samples"] == 0
+    assert tm.get_stats({"k": "hot"})["samples"] == 50
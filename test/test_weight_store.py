@@ -0,0 +1,230 @@
+# test/test_weight_store.py
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from brain import weight_store
+from brain.weight_store import WeightStore
+
+
+def test_write_behind_defers_and_flushes_on_close():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "weights.json")
+        ws = WeightStore(path=p, write_behind=True, flush_every=1000, flush_interval=60.0)
+        for _ in range(20):
+            ws.update("TREND_MA", "trend_up", 0.5)
+        assert ws.dirty and not os.path.exists(p)
+
+        ws.close()
+        assert not ws.dirty
+        saved = json.loads(open(p, encoding="utf-8").read())
+        assert saved["expert_regime"] == ws.to_dict()["expert_regime"]
+        # atomic save leaves no temp files behind
+        assert os.listdir(d) == ["weights.json"]
+
+
+def test_write_behind_flushes_after_n_updates():
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "weights.json")
+        with WeightStore(path=p, write_behind=True, flush_every=5, flush_interval=0.0) as ws:
+            for _ in range(5):
+                ws.update("BREAKOUT", "range", 1.0)
+            deadline = time.time() + 2.0
+            while ws.dirty and time.time() < deadline:
+                time.sleep(0.01)
+            assert not ws.dirty and os.path.exists(p)
+
+
+def test_flush_writes_outside_lock_and_failed_write_stays_dirty(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        p = os.path.join(d, "weights.json")
+        ws = WeightStore(path=p, write_behind=True, flush_every=1000, flush_interval=60.0)
+        ws.update("TREND_MA", "trend_up", 0.5)
+
+        real_write = weight_store._atomic_write_text
+        seen = {}
+
+        def failing_write(path, text):
+            # another thread must be able to take the store lock during the disk write
+            t = threading.Thread(target=lambda: seen.setdefault("free", ws._lock.acquire(timeout=1.0)) and ws._lock.release())
+            t.start()
+            t.join()
+            raise OSError("disk full")
+
+        monkeypatch.setattr(weight_store, "_atomic_write_text", failing_write)
+        with pytest.raises(OSError):
+            ws.flush()
+        assert seen["free"] is True
+        assert ws.dirty and ws._pending == 1
+
+        monkeypatch.setattr(weight_store, "_atomic_write_text", real_write)
+        assert ws.flush() and not ws.dirty and os.path.exists(p)
+        ws.close()
+
+
+def test_lazy_decay_matches_eager_sweep():
+    import random
+
+    rnd = random.Random(3)
+    eager = WeightStore(lazy_decay=False, clamp_min=0.5, clamp_max=2.0)
+    lazy = WeightStore(clamp_min=0.5, clamp_max=2.0)
+    for ws in (eager, lazy):
+        for i in range(10):
+            ws.set("session", f"s{i}", 0.8 + 0.05 * i)
+
+    keys = [(f"E{i}", r) for i in range(8) for r in ("range", "trend_up", "volatile")]
+    for step in range(5000):
+        e, r = rnd.choice(keys)
+        reward = rnd.gauss(0, 2.0) * (50 if step % 200 == 0 else 1)  # big hits -> clamps bind
+        eager.update(e, r, reward, autosave=False)
+        lazy.update(e, r, reward, autosave=False)
+
+        if step % 250 == 0:
+            for e2, r2 in keys:
+                assert abs(lazy.get(e2, r2) - eager.get(e2, r2)) <= 1e-9
+            assert abs(lazy.get("s3") - eager.get("s3")) <= 1e-9
+
+    a, b = eager.to_dict(), lazy.to_dict()
+    for bucket in ("session", "expert_regime"):
+        assert a[bucket].keys() == b[bucket].keys()
+        for k in a[bucket]:
+            assert abs(a[bucket][k] - b[bucket][k]) <= 1e-9
+    assert min(a["expert_regime"].values()) < 0.6  # clamp path exercised
+
+
+def test_weights_for_regime_matches_get():
+    import random
+
+    rnd = random.Random(9)
+    experts = ["TREND_MA", "MEAN_REVERT", "BREAKOUT", "BASELINE", "UNSEEN"]
+    regimes = ["range", "trend_up", "volatile"]
+    for lazy in (True, False):
+        ws = WeightStore(lazy_decay=lazy)
+        ws.set("session", "TREND_MA", 1.4)  # unregimed lookup path
+        for step in range(600):
+            ws.update(rnd.choice(experts[:-1]), rnd.choice(regimes), rnd.gauss(0, 2.0), autosave=False)
+            if step % 50 == 0:
+                for r in regimes + ["never_seen", None]:
+                    for _ in range(2):  # second read comes from the row cache
+                        row = ws.weights_for_regime(experts, r).tolist()
+                        assert row == [ws.get(e, r) for e in experts]
+
+
+def test_weight_log_replay_compaction_and_point_in_time():
+    import random
+
+    from brain.weight_log import WeightLog
+
+    rnd = random.Random(5)
+    keys = [(f"E{i}", r) for i in range(4) for r in ("range", "trend_up")]
+    with tempfile.TemporaryDirectory() as d:
+        root = os.path.join(d, "wlog")
+        ws = WeightStore(path=os.path.join(d, "weights.json"), log=WeightLog(root, compact_every=100, keep_bases=2))
+        ws.set("session", "london", 1.2)
+        seen = {}
+        for step in range(1, 351):
+            e, r = rnd.choice(keys)
+            ws.update(e, r, rnd.gauss(0, 2.0))
+            seen[ws.log.seq] = {k: ws.get(*k) for k in keys}
+        ws.close()
+
+        # autosave goes to the log, not full JSON rewrites; old bases pruned
+        assert not os.path.exists(os.path.join(d, "weights.json"))
+        names = sorted(os.listdir(root))
+        assert [n for n in names if n.startswith("base_")] == ["base_000000000200.json", "base_000000000300.json"]
+
+        restored = WeightLog(root).restore()
+        assert restored.log.seq == 351
+        for k in keys:
+            assert abs(restored.get(*k) - seen[351][k]) <= 1e-9
+        assert restored.get("london") == ws.get("london")
+
+        past = restored.log.store_at(seq=250)
+        for k in keys:
+            assert abs(past.get(*k) - seen[250][k]) <= 1e-9
+
+        try:
+            restored.log.store_at(seq=150)
+            raise AssertionError("compacted history should not be rebuilt")
+        except ValueError:
+            pass
+
+        # torn last line (crash mid-append) is dropped on reopen
+        wal = os.path.join(root, [n for n in names if n.startswith("wal_")][-1])
+        with open(wal, "a", encoding="utf-8") as f:
+            f.write('{"seq":352,"op":"upd')
+        assert WeightLog(root).seq == 351
+
+
+def test_compaction_on_decay_clamp_normalize_keeps_the_op():
+    from brain.weight_log import WeightLog
+
+    for lazy in (True, False):
+        for op in ("decay", "clamp", "normalize"):
+            with tempfile.TemporaryDirectory() as d:
+                ws = WeightStore(lazy_decay=lazy, clamp_max=2.0, log=WeightLog(d, compact_every=2))
+                ws.set("expert_regime", "A|x", 3.0)
+                # 2nd op since the attach base: its append triggers the compaction
+                if op == "decay":
+                    ws.apply_decay()
+                elif op == "clamp":
+                    ws.clamp_all()
+                else:
+                    ws.normalize_bucket("expert_regime")
+                ws.close()
+
+                restored = WeightLog(d).restore(lazy_decay=lazy)
+                assert len(WeightLog(d).bases()) == 2
+                assert ws.get("A", "x") != 3.0
+                assert abs(restored.get("A", "x") - ws.get("A", "x")) <= 1e-12, (lazy, op)
+
+
+
+def test_direct_writes_into_to_dict_stay_consistent():
+    lazy, eager = WeightStore(), WeightStore(lazy_decay=False)
+    for ws in (lazy, eager):
+        ws.set("expert_regime", "A|x", 2.0)
+        ws.set("expert_regime", "B|x", 1.0)
+        ws.apply_decay()  # non-trivial lazy transform before the hand-out
+        ws.to_dict()["expert_regime"]["A|x"] = 5.0
+    assert lazy.get("A", "x") == 5.0
+
+    for ws in (lazy, eager):
+        ws.apply_decay()
+        ws.normalize_bucket("expert_regime")
+        ws.weights["expert_regime"]["C|x"] = 3.0
+        ws.apply_decay()
+        ws.clamp_all()
+    for e in ("A", "B", "C"):
+        assert abs(lazy.get(e, "x") - eager.get(e, "x")) <= 1e-12, e
+
+
+def test_direct_writes_reach_weights_for_regime_and_gate():
+    from brain.experts.expert_gate import ExpertGate
+
+    class _Fixed:
+        def __init__(self, name):
+            self.name = name
+
+        def decide(self, features, context):
+            return {"score": 0.5}
+
+    experts = ["A", "B"]
+    for lazy in (True, False):
+        ws = WeightStore(lazy_decay=lazy)
+        ws.set("expert_regime", "A|x", 2.0)
+        ws.set("expert_regime", "B|x", 1.0)
+        assert ws.weights_for_regime(experts, "x").tolist() == [2.0, 1.0]  # row now cached
+        ws.to_dict()["expert_regime"]["B|x"] = 4.0
+        assert ws.weights_for_regime(experts, "x").tolist() == [ws.get(e, "x") for e in experts] == [2.0, 4.0]
+
+        gate = ExpertGate([_Fixed("A"), _Fixed("B")], weight_store=ws)
+        best, _ = gate.pick({"candles": []}, {"regime": "x"})
+        assert best.expert == "B"
+        ws.weights["expert_regime"]["A|x"] = 9.0
+        best, _ = gate.pick({"candles": []}, {"regime": "x"})
+        assert best.expert == "A"
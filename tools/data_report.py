@@ -17,9 +17,10 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", required=True, help="path to XAUUSD csv")
     ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--no-cache", action="store_true", help="re-parse the CSV, ignore/skip the .npy sidecar")
     args = ap.parse_args()
 
-    candles = load_candles_csv(args.csv, limit=args.limit)
+    candles = load_candles_csv(args.csv, limit=args.limit, cache=not args.no_cache)
     rep = validate_candles(candles)
 
     d = rep.to_dict()
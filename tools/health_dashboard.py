@@ -1,13 +1,19 @@
 # tools/health_dashboard.py
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass, field, fields
 from typing import Any, Dict, Optional
-from dataclasses import dataclass
 from typing import List
 
+import numpy as np
+
+from brain.journal_binary import STEP_TOP, JournalReader, is_binary_journal
+
+
 @dataclass
 class Warning:
     code: str
@@ -40,23 +46,126 @@ class HealthSummary:
         n = self.wins + self.losses
         return (self.wins / n) if n else 0.0
 
-
-def read_journal(path: str) -> HealthSummary:
-    s = HealthSummary()
-    if not os.path.exists(path):
-        return s
-    idx = data.get("idx", None)
-    if isinstance(idx, int):
-        s.last_heartbeat_step = max(s.last_heartbeat_step, idx)
-
-    m = (data or {}).get("metrics", {})
-    if isinstance(m, dict):
-        st = m.get("steps", None)
-        if isinstance(st, int):
-            s.max_seen_step = max(s.max_seen_step, st)
-
-    with open(path, "r", encoding="utf-8") as f:
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "HealthSummary":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (d or {}).items() if k in known})
+
+
+def _apply_event(s: HealthSummary, ev: Dict[str, Any]) -> None:
+    et = ev.get("type") or ev.get("event") or ev.get("name")
+    data = ev.get("data", ev)
+
+    if et == "heartbeat":
+        s.heartbeats += 1
+        s.last_heartbeat = data
+        idx = (data or {}).get("idx", None)
+        if isinstance(idx, int):
+            s.last_heartbeat_step = max(s.last_heartbeat_step, idx)
+        # metrics inside heartbeat
+        m = (data or {}).get("metrics", {})
+        if isinstance(m, dict):
+            s.steps = max(s.steps, int(m.get("steps", s.steps)))
+            s.decisions = max(s.decisions, int(m.get("decisions", s.decisions)))
+            s.orders = max(s.orders, int(m.get("orders", s.orders)))
+            s.executions = max(s.executions, int(m.get("executions", s.executions)))
+            s.outcomes = max(s.outcomes, int(m.get("outcomes", s.outcomes)))
+            s.wins = max(s.wins, int(m.get("wins", s.wins)))
+            s.losses = max(s.losses, int(m.get("losses", s.losses)))
+            s.total_pnl = float(m.get("total_pnl", s.total_pnl))
+            st = m.get("steps", None)
+            if isinstance(st, int):
+                s.max_seen_step = max(s.max_seen_step, st)
+
+    elif et == "outcome":
+        s.outcomes += 1
+        pnl = float((data or {}).get("pnl", 0.0))
+        win = bool((data or {}).get("win", False))
+        s.total_pnl += pnl
+        if win:
+            s.wins += 1
+        else:
+            s.losses += 1
+    else:
+        _apply_counts(s, {et: 1})
+
+    step = (data or {}).get("step", None) if isinstance(data, dict) else None
+    if isinstance(step, int):
+        s.max_seen_step = max(s.max_seen_step, step)
+
+
+# counter-only event types: no payload needed (binary journals skip decoding them)
+_COUNTED = {
+    "decision": "decisions",
+    "order_plan": "orders",
+    "execution": "executions",
+    "risk_pause": "risk_pause",
+    "risk_resume": "risk_resume",
+    "session_reset": "session_reset",
+}
+
+
+def _apply_counts(s: HealthSummary, counts: Dict[Any, int]) -> None:
+    for et, n in counts.items():
+        field = _COUNTED.get(et)
+        if field and n:
+            setattr(s, field, getattr(s, field) + int(n))
+
+
+def _update_binary(s: HealthSummary, path: str, start: int = 0, start_off: Optional[int] = None) -> tuple:
+    """
+    Apply binary-journal events from index entry #start on (frames beginning
+    at byte start_off). Counter-only events are counted per gap between
+    heartbeat/outcome frames (heartbeats take a max over the counters, so
+    order matters) and only those frames are decoded.
+    Returns (entries consumed in total, byte offset after the last frame).
+    """
+    r = JournalReader(path, start=start, start_off=start_off)
+    idx = r.index
+    if len(idx) == 0:
+        return start, r.end
+
+    names = r.names.types
+    tcode = idx["type"]
+    decode_ids = [i for i, n in enumerate(names) if n not in _COUNTED]
+    counted = [(i, names[i]) for i in range(len(names)) if names[i] in _COUNTED]
+    # running count of each counter type, so any gap is a difference
+    cum = {n: np.concatenate([[0], np.cumsum(tcode == i)]) for i, n in counted}
+
+    pos = np.flatnonzero(np.isin(tcode, decode_ids))
+    prev = 0
+    for p, ev in zip(pos.tolist(), r.decode(idx[pos])):
+        _apply_counts(s, {n: int(c[p] - c[prev]) for n, c in cum.items()})
+        if isinstance(ev, dict):
+            _apply_event(s, ev)
+        prev = p + 1
+    _apply_counts(s, {n: int(c[len(idx)] - c[prev]) for n, c in cum.items()})
+
+    # top-level steps of the events that were only counted
+    top = np.isin(tcode, [i for i, _ in counted]) & ((idx["flags"] & STEP_TOP) != 0)
+    if top.any():
+        s.max_seen_step = max(s.max_seen_step, int(idx["step"][top].max()))
+    return start + len(idx), r.end
+
+
+def _update_jsonl(s: HealthSummary, path: str, offset: int = 0, final: bool = True) -> tuple:
+    """
+    Apply JSONL events from byte `offset`. final=False leaves an unterminated
+    last line (still being written) for the next call.
+    Returns (lines consumed, byte offset after the last consumed line).
+    """
+    n = 0
+    pos = int(offset)
+    with open(path, "rb") as f:
+        f.seek(pos)
         for line in f:
+            if not final and not line.endswith(b"\n"):
+                break
+            pos += len(line)
+            n += 1
             line = line.strip()
             if not line:
                 continue
@@ -64,54 +173,156 @@ def read_journal(path: str) -> HealthSummary:
                 ev = json.loads(line)
             except Exception:
                 continue
+            if isinstance(ev, dict):
+                _apply_event(s, ev)
+    return n, pos
 
-            et = ev.get("type") or ev.get("event") or ev.get("name")
-            data = ev.get("data", ev)
-
-            if et == "heartbeat":
-                s.heartbeats += 1
-                s.last_heartbeat = data
-                # metrics inside heartbeat
-                m = (data or {}).get("metrics", {})
-                if isinstance(m, dict):
-                    s.steps = max(s.steps, int(m.get("steps", s.steps)))
-                    s.decisions = max(s.decisions, int(m.get("decisions", s.decisions)))
-                    s.orders = max(s.orders, int(m.get("orders", s.orders)))
-                    s.executions = max(s.executions, int(m.get("executions", s.executions)))
-                    s.outcomes = max(s.outcomes, int(m.get("outcomes", s.outcomes)))
-                    s.wins = max(s.wins, int(m.get("wins", s.wins)))
-                    s.losses = max(s.losses, int(m.get("losses", s.losses)))
-                    s.total_pnl = float(m.get("total_pnl", s.total_pnl))
-
-            elif et == "decision":
-                s.decisions += 1
-            elif et == "order_plan":
-                s.orders += 1
-            elif et == "execution":
-                s.executions += 1
-            elif et == "outcome":
-                s.outcomes += 1
-                pnl = float((data or {}).get("pnl", 0.0))
-                win = bool((data or {}).get("win", False))
-                s.total_pnl += pnl
-                if win:
-                    s.wins += 1
-                else:
-                    s.losses += 1
-
-            elif et == "risk_pause":
-                s.risk_pause += 1
-            elif et == "risk_resume":
-                s.risk_resume += 1
-            elif et == "session_reset":
-                s.session_reset += 1
-        step = (data or {}).get("step", None)
-        if isinstance(step, int):
-            s.max_seen_step = max(s.max_seen_step, step)
 
+def read_journal(path: str) -> HealthSummary:
+    s = HealthSummary()
+    if not os.path.exists(path):
+        return s
+    if is_binary_journal(path):
+        _update_binary(s, path)
+    else:
+        _update_jsonl(s, path)
     return s
 
 
+# -----------------------------
+# Incremental (checkpointed) reading
+# -----------------------------
+_HEAD_BYTES = 4096
+
+
+def _head_sig(path: str, n: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(n)).hexdigest()
+
+
+@dataclass
+class HealthCheckpoint:
+    """
+    Saved reader position: byte offset (+ index entries for binary journals)
+    and the HealthSummary of everything before it. `head` fingerprints the
+    first bytes so a replaced/truncated journal restarts from zero.
+    """
+    offset: int = 0
+    entries: int = 0
+    head: str = ""
+    head_len: int = 0
+    summary: HealthSummary = field(default_factory=HealthSummary)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "HealthCheckpoint":
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                d = json.load(f)
+            return cls(
+                offset=int(d.get("offset", 0)),
+                entries=int(d.get("entries", 0)),
+                head=str(d.get("head", "")),
+                head_len=int(d.get("head_len", 0)),
+                summary=HealthSummary.from_dict(d.get("summary", {})),
+            )
+        except Exception:
+            return cls()
+
+    def save(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def matches(self, journal_path: str) -> bool:
+        if self.offset == 0:
+            return True
+        try:
+            if os.path.getsize(journal_path) < self.offset:
+                return False  # truncated / rewritten
+            return _head_sig(journal_path, self.head_len) == self.head
+        except OSError:
+            return False
+
+    def advance(self, journal_path: str) -> int:
+        """Apply events appended since the saved offset; returns how many records were consumed."""
+        if not os.path.exists(journal_path):
+            return 0
+        if not self.matches(journal_path):
+            self.offset, self.entries, self.head, self.head_len = 0, 0, "", 0
+            self.summary = HealthSummary()
+        if is_binary_journal(journal_path):
+            entries, end = _update_binary(self.summary, journal_path, self.entries, self.offset or None)
+            n = entries - self.entries
+            self.entries, self.offset = entries, end
+        else:
+            n, self.offset = _update_jsonl(self.summary, journal_path, self.offset, final=False)
+        if n and self.head_len < _HEAD_BYTES:
+            self.head_len = min(self.offset, _HEAD_BYTES)
+            self.head = _head_sig(journal_path, self.head_len)
+        return n
+
+
+def default_checkpoint_path(journal_path: str) -> str:
+    return f"{journal_path}.health.json"
+
+
+def read_journal_incremental(path: str, checkpoint_path: Optional[str] = None) -> HealthSummary:
+    """read_journal() that only parses what was appended since the checkpoint."""
+    cp_path = checkpoint_path or default_checkpoint_path(path)
+    cp = HealthCheckpoint.load(cp_path)
+    cp.advance(path)
+    cp.save(cp_path)
+    return cp.summary
+
+
+def follow(
+    path: str,
+    checkpoint_path: Optional[str] = None,
+    interval: float = 2.0,
+    max_rounds: Optional[int] = None,
+    emit=print,
+    **anomaly_kwargs: Any,
+) -> HealthSummary:
+    """
+    Tail the journal: every `interval` seconds apply new events, re-run
+    detect_anomalies and emit a status line plus raised/cleared warnings.
+    """
+    cp = HealthCheckpoint.load(checkpoint_path)
+    active: Dict[str, Any] = {}
+    rounds = 0
+    try:
+        while max_rounds is None or rounds < max_rounds:
+            if rounds:
+                time.sleep(max(float(interval), 0.0))
+            rounds += 1
+            n = cp.advance(path)
+            if not n and rounds > 1:
+                continue
+            cp.save(checkpoint_path)
+            s = cp.summary
+            emit(
+                f"[health] +{n} steps={s.steps} decisions={s.decisions} outcomes={s.outcomes} "
+                f"win_rate={s.win_rate():.2%} total_pnl={s.total_pnl:.2f} heartbeats={s.heartbeats}"
+            )
+            now = {w.code: w.detail for w in detect_anomalies(s, **anomaly_kwargs)}
+            for code, detail in now.items():
+                if code not in active:
+                    emit(f"WARNING + {code} {detail}")
+            for code in active:
+                if code not in now:
+                    emit(f"WARNING - {code} cleared")
+            active = now
+    except KeyboardInterrupt:
+        pass
+    cp.save(checkpoint_path)
+    return cp.summary
+
+
 def render_summary(s: HealthSummary) -> str:
     lines = []
     lines.append("=== XAU_AI_BOT HEALTH DASHBOARD ===")
@@ -184,10 +395,26 @@ def main():
     ap.add_argument("--journal", default="journal.jsonl")
     ap.add_argument("--current-step", type=int, default=None)
     ap.add_argument("--hb-stall", type=int, default=200)
+    ap.add_argument("--checkpoint", default=None, help="offset+summary checkpoint (default: <journal>.health.json)")
+    ap.add_argument("--no-checkpoint", action="store_true", help="full re-read, no checkpoint file")
+    ap.add_argument("--follow", action="store_true", help="tail the journal and re-check warnings as events arrive")
+    ap.add_argument("--interval", type=float, default=2.0)
     args = ap.parse_args()
 
-    # 1️⃣ đọc journal → tạo s
-    s = read_journal(args.journal)
+    cp_path = None if args.no_checkpoint else (args.checkpoint or default_checkpoint_path(args.journal))
+
+    if args.follow:
+        follow(
+            args.journal,
+            checkpoint_path=cp_path,
+            interval=args.interval,
+            current_step=args.current_step,
+            heartbeat_stall_threshold=args.hb_stall,
+        )
+        return
+
+    # 1️⃣ đọc journal → tạo s (chỉ phần mới nếu có checkpoint)
+    s = read_journal(args.journal) if cp_path is None else read_journal_incremental(args.journal, cp_path)
 
     # 2️⃣ detect warnings
     warns = detect_anomalies(
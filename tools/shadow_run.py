@@ -8,9 +8,11 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from brain.decision_engine import DecisionEngine
+from brain.weight_log import WeightLog
 from brain.weight_store import WeightStore
 from observer.eval_reporter import EvalReporter
 from observer.outcome_updater import OutcomeUpdater
+from sim.candle_loader import load_candles_csv
 from sim.shadow_runner import ShadowRunner
 
 
@@ -45,21 +47,6 @@ def _call_with_signature(fn, /, *args, **kwargs):
         return fn(*args, **kwargs)
 
 
-def load_csv_candles(csv_path: str, limit: int) -> list:
-    # existing project already has loaders in other places,
-    # but keep minimal fallback to not break.
-    import csv
-
-    rows = []
-    with open(csv_path, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for i, row in enumerate(r):
-            rows.append(row)
-            if limit > 0 and i + 1 >= limit:
-                break
-    return rows
-
-
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", required=True)
@@ -73,15 +60,17 @@ def main():
     ap.add_argument("--seed", type=int, default=42)
     ap.add_argument("--journal", default=None)
     ap.add_argument("--weights", default=None)
+    ap.add_argument("--weights-log", default=None, help="weight op-log dir (append-only WAL + compacted bases)")
+    ap.add_argument("--no-cache", action="store_true", help="re-parse the CSV, ignore/skip the .npy sidecar")
     args = ap.parse_args()
 
     # weight store
-    weight_store = WeightStore()
-    if args.weights:
-        try:
-            weight_store.load(args.weights)
-        except Exception:
-            pass
+    # write-behind: per-outcome autosave only marks dirty; flushed in background + at close()
+    if args.weights_log:
+        weight_store = WeightLog(args.weights_log).restore(write_behind=True)
+    else:
+        # load() is a classmethod: the store it returns carries the seed weights + save path
+        weight_store = WeightStore.load(args.weights or "data/weights.json", write_behind=True)
 
     # decision engine
     de = DecisionEngine(
@@ -109,7 +98,11 @@ def main():
         train=args.train,
     )
 
-    candles = load_csv_candles(args.csv, args.limit)
+    candles = load_candles_csv(
+        args.csv,
+        limit=args.limit if args.limit > 0 else None,
+        cache=not args.no_cache,
+    )
 
     run_kwargs: Dict[str, Any] = {
         "lookback": _safe_int(args.lookback, 300),
@@ -149,6 +142,8 @@ def main():
     except Exception:
         pass
 
+    weight_store.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,240 @@
+# tools/shadow_sweep.py
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from brain.decision_engine import DecisionEngine
+from brain.weight_store import WeightStore
+from observer.outcome_updater import OutcomeUpdater
+from sim.candle_array import CandleArray, as_candle_array
+from sim.candle_loader import load_candles_csv
+from sim.shadow_runner import ShadowRunner
+
+
+# run() kwargs a sweep may vary; anything else in a spec is rejected
+SWEEP_KEYS = ("lookback", "max_steps", "horizon", "epsilon", "epsilon_cooldown", "seed", "train")
+DEFAULTS: Dict[str, Any] = {
+    "lookback": 300,
+    "max_steps": 2000,
+    "horizon": 30,
+    "epsilon": 0.0,
+    "epsilon_cooldown": 0,
+    "seed": 42,
+    "train": False,
+}
+
+
+def _parse_value(s: str) -> Any:
+    s = s.strip()
+    if s.lower() in ("true", "false"):
+        return s.lower() == "true"
+    for cast in (int, float):
+        try:
+            return cast(s)
+        except ValueError:
+            pass
+    return s
+
+
+def parse_space(items: Sequence[str]) -> Dict[str, List[Any]]:
+    """["lookback=200,300", "seed=1,2"] -> {"lookback": [200, 300], "seed": [1, 2]}"""
+    space: Dict[str, List[Any]] = {}
+    for it in items or []:
+        key, sep, vals = it.partition("=")
+        key = key.strip().replace("-", "_")
+        if not sep or key not in SWEEP_KEYS:
+            raise ValueError(f"bad sweep axis {it!r} (keys: {', '.join(SWEEP_KEYS)})")
+        space[key] = [_parse_value(v) for v in vals.split(",") if v.strip()]
+    return space
+
+
+def grid_points(space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = sorted(space)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(space[k] for k in keys))]
+
+
+def random_points(space: Dict[str, List[Any]], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """n distinct grid points drawn uniformly (all of them if the grid is smaller)."""
+    grid = grid_points(space)
+    if n >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, int(n))
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_CANDLES: Optional[CandleArray] = None
+
+
+def _init_worker(candles_path: str) -> None:
+    # one read-only memmap per process, shared pages with every other worker
+    global _CANDLES
+    _CANDLES = CandleArray.load_npy(candles_path, mmap=True)
+
+
+def run_point(params: Dict[str, Any], weights_path: Optional[str] = None, candles: Optional[CandleArray] = None) -> Dict[str, Any]:
+    """One ShadowRunner run with its own in-memory WeightStore (never saved)."""
+    p = {**DEFAULTS, **params}
+    t0 = time.perf_counter()
+    try:
+        data = candles if candles is not None else _CANDLES
+        if data is None:
+            raise RuntimeError("worker has no candles (initializer not run)")
+
+        ws = WeightStore.load(weights_path) if weights_path else WeightStore()
+        ws.path = None  # read the seed weights, never write them back
+
+        runner = ShadowRunner(
+            decision_engine=DecisionEngine(risk_engine=None, weight_store=ws),
+            outcome_updater=OutcomeUpdater(weight_store=ws, autosave=False),
+            seed=int(p["seed"]),
+            train=bool(p["train"]),
+        )
+        stats = runner.run(
+            data,
+            lookback=int(p["lookback"]),
+            max_steps=int(p["max_steps"]),
+            horizon=int(p["horizon"]),
+            train=bool(p["train"]),
+            epsilon=float(p["epsilon"]),
+            epsilon_cooldown=int(p["epsilon_cooldown"]),
+            journal=None,
+        )
+        return {"params": p, "stats": stats.to_dict(), "seconds": time.perf_counter() - t0, "error": None}
+    except Exception:
+        return {"params": p, "stats": None, "seconds": time.perf_counter() - t0, "error": traceback.format_exc()}
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def share_candles(candles: Any, out_dir: str) -> str:
+    """Write candles once as a CANDLE_DTYPE .npy for workers to memory-map."""
+    path = os.path.join(out_dir, "candles.npy")
+    as_candle_array(candles).save_npy(path)
+    return path
+
+
+def run_sweep(
+    candles: Any,
+    points: List[Dict[str, Any]],
+    *,
+    workers: int = 1,
+    weights_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Run every point; results come back in `points` order."""
+    if workers <= 1 or len(points) <= 1:
+        arr = as_candle_array(candles)
+        return [run_point(p, weights_path, candles=arr) for p in points]
+
+    with tempfile.TemporaryDirectory(prefix="shadow_sweep_") as tmp:
+        path = share_candles(candles, tmp)
+        with ProcessPoolExecutor(max_workers=min(int(workers), len(points)), initializer=_init_worker, initargs=(path,)) as ex:
+            futs = [ex.submit(run_point, p, weights_path) for p in points]
+            return [f.result() for f in futs]
+
+
+_SUM_KEYS = ("steps", "decisions", "allow", "deny", "errors", "outcomes", "wins", "losses", "total_pnl", "forced_entries")
+
+
+def aggregate(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One row per grid point (params without seed): mean of every stat over
+    seeds, pooled win rate, total_pnl spread. Sorted by mean total_pnl.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for r in results:
+        point = {k: v for k, v in r["params"].items() if k != "seed"}
+        groups.setdefault(json.dumps(point, sort_keys=True), []).append(r)
+
+    rows = []
+    for key, runs in groups.items():
+        ok = [r for r in runs if r["stats"] is not None]
+        mean = {k: statistics.fmean(float(r["stats"].get(k, 0.0)) for r in ok) for k in _SUM_KEYS} if ok else {}
+        pnl = [float(r["stats"].get("total_pnl", 0.0)) for r in ok]
+        wins = sum(int(r["stats"].get("wins", 0)) for r in ok)
+        losses = sum(int(r["stats"].get("losses", 0)) for r in ok)
+        rows.append({
+            "params": json.loads(key),
+            "runs": len(runs),
+            "failed": len(runs) - len(ok),
+            "seeds": [r["params"].get("seed") for r in runs],
+            "mean": mean,
+            "pnl_std": statistics.pstdev(pnl) if len(pnl) > 1 else 0.0,
+            "win_rate": wins / (wins + losses) if (wins + losses) else 0.0,
+            "seconds": sum(r["seconds"] for r in runs),
+        })
+    rows.sort(key=lambda r: r["mean"].get("total_pnl", float("-inf")), reverse=True)
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parameter sweep around ShadowRunner (multi-process)")
+    ap.add_argument("--csv", required=True)
+    ap.add_argument("--limit", type=int, default=5000)
+    ap.add_argument("--grid", nargs="+", default=[], help='axes like lookback=200,300 horizon=20,30 seed=1,2,3')
+    ap.add_argument("--spec", default=None, help='JSON file: {"grid": {...}} or {"random": {"n": 20, "seed": 0, "space": {...}}}')
+    ap.add_argument("--random", type=int, default=0, help="sample N points of the grid instead of all")
+    ap.add_argument("--search-seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--weights", default=None, help="seed weights JSON (read only; each run learns in memory)")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+
+    space = parse_space(args.grid)
+    n_random, search_seed = args.random, args.search_seed
+    if args.spec:
+        spec = json.loads(Path(args.spec).read_text(encoding="utf-8"))
+        if "random" in spec:
+            rs = spec["random"]
+            space.update({k: list(v) for k, v in (rs.get("space") or {}).items()})
+            n_random = int(rs.get("n", n_random))
+            search_seed = int(rs.get("seed", search_seed))
+        space.update({k: list(v) for k, v in (spec.get("grid") or {}).items()})
+        bad = set(space) - set(SWEEP_KEYS)
+        if bad:
+            raise ValueError(f"unknown sweep keys: {sorted(bad)}")
+
+    points = random_points(space, n_random, search_seed) if n_random > 0 else grid_points(space)
+    candles = load_candles_csv(args.csv, limit=args.limit if args.limit > 0 else None, cache=not args.no_cache)
+
+    t0 = time.time()
+    results = run_sweep(candles, points, workers=args.workers, weights_path=args.weights)
+    rows = aggregate(results)
+
+    out = args.out or f"data/reports/sweep_{int(t0)}.json"
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    report = {
+        "created_at": t0,
+        "csv": args.csv,
+        "n_candles": len(candles),
+        "workers": args.workers,
+        "wall_seconds": time.time() - t0,
+        "points": rows,
+        "runs": results,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"=== SHADOW SWEEP DONE: {len(results)} runs / {len(rows)} points in {report['wall_seconds']:.1f}s ===")
+    for r in rows[:10]:
+        m = r["mean"]
+        print(f"{r['params']} runs={r['runs']} pnl={m.get('total_pnl', 0.0):.2f}±{r['pnl_std']:.2f} win_rate={r['win_rate']:.2%} failed={r['failed']}")
+    print(f"report: {out}")
+
+
+if __name__ == "__main__":
+    main()
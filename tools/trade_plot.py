@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 from typing import Any, Dict, List, Tuple, Optional, DefaultDict
 from collections import defaultdict
 
 import matplotlib.pyplot as plt
 
+from brain.journal_binary import iter_events
+
 
 # -------- CSV loader (supports MT5 export tabs + <> headers) --------
 
@@ -70,23 +71,18 @@ def load_ohlc_from_csv(path: str, limit: Optional[int] = None) -> Tuple[List[int
 
 # -------- Journal reader --------
 
-def read_journal(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+def read_journal(
+    path: str,
+    limit: Optional[int] = None,
+    types: Optional[Tuple[str, ...]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Events of a JSONL or binary journal. `limit` counts every event (before
+    the `types` filter); binary journals only decode the selected frames.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(path)
-    events: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            raw = raw.strip()
-            if not raw:
-                continue
-            try:
-                ev = json.loads(raw)
-            except Exception:
-                continue
-            events.append(ev)
-            if limit is not None and len(events) >= int(limit):
-                break
-    return events
+    return list(iter_events(path, types=types, limit=limit))
 
 
 def plot_trades(
@@ -97,7 +93,7 @@ def plot_trades(
     journal_limit: Optional[int] = None,
 ):
     x, close = load_ohlc_from_csv(csv_path, limit=limit)
-    events = read_journal(journal_path, limit=journal_limit)
+    events = read_journal(journal_path, limit=journal_limit, types=("decision", "outcome"))
 
     # decision events
     decisions = [e for e in events if e.get("type") == "decision"]